@@ -7,17 +7,29 @@ require_once '../includes/session.php';
 requireLogin();
 $db = getDB();
 
-// Statistik
-$total_anak = $db->query("SELECT COUNT(*) as total FROM data_anak")->fetch_assoc()['total'];
-$total_diagnosa = $db->query("SELECT COUNT(*) as total FROM hasil_diagnosa")->fetch_assoc()['total'];
+// Statistik: baca snapshot rollup (model/aggregation.py), fallback ke query langsung
+// sampai snapshot dibangun penuh dari database (aggregation.py rebuild -> rebuilt_at)
+$stats = file_exists(DASHBOARD_STATS_FILE) ? json_decode(file_get_contents(DASHBOARD_STATS_FILE), true) : null;
+if (!empty($stats['rebuilt_at'])) {
+    $total_anak = $stats['total_anak'];
+    $total_diagnosa = $stats['total_diagnosa'];
+    arsort($stats['by_status']);
+    $status_gizi_stats = [];
+    foreach ($stats['by_status'] as $status => $jumlah) {
+        $status_gizi_stats[] = ['status_gizi' => $status, 'jumlah' => $jumlah];
+    }
+} else {
+    $total_anak = $db->query("SELECT COUNT(*) as total FROM data_anak")->fetch_assoc()['total'];
+    $total_diagnosa = $db->query("SELECT COUNT(*) as total FROM hasil_diagnosa")->fetch_assoc()['total'];
 
-// Statistik Status Gizi
-$status_gizi_stats = $db->query("
-    SELECT status_gizi, COUNT(*) as jumlah 
-    FROM hasil_diagnosa 
-    GROUP BY status_gizi 
-    ORDER BY jumlah DESC
-")->fetch_all(MYSQLI_ASSOC);
+    // Statistik Status Gizi
+    $status_gizi_stats = $db->query("
+        SELECT status_gizi, COUNT(*) as jumlah 
+        FROM hasil_diagnosa 
+        GROUP BY status_gizi 
+        ORDER BY jumlah DESC
+    ")->fetch_all(MYSQLI_ASSOC);
+}
 
 // Diagnosa Terbaru
 $diagnosa_terbaru = $db->query("
@@ -78,6 +78,25 @@ if (isset($_POST['train_model'])) {
     }
 }
 
+// Handle Incremental Update (tambah tree ke model aktif, tanpa retrain penuh)
+if (isset($_POST['update_model'])) {
+    $dataset_file = basename($_POST['dataset_file']);
+    
+    if (file_exists(UPLOAD_PATH . $dataset_file)) {
+        $cmd = 'cd ' . escapeshellarg(MODEL_PATH) . ' && ' . PYTHON_PATH . ' '
+             . escapeshellarg(PYTHON_SCRIPT_INCREMENTAL) . ' ' . escapeshellarg(UPLOAD_PATH . $dataset_file)
+             . ' --max-trees ' . INCREMENTAL_MAX_TREES
+             . ' > ' . escapeshellarg(LOG_PATH . 'incremental_update.log') . ' 2>&1 &';
+        exec($cmd);
+        
+        set_flash('info', 'Incremental update started. New trees are added to the active model; see logs/incremental_update.log.');
+        redirect('admin/upload_dataset.php');
+    } else {
+        set_flash('danger', 'Dataset file not found');
+        redirect('admin/upload_dataset.php');
+    }
+}
+
 // Get uploaded datasets
 try {
     $stmt = $conn->query("SELECT d.*, u.username FROM dataset_uploads d LEFT JOIN users u ON d.uploaded_by = u.id ORDER BY d.upload_date DESC LIMIT 20");
@@ -276,6 +295,10 @@ try {
                                                             onclick="return confirm('Train model dengan dataset ini? Proses akan memakan waktu beberapa menit.')">
                                                         <i class="fas fa-robot"></i> Train Model
                                                     </button>
+                                                    <button type="submit" name="update_model" class="btn btn-sm btn-outline-success"
+                                                            onclick="return confirm('Update model aktif secara incremental dengan dataset ini?')">
+                                                        <i class="fas fa-plus"></i> Update Incremental
+                                                    </button>
                                                 </form>
                                             </td>
                                         </tr>
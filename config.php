@@ -21,6 +21,17 @@ define('MODEL_PATH', __DIR__ . '/model/');
 // Python Configuration
 define('PYTHON_PATH', 'python'); // atau 'python3' di Linux/Mac
 define('PYTHON_SCRIPT_PREDICT', MODEL_PATH . 'predict_gizi.py');
+define('PREDICT_SERVER_URL', ''); // contoh: 'http://127.0.0.1:8765/predict' (model/prediction_server.py)
+define('PYTHON_SCRIPT_AGGREGATE', MODEL_PATH . 'aggregation.py');
+define('DASHBOARD_STATS_FILE', MODEL_PATH . 'dashboard_stats.json');
+define('PYTHON_SCRIPT_WHO', MODEL_PATH . 'who_standards.py');
+define('WHO_SQL_FILE', MODEL_PATH . 'standar_who.sql');
+define('PYTHON_SCRIPT_INCREMENTAL', MODEL_PATH . 'incremental_update.py');
+define('INCREMENTAL_MAX_TREES', 300);
+define('PYTHON_SCRIPT_SIMILAR', MODEL_PATH . 'similar_cases.py');
+define('CASE_INDEX_FILE', MODEL_PATH . 'case_index.npz');
+define('PYTHON_SCRIPT_GROWTH', MODEL_PATH . 'growth_history.py');
+define('GROWTH_HISTORY_FILE', MODEL_PATH . 'growth_history.npz');
 
 // Session Configuration
 define('SESSION_TIMEOUT', 3600); // 1 jam
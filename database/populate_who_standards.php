@@ -13,80 +13,29 @@ echo "=============================================================\n\n";
 
 $db = getDB();
 
-// Truncate existing data
-echo "Clearing existing data...\n";
-$db->query("TRUNCATE TABLE standar_who");
+// Tabel dikompilasi oleh model/who_standards.py (sumber yang sama dengan z-score di Python)
+echo "Compiling WHO standards...\n";
+$cmd = 'cd ' . escapeshellarg(MODEL_PATH) . ' && ' . PYTHON_PATH . ' ' . escapeshellarg(PYTHON_SCRIPT_WHO) . ' 2>&1';
+exec($cmd, $output, $exit_code);
+echo "  " . implode("\n  ", $output) . "\n";
+if ($exit_code !== 0 || !file_exists(WHO_SQL_FILE)) {
+    die("\n✗ Gagal mengkompilasi standar WHO\n");
+}
 echo "✓ Done\n\n";
 
-echo "Inserting WHO standards...\n";
-
+// TRUNCATE + satu INSERT multi-row (multi_query hanya ada di koneksi mysqli)
+echo "Loading WHO standards...\n";
+$conn = $db->getConnection();
+if (!$conn->multi_query(file_get_contents(WHO_SQL_FILE))) {
+    die("✗ Error: " . $conn->error . "\n");
+}
 $inserted = 0;
-
-// Generate standards for 0-60 months
-for ($umur = 0; $umur <= 60; $umur++) {
-    foreach (['L', 'P'] as $jk) {
-        // BB/U (Berat Badan per Umur)
-        if ($jk == 'L') {
-            $median_bb = 3.3 + ($umur * 0.15);
-            $sd_bb = 0.4 + ($umur * 0.01);
-        } else {
-            $median_bb = 3.2 + ($umur * 0.14);
-            $sd_bb = 0.4 + ($umur * 0.01);
-        }
-        
-        $minus_3sd_bb = $median_bb - (3 * $sd_bb);
-        $minus_2sd_bb = $median_bb - (2 * $sd_bb);
-        $minus_1sd_bb = $median_bb - $sd_bb;
-        $plus_1sd_bb = $median_bb + $sd_bb;
-        $plus_2sd_bb = $median_bb + (2 * $sd_bb);
-        $plus_3sd_bb = $median_bb + (3 * $sd_bb);
-        
-        $stmt = $db->prepare("INSERT INTO standar_who (jenis_kelamin, umur_bulan, indikator, median, sd, minus_3sd, minus_2sd, minus_1sd, plus_1sd, plus_2sd, plus_3sd) VALUES (?, ?, 'BB/U', ?, ?, ?, ?, ?, ?, ?, ?)");
-        $stmt->bind_param("sidddddddd", $jk, $umur, $median_bb, $sd_bb, $minus_3sd_bb, $minus_2sd_bb, $minus_1sd_bb, $plus_1sd_bb, $plus_2sd_bb, $plus_3sd_bb);
-        $stmt->execute();
-        $inserted++;
-        
-        // TB/U (Tinggi Badan per Umur)
-        if ($jk == 'L') {
-            $median_tb = 49.9 + ($umur * 1.1);
-            $sd_tb = 1.9 + ($umur * 0.02);
-        } else {
-            $median_tb = 49.1 + ($umur * 1.0);
-            $sd_tb = 1.9 + ($umur * 0.02);
-        }
-        
-        $minus_3sd_tb = $median_tb - (3 * $sd_tb);
-        $minus_2sd_tb = $median_tb - (2 * $sd_tb);
-        $minus_1sd_tb = $median_tb - $sd_tb;
-        $plus_1sd_tb = $median_tb + $sd_tb;
-        $plus_2sd_tb = $median_tb + (2 * $sd_tb);
-        $plus_3sd_tb = $median_tb + (3 * $sd_tb);
-        
-        $stmt = $db->prepare("INSERT INTO standar_who (jenis_kelamin, umur_bulan, indikator, median, sd, minus_3sd, minus_2sd, minus_1sd, plus_1sd, plus_2sd, plus_3sd) VALUES (?, ?, 'TB/U', ?, ?, ?, ?, ?, ?, ?, ?)");
-        $stmt->bind_param("sidddddddd", $jk, $umur, $median_tb, $sd_tb, $minus_3sd_tb, $minus_2sd_tb, $minus_1sd_tb, $plus_1sd_tb, $plus_2sd_tb, $plus_3sd_tb);
-        $stmt->execute();
-        $inserted++;
-        
-        // BB/TB (Berat Badan per Tinggi Badan)
-        $median_bb_tb = 15 + ($umur * 0.05);
-        $sd_bb_tb = 1.2;
-        
-        $minus_3sd_bb_tb = $median_bb_tb - (3 * $sd_bb_tb);
-        $minus_2sd_bb_tb = $median_bb_tb - (2 * $sd_bb_tb);
-        $minus_1sd_bb_tb = $median_bb_tb - $sd_bb_tb;
-        $plus_1sd_bb_tb = $median_bb_tb + $sd_bb_tb;
-        $plus_2sd_bb_tb = $median_bb_tb + (2 * $sd_bb_tb);
-        $plus_3sd_bb_tb = $median_bb_tb + (3 * $sd_bb_tb);
-        
-        $stmt = $db->prepare("INSERT INTO standar_who (jenis_kelamin, umur_bulan, indikator, median, sd, minus_3sd, minus_2sd, minus_1sd, plus_1sd, plus_2sd, plus_3sd) VALUES (?, ?, 'BB/TB', ?, ?, ?, ?, ?, ?, ?, ?)");
-        $stmt->bind_param("sidddddddd", $jk, $umur, $median_bb_tb, $sd_bb_tb, $minus_3sd_bb_tb, $minus_2sd_bb_tb, $minus_1sd_bb_tb, $plus_1sd_bb_tb, $plus_2sd_bb_tb, $plus_3sd_bb_tb);
-        $stmt->execute();
-        $inserted++;
-    }
-    
-    if ($umur % 10 == 0) {
-        echo "  Progress: $umur/60 months...\n";
-    }
+do {
+    $inserted = max($inserted, $conn->affected_rows);
+} while ($conn->more_results() && $conn->next_result());
+// Statement setelah TRUNCATE yang gagal menghentikan loop tanpa pesan
+if ($conn->errno) {
+    die("✗ Error: " . $conn->error . "\n");
 }
 
 echo "\n✓ Successfully inserted $inserted records\n";
@@ -45,6 +45,7 @@ function klasifikasiZScore($z_score, $tipe = 'BB/U') {
 
 /**
  * Tentukan status gizi keseluruhan
+ * Aturan yang sama = profil 'web' di model/status_rules.py (ubah keduanya bersamaan)
  */
 function tentukanStatusGizi($z_bb_u, $z_tb_u, $z_bb_tb) {
     $status_bb_u = klasifikasiZScore($z_bb_u, 'BB/U');
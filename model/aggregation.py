@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Population Aggregation - Rollup statistik dashboard yang dipelihara inkremental
+Setiap diagnosa baru menambah counter (status, jenis kelamin, kelompok umur,
+wilayah) dan histogram z-score di snapshot JSON kecil, sehingga dashboard
+cukup membaca agregat jadi tanpa scan tabel hasil_diagnosa.
+
+Snapshot hanya valid setelah rebuild penuh (ditandai rebuilt_at); sebelum itu
+record() tidak menulis apa pun dan dashboard.php memakai query langsung.
+
+Usage:
+  python aggregation.py record '<json diagnosa>'   # dipanggil result.php
+  python aggregation.py rebuild [--sqlite FILE]    # rebuild penuh dari database
+  python aggregation.py show
+"""
+
+import os
+import sys
+import json
+import bisect
+import argparse
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_stats.json')
+
+# Sama dengan age_group di complete_pipline.py
+AGE_BANDS = [(12, '0-12m'), (24, '12-24m'), (36, '24-36m'), (48, '36-48m'), (60, '48-60m')]
+
+# Histogram z-score: bin 0.5 SD dari -5 s/d 5, plus bin underflow/overflow
+Z_FIELDS = ['z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+Z_EDGES = [x / 2 for x in range(-10, 11)]
+
+UNKNOWN_REGION = 'Tidak diketahui'
+
+REBUILD_QUERY = """
+SELECT d.jenis_kelamin, d.umur_bulan, d.alamat, h.status_gizi,
+       h.z_score_bb_u, h.z_score_tb_u, h.z_score_bb_tb
+FROM hasil_diagnosa h
+JOIN data_anak d ON h.data_anak_id = d.id
+"""
+
+
+def age_band(umur_bulan):
+    """Label kelompok umur (bulan)"""
+    for upper, label in AGE_BANDS:
+        if umur_bulan <= upper:
+            return label
+    return AGE_BANDS[-1][1]
+
+
+def region_of(alamat):
+    """Wilayah = bagian terakhir alamat (kota/kabupaten), mis. 'Jl. X, Bandung' -> 'Bandung'"""
+    if not alamat or not str(alamat).strip():
+        return UNKNOWN_REGION
+    return str(alamat).split(',')[-1].strip().title() or UNKNOWN_REGION
+
+
+def _bump(counter, key, n=1):
+    counter[key] = counter.get(key, 0) + n
+
+
+class PopulationAggregates:
+    """
+    Counter & histogram populasi; add() O(1) per diagnosa
+    """
+
+    def __init__(self):
+        self.total_diagnosa = 0
+        self.total_anak = 0
+        self.by_status = {}
+        self.by_sex = {}
+        self.by_age_band = {}
+        self.by_region = {}
+        self.status_by_region = {}
+        self.z_hist = {name: [0] * (len(Z_EDGES) + 1) for name in Z_FIELDS}
+        self.updated_at = None
+        self.rebuilt_at = None
+
+    def add(self, record):
+        """Tambahkan satu diagnosa (dict dengan kolom data_anak + hasil_diagnosa)"""
+        status = record['status_gizi']
+        region = region_of(record.get('alamat'))
+        self.total_diagnosa += 1
+        self.total_anak += 1  # result.php menyimpan satu baris data_anak per diagnosa
+        _bump(self.by_status, status)
+        _bump(self.by_sex, record['jenis_kelamin'])
+        _bump(self.by_age_band, age_band(int(record['umur_bulan'])))
+        _bump(self.by_region, region)
+        _bump(self.status_by_region.setdefault(region, {}), status)
+        for name in Z_FIELDS:
+            value = record.get(name)
+            if value is not None:
+                self.z_hist[name][bisect.bisect_right(Z_EDGES, float(value))] += 1
+        self.updated_at = datetime.now().isoformat(timespec='seconds')
+
+    def to_dict(self):
+        return {
+            'total_diagnosa': self.total_diagnosa,
+            'total_anak': self.total_anak,
+            'by_status': self.by_status,
+            'by_sex': self.by_sex,
+            'by_age_band': self.by_age_band,
+            'by_region': self.by_region,
+            'status_by_region': self.status_by_region,
+            'z_edges': Z_EDGES,
+            'z_hist': self.z_hist,
+            'updated_at': self.updated_at,
+            'rebuilt_at': self.rebuilt_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        for key in ('total_diagnosa', 'total_anak', 'by_status', 'by_sex', 'by_age_band',
+                    'by_region', 'status_by_region', 'z_hist', 'updated_at'):
+            setattr(agg, key, data[key])
+        agg.rebuilt_at = data.get('rebuilt_at')
+        return agg
+
+    def save(self, filepath=SNAPSHOT_FILE):
+        """Tulis snapshot secara atomik (tmp file + os.replace)"""
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.dashboard_stats.')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath=SNAPSHOT_FILE):
+        if not os.path.exists(filepath):
+            return cls()
+        with open(filepath) as f:
+            return cls.from_dict(json.load(f))
+
+
+@contextmanager
+def snapshot_lock(filepath=SNAPSHOT_FILE):
+    """Lock eksklusif antar proses (read-modify-write snapshot)"""
+    with open(filepath + '.lock', 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def record(diagnosa, filepath=SNAPSHOT_FILE):
+    """
+    Update snapshot dengan satu diagnosa baru
+    Return: None jika belum ada snapshot hasil rebuild (counter dari nol akan
+    menghilangkan riwayat database, jadi tidak ditulis)
+    """
+    with snapshot_lock(filepath):
+        agg = PopulationAggregates.load(filepath)
+        if agg.rebuilt_at is None:
+            return None
+        agg.add(diagnosa)
+        agg.save(filepath)
+    return agg
+
+
+def rebuild(conn, filepath=SNAPSHOT_FILE):
+    """Hitung ulang seluruh rollup dari database (koneksi DB-API)"""
+    cursor = conn.cursor()
+    cursor.execute(REBUILD_QUERY)
+    columns = [c[0] for c in cursor.description]
+    agg = PopulationAggregates()
+    for row in cursor:
+        agg.add(dict(zip(columns, row)))
+    cursor.execute("SELECT COUNT(*) FROM data_anak")
+    agg.total_anak = int(cursor.fetchone()[0])
+    cursor.close()
+    agg.rebuilt_at = datetime.now().isoformat(timespec='seconds')
+    with snapshot_lock(filepath):
+        agg.save(filepath)
+    return agg
+
+
+def main():
+    """CLI record / rebuild / show"""
+    parser = argparse.ArgumentParser(description='Rollup statistik dashboard gizi')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_record = sub.add_parser('record', help='Tambah satu diagnosa (JSON)')
+    p_record.add_argument('diagnosa_json')
+    p_rebuild = sub.add_parser('rebuild', help='Rebuild penuh dari database')
+    p_rebuild.add_argument('--sqlite', help='Gunakan file SQLite alih-alih MySQL')
+    p_rebuild.add_argument('--host', default='localhost')
+    p_rebuild.add_argument('--user', default='root')
+    p_rebuild.add_argument('--password', default='')
+    p_rebuild.add_argument('--database', default='gizi_db')
+    sub.add_parser('show', help='Tampilkan snapshot')
+    parser.add_argument('--snapshot', default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        try:
+            agg = record(json.loads(args.diagnosa_json), args.snapshot)
+        except (ValueError, KeyError) as e:
+            print(json.dumps({'error': f'Invalid input: {e}'}))
+            sys.exit(1)
+        if agg is None:
+            print(json.dumps({'success': True, 'skipped': 'snapshot belum di-rebuild'}))
+            return
+        print(json.dumps({'success': True}))
+        return
+
+    if args.command == 'rebuild':
+        if args.sqlite:
+            import sqlite3
+            conn = sqlite3.connect(args.sqlite)
+        elif pymysql is None:
+            print("✗ Error: pymysql belum terinstall (pip install pymysql)")
+            sys.exit(1)
+        else:
+            conn = pymysql.connect(host=args.host, user=args.user, password=args.password,
+                                   database=args.database)
+        agg = rebuild(conn, args.snapshot)
+        conn.close()
+        print(f"✓ Snapshot rebuilt: {agg.total_diagnosa} diagnosa -> {args.snapshot}")
+        return
+
+    print(json.dumps(PopulationAggregates.load(args.snapshot).to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
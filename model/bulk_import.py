@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Bulk Import Dataset - Muat CSV upload (folder uploads/) ke tabel dataset_training
+CSV dibaca per chunk, kolom dinormalisasi dan divalidasi secara vektor, lalu
+di-insert dengan multi-row INSERT melalui connection pool asyncio.
+
+Mendukung dua skema CSV yang ada:
+  - dataset_gizi_anak.csv          (berat_badan, z_score_bb_u, ...)
+  - data_gizi_antropometri_*.csv   (Berat_Badan_kg, Z_Score_BB_U, ...)
+
+Baris yang sudah pernah di-import dari upload lain dilewati (indeks dedup
+'dataset_training/<database tujuan>', dedup_index.py); gunakan --no-dedup untuk
+import apa adanya.
+
+Backend: MySQL/MariaDB (aiomysql) atau SQLite sebagai stand-in untuk testing.
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+from contextlib import nullcontext
+from schema_loader import SCHEMAS, detect_schema
+from dedup_index import open_index, index_dir, row_hashes
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+TABLE_COLUMNS = ['jenis_kelamin', 'umur_bulan', 'berat_badan', 'tinggi_badan',
+                 'lingkar_lengan', 'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb',
+                 'status_gizi', 'sumber_data']
+
+# Rentang valid, sama dengan clean_data() di complete_pipline.py
+VALID_RANGES = {
+    'umur_bulan': (0, 60),
+    'berat_badan': (2, 30),
+    'tinggi_badan': (45, 120),
+    'lingkar_lengan': (10, 25),
+}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dataset_training (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jenis_kelamin TEXT NOT NULL CHECK (jenis_kelamin IN ('L', 'P')),
+    umur_bulan INTEGER NOT NULL,
+    berat_badan REAL NOT NULL,
+    tinggi_badan REAL NOT NULL,
+    lingkar_lengan REAL,
+    z_score_bb_u REAL,
+    z_score_tb_u REAL,
+    z_score_bb_tb REAL,
+    status_gizi TEXT NOT NULL,
+    sumber_data TEXT DEFAULT 'WHO',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def normalize_chunk(chunk, schema, sumber_data):
+    """
+    Samakan nama kolom & label lalu validasi satu chunk secara vektor
+    (umur_bulan harus bilangan bulat; umur pecahan ikut dihitung ditolak)
+
+    Return: (DataFrame siap insert, jumlah baris yang ditolak)
+    """
+    chunk = chunk.rename(columns=schema['columns'])
+    if 'lingkar_lengan' not in chunk.columns:
+        chunk['lingkar_lengan'] = np.nan
+
+    missing = [c for c in TABLE_COLUMNS[:-1] if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di CSV: {missing}")
+
+    df = chunk[TABLE_COLUMNS[:-1]].copy()
+    df['jenis_kelamin'] = df['jenis_kelamin'].astype(str).str.strip().str.upper()
+    df['status_gizi'] = df['status_gizi'].astype(str).str.strip().replace(schema['status_aliases'])
+    numeric = TABLE_COLUMNS[1:8]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors='coerce')
+
+    valid = df['jenis_kelamin'].isin(['L', 'P']).to_numpy(copy=True)
+    valid &= df[['umur_bulan', 'berat_badan', 'tinggi_badan']].notna().all(axis=1).to_numpy()
+    valid &= (df['status_gizi'] != '').to_numpy() & df['status_gizi'].ne('nan').to_numpy()
+    for col, (low, high) in VALID_RANGES.items():
+        values = df[col].to_numpy()
+        in_range = (values >= low) & (values <= high)
+        if col == 'lingkar_lengan':
+            in_range |= np.isnan(values)  # kolom opsional
+        valid &= in_range
+    # Kolom umur_bulan INTEGER: umur pecahan (mis. 24.7) ditolak, tidak dipotong diam-diam
+    valid &= np.mod(df['umur_bulan'].to_numpy(), 1) == 0
+
+    df = df[valid]
+    df['umur_bulan'] = df['umur_bulan'].astype(int)
+    df['sumber_data'] = sumber_data
+    return df, int((~valid).sum())
+
+
+def to_rows(df):
+    """Konversi DataFrame ke list tuple dengan NaN -> None (NULL)"""
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def build_insert(n_rows, placeholder):
+    """Satu statement INSERT multi-row"""
+    row = '(' + ', '.join([placeholder] * len(TABLE_COLUMNS)) + ')'
+    return (f"INSERT INTO dataset_training ({', '.join(TABLE_COLUMNS)}) VALUES "
+            + ', '.join([row] * n_rows))
+
+
+class SQLitePool:
+    """
+    Connection pool SQLite minimal dengan API async (stand-in untuk MySQL)
+    """
+
+    placeholder = '?'
+
+    def __init__(self, path, size=4):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SQLITE_SCHEMA)
+
+        self.connections = asyncio.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self.connections.put_nowait(conn)
+
+    async def executemany_rows(self, sql, params):
+        conn = await self.connections.get()
+        try:
+            def run():
+                conn.execute(sql, params)
+                conn.commit()
+            await asyncio.to_thread(run)
+        finally:
+            self.connections.put_nowait(conn)
+
+    async def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+class MySQLPool:
+    """
+    Wrapper aiomysql pool (MySQL/MariaDB)
+    """
+
+    placeholder = '%s'
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @classmethod
+    async def create(cls, host, user, password, db, size=4):
+        if aiomysql is None:
+            raise RuntimeError("aiomysql belum terinstall: pip install aiomysql")
+        pool = await aiomysql.create_pool(host=host, user=user, password=password, db=db,
+                                          minsize=1, maxsize=size, autocommit=False)
+        return cls(pool)
+
+    async def executemany_rows(self, sql, params):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(sql, params)
+            await conn.commit()
+
+    async def close(self):
+        self.pool.close()
+        await self.pool.wait_closed()
+
+
+async def bulk_import(filepath, pool, chunksize=5000, batch_size=500, concurrency=4, dedup=None):
+    """
+    Stream CSV -> normalisasi per chunk -> multi-row INSERT paralel via pool
+
+    Parameters:
+    - dedup: DedupIndex (opsional); baris yang sudah pernah di-import dilewati,
+      hash baru di-commit oleh caller setelah import berhasil
+
+    Return: dict statistik import
+    """
+    sumber_data = ('upload:' + os.path.basename(filepath))[:50]
+    schema = SCHEMAS[detect_schema(filepath)]
+    batches = asyncio.Queue(maxsize=concurrency * 2)
+    stats = {'read': 0, 'inserted': 0, 'rejected': 0, 'duplicates': 0, 'batches': 0}
+
+    async def producer():
+        reader = pd.read_csv(filepath, chunksize=chunksize)
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+            stats['read'] += len(chunk)
+            df, rejected = normalize_chunk(chunk, schema, sumber_data)
+            stats['rejected'] += rejected
+            if dedup is not None:
+                new = dedup.filter(row_hashes(df))
+                stats['duplicates'] += int((~new).sum())
+                df = df[new]
+            rows = to_rows(df)
+            for start in range(0, len(rows), batch_size):
+                await batches.put(rows[start:start + batch_size])
+        for _ in range(concurrency):
+            await batches.put(None)
+
+    async def consumer():
+        while True:
+            rows = await batches.get()
+            if rows is None:
+                return
+            params = [value for row in rows for value in row]
+            await pool.executemany_rows(build_insert(len(rows), pool.placeholder), params)
+            stats['inserted'] += len(rows)
+            stats['batches'] += 1
+
+    await asyncio.gather(producer(), *[consumer() for _ in range(concurrency)])
+    return stats
+
+
+def dedup_index_name(args):
+    """Nama indeks dedup per database tujuan (file SQLite atau host/database MySQL)"""
+    target = f"sqlite_{os.path.abspath(args.sqlite)}" if args.sqlite else f"mysql_{args.host}_{args.database}"
+    return os.path.join('dataset_training', re.sub(r'[^A-Za-z0-9.-]+', '_', target).strip('_'))
+
+
+async def run(args):
+    if args.sqlite:
+        pool = SQLitePool(args.sqlite, size=args.concurrency)
+    else:
+        pool = await MySQLPool.create(args.host, args.user, args.password, args.database,
+                                      size=args.concurrency)
+    try:
+        with (nullcontext() if args.no_dedup else open_index(index_dir(dedup_index_name(args)))) as dedup:
+            stats = await bulk_import(args.csv_file, pool, args.chunksize, args.batch_size,
+                                      args.concurrency, dedup)
+            if dedup is not None:
+                dedup.commit()
+            return stats
+    finally:
+        await pool.close()
+
+
+def main():
+    """CLI bulk import"""
+    parser = argparse.ArgumentParser(description='Bulk import CSV ke tabel dataset_training')
+    parser.add_argument('csv_file', help='Path CSV, misal ../uploads/xxx.csv')
+    parser.add_argument('--sqlite', help='Gunakan file SQLite (stand-in) alih-alih MySQL')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--database', default='gizi_db')
+    parser.add_argument('--chunksize', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='Import semua baris, termasuk yang sudah pernah di-import')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv_file):
+        print(f"✗ Error: File '{args.csv_file}' not found!")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Import selesai: {args.csv_file}")
+    print(f"  - Baris dibaca:   {stats['read']}")
+    print(f"  - Baris masuk:    {stats['inserted']} ({stats['batches']} batch)")
+    print(f"  - Baris ditolak:  {stats['rejected']}")
+    print(f"  - Baris duplikat: {stats['duplicates']}")
+    print(f"  - Waktu:          {elapsed:.2f} s ({stats['inserted'] / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
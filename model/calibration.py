@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Calibration - Kalibrasi probabilitas model (isotonic, one-vs-rest per kelas)
+Kalibrator di-fit sekali saat training pada prediksi out-of-fold, lalu disimpan
+sebagai tabel breakpoint kecil (calibration.npz) di dalam model bundle. Saat
+inferensi kalibrasi hanya berupa np.interp per kelas + normalisasi baris.
+"""
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.isotonic import IsotonicRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+CALIBRATION_FILE = 'calibration.npz'
+
+
+def expected_calibration_error(proba, y_true, classes, n_bins=10):
+    """ECE dari confidence (max proba) terhadap akurasi aktual per bin"""
+    confidence = proba.max(axis=1)
+    correct = np.asarray(classes)[proba.argmax(axis=1)] == np.asarray(y_true)
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+    ece = 0.0
+    for b in range(n_bins):
+        mask = bins == b
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean())
+    return float(ece)
+
+
+def brier_score(proba, y_true, classes):
+    """Multiclass Brier score"""
+    onehot = np.asarray(y_true)[:, None] == np.asarray(classes)[None, :]
+    return float(np.mean(np.sum((proba - onehot) ** 2, axis=1)))
+
+
+class CalibrationTable:
+    """
+    Breakpoint isotonic per kelas, disimpan rata (data + offsets)
+    """
+
+    def __init__(self, classes, x_points, y_points):
+        self.classes = np.asarray(classes)
+        self.x_points = [np.asarray(x, dtype=np.float64) for x in x_points]
+        self.y_points = [np.asarray(y, dtype=np.float64) for y in y_points]
+
+    @classmethod
+    def fit(cls, oof_proba, y_true, classes):
+        """Fit isotonic one-vs-rest untuk setiap kolom probabilitas out-of-fold"""
+        y_true = np.asarray(y_true)
+        x_points, y_points = [], []
+        for k, label in enumerate(classes):
+            iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+            iso.fit(oof_proba[:, k], (y_true == label).astype(np.float64))
+            x_points.append(iso.X_thresholds_)
+            y_points.append(iso.y_thresholds_)
+        return cls(classes, x_points, y_points)
+
+    def transform(self, proba):
+        """Probabilitas terkalibrasi (baris dinormalisasi ke 1)"""
+        calibrated = np.empty_like(proba, dtype=np.float64)
+        for k in range(proba.shape[1]):
+            calibrated[:, k] = np.interp(proba[:, k], self.x_points[k], self.y_points[k])
+        total = calibrated.sum(axis=1, keepdims=True)
+        # Jika semua kelas terpetakan ke 0, pakai probabilitas asli
+        return np.where(total > 0, calibrated / np.where(total > 0, total, 1), proba)
+
+    @property
+    def nbytes(self):
+        return sum(x.nbytes + y.nbytes for x, y in zip(self.x_points, self.y_points))
+
+    def save(self, filepath=CALIBRATION_FILE):
+        offsets = np.cumsum([0] + [len(x) for x in self.x_points])
+        np.savez(filepath, classes=self.classes.astype(str), offsets=offsets,
+                 x=np.concatenate(self.x_points), y=np.concatenate(self.y_points))
+
+    @classmethod
+    def load(cls, filepath=CALIBRATION_FILE):
+        with np.load(filepath, allow_pickle=False) as f:
+            offsets, x, y = f['offsets'], f['x'], f['y']
+            spans = list(zip(offsets[:-1], offsets[1:]))
+            return cls(f['classes'], [x[s:e] for s, e in spans], [y[s:e] for s, e in spans])
+
+
+class CalibratedModel:
+    """
+    Bungkus model + CalibrationTable dengan API predict_proba/predict/classes_
+    """
+
+    def __init__(self, model, table):
+        if list(table.classes) != [str(c) for c in model.classes_]:
+            raise ValueError("Kelas kalibrasi tidak sama dengan kelas model")
+        self.model = model
+        self.table = table
+        self.classes_ = model.classes_
+
+    def predict_proba(self, X):
+        return self.table.transform(self.model.predict_proba(X))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def fit_calibration(estimator, X, y, n_splits=5, random_state=42):
+    """
+    Prediksi out-of-fold dengan clone estimator, lalu fit tabel isotonic
+
+    Return: (CalibrationTable, probabilitas out-of-fold)
+    """
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    oof = cross_val_predict(clone(estimator), X, y, cv=cv, method='predict_proba')
+    classes = np.unique(y)
+    return CalibrationTable.fit(oof, y, classes), oof
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Compact Forest - Kompresi model Random Forest untuk deployment hemat memori
+Threshold dikuantisasi (float32/float16) dengan lookup per fitur, distribusi
+kelas di leaf disimpan sebagai count uint8/uint16, dan subtree yang semua
+leaf-nya sepakat dipangkas. Inference tidak membutuhkan sklearn.
+"""
+
+import os
+import json
+import time
+import pickle
+import argparse
+import numpy as np
+
+COMPACT_MODEL_FILE = 'model_gizi_compact.npz'
+
+
+def _effective_leaves(tree, counts):
+    """Tandai node yang bisa dijadikan leaf (subtree dengan prediksi seragam)"""
+    left, right = tree.children_left, tree.children_right
+    is_leaf = left == -1
+    majority = counts.argmax(axis=1)
+
+    # Anak selalu punya id lebih besar dari parent, jadi iterasi mundur = bottom-up
+    for node in range(tree.node_count - 1, -1, -1):
+        if is_leaf[node]:
+            continue
+        l, r = left[node], right[node]
+        if is_leaf[l] and is_leaf[r] and majority[l] == majority[r]:
+            is_leaf[node] = True
+    return is_leaf
+
+
+def _flatten_tree(tree, prune):
+    """Ubah satu sklearn tree menjadi array preorder (left child = index + 1)"""
+    counts = tree.value[:, 0, :] * tree.weighted_n_node_samples[:, None]
+    counts = np.rint(counts)
+    is_leaf = _effective_leaves(tree, counts) if prune else tree.children_left == -1
+
+    feature, threshold, right, leaf_counts = [], [], [], []
+    depth = 0
+
+    def emit(node, level):
+        nonlocal depth
+        depth = max(depth, level)
+        idx = len(feature)
+        feature.append(0)
+        threshold.append(-np.inf)
+        right.append(idx)
+        if is_leaf[node]:
+            leaf_counts.append(counts[node])
+            return idx
+        feature[idx] = tree.feature[node]
+        threshold[idx] = tree.threshold[node]
+        emit(tree.children_left[node], level + 1)
+        right[idx] = emit(tree.children_right[node], level + 1)
+        return idx
+
+    emit(0, 0)
+    return (np.array(feature), np.array(threshold), np.array(right),
+            np.array(leaf_counts), depth)
+
+
+def _quantize_down(values, dtype):
+    """Kuantisasi threshold dengan pembulatan ke bawah agar X <= t tetap konsisten"""
+    q = values.astype(dtype)
+    over = q.astype(np.float64) > values
+    q[over] = np.nextafter(q[over], dtype(-np.inf))
+    return q
+
+
+def compress_forest(model, threshold_dtype='float32', prune=True):
+    """
+    Kompres RandomForestClassifier (atau DecisionTreeClassifier) menjadi CompactForest
+
+    Parameters:
+    - model: estimator sklearn yang sudah di-fit
+    - threshold_dtype: 'float32' (tanpa kehilangan keputusan split) atau 'float16'
+    - prune: pangkas subtree yang leaf-nya menghasilkan kelas yang sama
+    """
+    estimators = getattr(model, 'estimators_', [model])
+    if not all(hasattr(est, 'tree_') for est in estimators):
+        raise ValueError(f"Model {type(model).__name__} tidak didukung untuk kompresi")
+
+    dtype = np.dtype(threshold_dtype).type
+    features, thresholds, rights, counts, roots = [], [], [], [], []
+    offset, max_depth = 0, 0
+    for est in estimators:
+        f, t, r, c, depth = _flatten_tree(est.tree_, prune)
+        roots.append(offset)
+        features.append(f)
+        thresholds.append(t)
+        rights.append(r + offset)
+        counts.append(c)
+        offset += len(f)
+        max_depth = max(max_depth, depth)
+
+    feature = np.concatenate(features)
+    threshold = np.concatenate(thresholds)
+    right = np.concatenate(rights)
+    split = np.isfinite(threshold)
+
+    # Lookup threshold per fitur: index 0 adalah sentinel -inf untuk leaf
+    n_features = model.n_features_in_
+    table = [np.array([-np.inf], dtype=dtype)]
+    thr_idx = np.zeros(len(feature), dtype=np.int64)
+    base = 1
+    for f in range(n_features):
+        mask = split & (feature == f)
+        if not mask.any():
+            continue
+        uniq, inverse = np.unique(_quantize_down(threshold[mask], dtype), return_inverse=True)
+        table.append(uniq)
+        thr_idx[mask] = inverse + base
+        base += len(uniq)
+
+    leaf_counts = np.concatenate(counts)
+    limit = np.iinfo(np.uint16).max
+    over = leaf_counts.max(axis=1) > limit
+    if over.any():
+        # Skala per leaf (distribusi tiap leaf tetap); count > 0 minimal 1 agar leaf tidak kosong
+        scaled = np.rint(leaf_counts[over] * limit / leaf_counts[over].sum(axis=1, keepdims=True))
+        leaf_counts[over] = np.where(leaf_counts[over] > 0, np.maximum(scaled, 1), 0)
+    count_dtype = np.uint8 if leaf_counts.max() <= np.iinfo(np.uint8).max else np.uint16
+
+    arrays = {
+        'feature': feature.astype(np.uint8 if n_features <= 256 else np.uint16),
+        'thr_idx': thr_idx.astype(np.uint16 if base <= 65536 else np.uint32),
+        'thresholds': np.concatenate(table),
+        'right': right.astype(np.int32),
+        'counts': leaf_counts.astype(count_dtype),
+        'roots': np.array(roots, dtype=np.int32),
+        'classes': np.asarray(model.classes_).astype(str),
+        'meta': np.array(json.dumps({
+            'n_features': int(n_features),
+            'max_depth': int(max_depth),
+            'threshold_dtype': np.dtype(dtype).name,
+            'pruned': bool(prune),
+        })),
+    }
+    return CompactForest(arrays)
+
+
+class CompactForest:
+    """
+    Forest terkompresi dengan API predict/predict_proba seperti sklearn
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        meta = json.loads(str(arrays['meta']))
+        self.n_features_in_ = meta['n_features']
+        self.max_depth = meta['max_depth']
+        self.classes_ = np.asarray(arrays['classes'])
+
+        self._feature = arrays['feature'].astype(np.intp)
+        self._right = arrays['right']
+        self._thr = arrays['thresholds'].astype(np.float32)[arrays['thr_idx']]
+        self._roots = arrays['roots']
+
+        # Probabilitas per leaf dinormalisasi sekali saat load
+        is_leaf = self._right == np.arange(len(self._right))
+        self._leaf_row = np.cumsum(is_leaf) - 1
+        counts = arrays['counts'].astype(np.float32)
+        self._leaf_proba = counts / counts.sum(axis=1, keepdims=True)
+
+    @property
+    def n_estimators(self):
+        return len(self._roots)
+
+    def apply(self, X, trees=slice(None)):
+        """
+        Index leaf (id node global) untuk setiap (sampel, tree), shape (n_samples, n_trees)
+        trees: subset tree yang dievaluasi (slice), default semua
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        roots = self._roots[trees]
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(roots, (X.shape[0], len(roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self._feature[node]] <= self._thr[node]
+            node = np.where(go_left, node + 1, self._right[node])
+        return node
+
+    def leaf_proba(self, leaves):
+        """Distribusi kelas (ternormalisasi) untuk index leaf hasil apply()"""
+        return self._leaf_proba[self._leaf_row[leaves]]
+
+    def predict_proba(self, X):
+        return self.leaf_proba(self.apply(X)).mean(axis=1)
+
+    def node_arrays(self):
+        """
+        Struktur node gaya sklearn dengan id global: (left, right, feature, counts)
+        left/right -1 untuk leaf; count kelas node internal = jumlah count anaknya
+        """
+        nodes = np.arange(len(self._right))
+        is_leaf = self._right == nodes
+        left = np.where(is_leaf, -1, nodes + 1)
+        right = np.where(is_leaf, -1, self._right)
+        counts = np.zeros((len(nodes), len(self.classes_)))
+        counts[is_leaf] = self.arrays['counts']
+        # Preorder: anak selalu punya id lebih besar dari parent, jadi iterasi mundur = bottom-up
+        for node in nodes[~is_leaf][::-1]:
+            counts[node] = counts[node + 1] + counts[right[node]]
+        return left, right, self._feature, counts
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.arrays.values())
+
+    def save(self, filepath=COMPACT_MODEL_FILE):
+        np.savez_compressed(filepath, **self.arrays)
+
+    @classmethod
+    def load(cls, filepath=COMPACT_MODEL_FILE):
+        with np.load(filepath, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        return cls(arrays)
+
+
+def compare_models(full_model, compact_model, X_test):
+    """Hitung agreement prediksi compact vs model penuh"""
+    full_pred = full_model.predict(X_test)
+    compact_pred = compact_model.predict(X_test)
+    proba_diff = np.abs(full_model.predict_proba(X_test) - compact_model.predict_proba(X_test))
+    return {
+        'agreement': float(np.mean(full_pred == compact_pred)),
+        'max_proba_diff': float(proba_diff.max()),
+        'mean_proba_diff': float(proba_diff.mean()),
+    }
+
+
+def _timed_load(loader, filepath, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        loader(filepath)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """Kompres model yang di-deploy dan laporkan ukuran, waktu load, dan agreement"""
+    parser = argparse.ArgumentParser(description='Kompres model Random Forest status gizi')
+    parser.add_argument('--model', default='model_gizi_rf.pkl')
+    parser.add_argument('--output', default=COMPACT_MODEL_FILE)
+    parser.add_argument('--threshold-dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--no-prune', action='store_true')
+    args = parser.parse_args()
+
+    import joblib
+    from sklearn.model_selection import train_test_split
+    from train_model import load_and_preprocess_data
+    from label_vocab import load_vocabulary, decode_model
+
+    print("=" * 60)
+    print("COMPACT FOREST - Kompresi Model")
+    print("=" * 60)
+
+    model = decode_model(joblib.load(args.model), load_vocabulary())
+    compact = compress_forest(model, args.threshold_dtype, prune=not args.no_prune)
+    compact.save(args.output)
+
+    # Held-out test split yang sama dengan train_model.py
+    X, y, _, _ = load_and_preprocess_data()
+    _, X_test, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    agreement = compare_models(model, CompactForest.load(args.output), X_test)
+
+    n_nodes = sum(est.tree_.node_count for est in model.estimators_)
+    full_mem = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+    print(f"\n📦 Ukuran Model:")
+    print(f"  Full ({args.model}):    {os.path.getsize(args.model) / 1024:.1f} KB di disk, "
+          f"{full_mem / 1024:.1f} KB in-memory")
+    print(f"  Compact ({args.output}): {os.path.getsize(args.output) / 1024:.1f} KB di disk, "
+          f"{compact.nbytes / 1024:.1f} KB in-memory")
+    print(f"  Nodes: {n_nodes} -> {len(compact.arrays['right'])} "
+          f"(threshold {args.threshold_dtype}, counts {compact.arrays['counts'].dtype})")
+
+    print(f"\n⏱ Waktu Load:")
+    print(f"  Full:    {_timed_load(joblib.load, args.model):.1f} ms")
+    print(f"  Compact: {_timed_load(CompactForest.load, args.output):.1f} ms")
+
+    print(f"\n🎯 Agreement pada test split ({len(X_test)} sampel):")
+    print(f"  Prediksi sama: {agreement['agreement'] * 100:.2f}%")
+    print(f"  Selisih probabilitas max/mean: {agreement['max_proba_diff']:.4f} / "
+          f"{agreement['mean_proba_diff']:.4f}")
+    print(f"\n✓ Compact model saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # ML Libraries
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV, StratifiedKFold
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
 from sklearn.tree import DecisionTreeClassifier
@@ -28,8 +28,17 @@ from imblearn.over_sampling import SMOTE
 from imblearn.under_sampling import RandomUnderSampler
 from imblearn.pipeline import Pipeline as ImbPipeline
 
-import joblib
-import json
+import os
+import time
+
+from schema_loader import load_corpora
+from data_validation import validate_frame, write_reject_report, VALIDATION_RULES
+from drift_monitor import build_reference, save_reference, REFERENCE_FILE
+from model_bundle import write_bundle, publish, MODEL_FILE, ENCODER_FILE, METADATA_FILE
+from parallel_training import train_model_zoo, plan_core_budget
+from hist_boosting import SharedBinHistGradientBoosting, compute_bin_edges, compare_boosting
+from tuning_store import ResumableGridSearch, TRIALS_DB
+from shared_matrix import SharedMatrix
 
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -49,9 +58,9 @@ print("📊 STEP 1: DATA COLLECTION")
 print("="*80)
 
 def load_data(filepath='dataset_gizi_anak.csv'):
-    """Load dataset"""
+    """Load dataset (satu file atau list file dengan skema berbeda)"""
     try:
-        df = pd.read_csv(filepath)
+        df = load_corpora(filepath)
         print(f"✓ Dataset loaded successfully: {filepath}")
         print(f"  - Total samples: {len(df)}")
         print(f"  - Total features: {df.shape[1]}")
@@ -80,51 +89,34 @@ print("🧹 STEP 2: DATA CLEANING")
 print("="*80)
 
 def clean_data(df):
-    """Comprehensive data cleaning"""
+    """Comprehensive data cleaning (single-pass, lihat data_validation.py)"""
     print("Cleaning data...")
     
-    # 1. Check missing values
-    missing = df.isnull().sum()
-    if missing.sum() > 0:
+    # Null, duplikat, IQR, dan range check dihitung sekaligus; mask diterapkan sekali
+    result = validate_frame(df)
+    
+    # 1. Missing values (numerik diisi median, label/jenis kelamin kosong ditolak)
+    if result['null_counts']:
         print(f"\n⚠ Missing Values Found:")
-        print(missing[missing > 0])
-        
-        # Handle missing values
-        for col in df.columns:
-            if df[col].isnull().sum() > 0:
-                if df[col].dtype in ['float64', 'int64']:
-                    df[col].fillna(df[col].median(), inplace=True)
-                else:
-                    df[col].fillna(df[col].mode()[0], inplace=True)
-        print("  ✓ Missing values handled")
+        for col, count in result['null_counts'].items():
+            print(f"  {col}: {count}")
+        print("  ✓ Numeric values imputed, rows without label/sex rejected")
     else:
         print("✓ No missing values")
     
-    # 2. Check duplicates
-    duplicates = df.duplicated().sum()
-    if duplicates > 0:
-        print(f"\n⚠ Found {duplicates} duplicate rows")
-        df = df.drop_duplicates()
+    # 2. Duplicates
+    if result['duplicates'] > 0:
+        print(f"\n⚠ Found {result['duplicates']} duplicate rows")
         print("  ✓ Duplicates removed")
     else:
         print("✓ No duplicates")
     
-    # 3. Remove outliers (IQR method)
-    numerical_cols = ['berat_badan', 'tinggi_badan', 'lingkar_lengan', 
-                     'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
-    
-    outliers_count = 0
-    for col in numerical_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 3 * IQR  # Using 3*IQR for less aggressive removal
-        upper_bound = Q3 + 3 * IQR
-        
-        outliers = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-        if outliers > 0:
-            outliers_count += outliers
+    if result['unmapped'] > 0:
+        print(f"\n⚠ Found {result['unmapped']} rows with unknown jenis_kelamin/status_gizi")
+        print("  ✓ Rows rejected (see reject report)")
     
+    # 3. Outliers (3*IQR, tetap disimpan)
+    outliers_count = sum(result['outlier_counts'].values())
     if outliers_count > 0:
         print(f"\n⚠ Found {outliers_count} outliers (kept for medical context)")
     else:
@@ -132,29 +124,19 @@ def clean_data(df):
     
     # 4. Validate data ranges
     print("\n📊 Data Range Validation:")
-    validations = {
-        'umur_bulan': (0, 60, "Umur"),
-        'berat_badan': (2, 30, "Berat Badan"),
-        'tinggi_badan': (45, 120, "Tinggi Badan"),
-        'lingkar_lengan': (10, 25, "Lingkar Lengan")
-    }
-    
-    all_valid = True
-    for col, (min_val, max_val, name) in validations.items():
-        invalid = ((df[col] < min_val) | (df[col] > max_val)).sum()
+    for col, (min_val, max_val, name) in VALIDATION_RULES.items():
+        invalid = result['range_violations'].get(col, 0)
         if invalid > 0:
             print(f"  ⚠ {name}: {invalid} values out of range [{min_val}, {max_val}]")
-            all_valid = False
         else:
             print(f"  ✓ {name}: All values in valid range")
     
-    if not all_valid:
-        # Remove invalid rows
-        for col, (min_val, max_val, name) in validations.items():
-            df = df[(df[col] >= min_val) & (df[col] <= max_val)]
-        print(f"\n  ✓ Removed invalid rows. New shape: {df.shape}")
+    if result['rejected'] > 0:
+        write_reject_report(result, 'reject_report.csv')
+        print(f"\n  ✓ Removed invalid rows. New shape: {result['data'].shape}")
+        print("  ✓ Reject report: reject_report.csv")
     
-    return df
+    return result['data']
 
 df_cleaned = clean_data(df)
 print(f"\n✓ Data cleaning completed")
@@ -270,8 +252,10 @@ def select_features(X, y, k=15):
     
     # Method 2: Random Forest Feature Importance
     print("\n2️⃣ Random Forest Importance:")
+    # RF/RFE bekerja di float32: konversi sekali, dipakai bersama oleh semua thread dan fit
+    X_f32 = np.ascontiguousarray(X, dtype=np.float32)
     rf_temp = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-    rf_temp.fit(X, y)
+    rf_temp.fit(X_f32, y)
     rf_importance = pd.DataFrame({
         'feature': X.columns,
         'importance': rf_temp.feature_importances_
@@ -284,7 +268,7 @@ def select_features(X, y, k=15):
     print("\n3️⃣ Recursive Feature Elimination:")
     rfe_selector = RFE(RandomForestClassifier(n_estimators=50, random_state=42), 
                        n_features_to_select=k)
-    rfe_selector.fit(X, y)
+    rfe_selector.fit(X_f32, y)
     rfe_features = X.columns[rfe_selector.support_].tolist()
     print(f"   Selected {len(rfe_features)} features")
     
@@ -375,6 +359,9 @@ print("\n" + "="*80)
 print("🤖 STEP 6: MODEL TRAINING")
 print("="*80)
 
+# Batas bin histogram dihitung sekali dari training split, dipakai ulang di semua fold CV
+shared_bin_edges = compute_bin_edges(X_train)
+
 models = {
     'Random Forest': RandomForestClassifier(
         n_estimators=200, 
@@ -394,37 +381,36 @@ models = {
         max_depth=10,
         min_samples_split=10,
         random_state=42
+    ),
+    'Hist Gradient Boosting': SharedBinHistGradientBoosting(
+        bin_edges=shared_bin_edges,
+        max_iter=150,
+        learning_rate=0.1,
+        max_depth=7,
+        random_state=42
     )
 }
 
-trained_models = {}
 results = []
 
-print("Training multiple models...\n")
+n_workers, core_budget = plan_core_budget(models)
+print(f"Training multiple models in parallel ({n_workers} worker, {os.cpu_count()} core)...\n")
 
-for name, model in models.items():
-    print(f"Training {name}...")
-    
-    # Train
-    model.fit(X_train_balanced, y_train_balanced)
-    
-    # Predict
-    y_pred_train = model.predict(X_train_balanced)
-    y_pred_val = model.predict(X_val)
-    
-    # Metrics
-    train_acc = accuracy_score(y_train_balanced, y_pred_train)
-    val_acc = accuracy_score(y_val, y_pred_val)
-    
-    print(f"  ✓ Training Accuracy:   {train_acc*100:.2f}%")
-    print(f"  ✓ Validation Accuracy: {val_acc*100:.2f}%")
+# Fit + scoring di process pool; model dibaca kembali dari trained_models/
+trained_models, zoo_results = train_model_zoo(models, X_train_balanced, y_train_balanced,
+                                              X_val, y_val)
+
+for r in zoo_results:
+    print(f"Training {r['name']}... (n_jobs={r['n_jobs']}, {r['fit_time']:.1f}s)")
+    print(f"  ✓ Training Accuracy:   {r['train_acc']*100:.2f}%")
+    print(f"  ✓ Validation Accuracy: {r['val_acc']*100:.2f}%")
     print()
     
-    trained_models[name] = model
     results.append({
-        'Model': name,
-        'Train_Acc': train_acc,
-        'Val_Acc': val_acc
+        'Model': r['name'],
+        'Train_Acc': r['train_acc'],
+        'Val_Acc': r['val_acc'],
+        'Fit_Time_s': r['fit_time']
     })
 
 results_df = pd.DataFrame(results)
@@ -486,6 +472,16 @@ evaluation_results = {}
 for name, model in trained_models.items():
     evaluation_results[name] = evaluate_model(model, X_test, y_test, name)
 
+# Exact-split GB vs histogram GB
+boosting_names = ['Gradient Boosting', 'Hist Gradient Boosting']
+boosting_comparison = compare_boosting(
+    {name: trained_models[name] for name in boosting_names},
+    {r['name']: r['fit_time'] for r in zoo_results},
+    X_test, y_test
+)
+print("\n📊 Boosting Comparison (fit time, predict latency, accuracy):")
+print(boosting_comparison.to_string(index=False))
+
 
 # ============================================================================
 # 🛠 STEP 8: MODEL OPTIMIZATION (Hyperparameter Tuning)
@@ -504,19 +500,20 @@ param_grid = {
 }
 
 rf_base = RandomForestClassifier(random_state=42, n_jobs=-1)
-grid_search = GridSearchCV(
+# Trial (parameter, fold) disimpan di SQLite; run ulang hanya menjalankan yang belum ada
+grid_search = ResumableGridSearch(
     rf_base, 
     param_grid, 
     cv=3, 
     scoring='accuracy',
-    n_jobs=-1,
-    verbose=1
+    store_path=TRIALS_DB
 )
 
 print("\nStarting Grid Search (this may take a few minutes)...")
 grid_search.fit(X_train_balanced, y_train_balanced)
 
 print(f"\n✓ Grid Search completed!")
+print(f"  Trials: {grid_search.n_run_} dijalankan, {grid_search.n_cached_} dari {TRIALS_DB}")
 print(f"  Best parameters: {grid_search.best_params_}")
 print(f"  Best CV score: {grid_search.best_score_*100:.2f}%")
 
@@ -540,19 +537,23 @@ print("Performing Stratified K-Fold Cross-Validation (k=5)...\n")
 cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
 
 cv_results = {}
-for name, model in trained_models.items():
-    print(f"CV for {name}:")
-    scores = cross_val_score(model, X_selected, y, cv=cv, scoring='accuracy', n_jobs=-1)
-    
-    cv_results[name] = {
-        'scores': scores,
-        'mean': scores.mean(),
-        'std': scores.std()
-    }
-    
-    print(f"  Fold scores: {[f'{s*100:.2f}%' for s in scores]}")
-    print(f"  Mean: {scores.mean()*100:.2f}% (+/- {scores.std()*2*100:.2f}%)")
-    print()
+# Satu buffer float32 + kode label untuk semua worker CV (dikirim sebagai referensi memmap)
+with SharedMatrix(X_selected, y) as shared_cv:
+    for name, model in trained_models.items():
+        print(f"CV for {name}:")
+        cv_start = time.perf_counter()
+        scores = cross_val_score(model, shared_cv.X, shared_cv.y, cv=cv, scoring='accuracy', n_jobs=-1)
+        
+        cv_results[name] = {
+            'scores': scores,
+            'mean': scores.mean(),
+            'std': scores.std(),
+            'time': time.perf_counter() - cv_start
+        }
+        
+        print(f"  Fold scores: {[f'{s*100:.2f}%' for s in scores]}")
+        print(f"  Mean: {scores.mean()*100:.2f}% (+/- {scores.std()*2*100:.2f}%)")
+        print()
 
 # CV Summary
 print("📊 Cross-Validation Summary:")
@@ -563,6 +564,8 @@ cv_summary = pd.DataFrame({
 })
 print(cv_summary.to_string(index=False))
 
+boosting_comparison['CV_Time_s'] = [cv_results[name]['time'] for name in boosting_comparison['Model']]
+
 
 # ============================================================================
 # 📈 STEP 10: DEPLOYMENT & MONITORING
@@ -579,18 +582,10 @@ deployment_model = trained_models[best_model_name]
 print(f"Selected model for deployment: {best_model_name}")
 print(f"Test Accuracy: {evaluation_results[best_model_name]['accuracy']*100:.2f}%")
 
-# Save model
+# Save model (hanya sebagai bundle; file flat label_encoder_gender.pkl milik model train_model.py)
 print("\n💾 Saving model and artifacts...")
 
-joblib.dump(deployment_model, 'model_gizi_optimized.pkl')
-joblib.dump(le_gender, 'label_encoder_gender.pkl')
-joblib.dump(selected_features, 'selected_features.pkl')
-
-print("  ✓ model_gizi_optimized.pkl")
-print("  ✓ label_encoder_gender.pkl")
-print("  ✓ selected_features.pkl")
-
-# Save metadata
+# Metadata
 metadata = {
     'model_type': best_model_name,
     'model_params': str(deployment_model.get_params()),
@@ -606,10 +601,22 @@ metadata = {
     'smote_applied': True
 }
 
-with open('model_metadata_complete.json', 'w') as f:
-    json.dump(metadata, f, indent=4)
-
-print("  ✓ model_metadata_complete.json")
+# Profil referensi untuk drift monitoring (distribusi training asli, sebelum SMOTE)
+save_reference(build_reference(df_engineered.loc[X_train.index], y_train))
+print("  ✓ drift_reference.json")
+
+# Semua artefak dalam satu bundle versi baru, dipublikasikan secara atomik
+OPTIMIZED_BUNDLE_ROOT = 'bundles_optimized'
+bundle_version = write_bundle({
+    MODEL_FILE: deployment_model,
+    ENCODER_FILE: le_gender,
+    'selected_features.pkl': selected_features,
+    REFERENCE_FILE: REFERENCE_FILE,
+}, metadata, root=OPTIMIZED_BUNDLE_ROOT)
+publish(bundle_version, root=OPTIMIZED_BUNDLE_ROOT)
+print(f"  ✓ {OPTIMIZED_BUNDLE_ROOT}/{bundle_version}/ (published)")
+print(f"    {MODEL_FILE}, {ENCODER_FILE}, selected_features.pkl, {REFERENCE_FILE}, {METADATA_FILE}")
+print(f"    Load: load_bundle(current_bundle_dir('{OPTIMIZED_BUNDLE_ROOT}'))")
 
 # Monitoring metrics
 print("\n📊 Model Monitoring Metrics:")
@@ -834,6 +841,10 @@ report_text = f"""
    Best Model: {best_model_name}
    Test Accuracy: {evaluation_results[best_model_name]['accuracy']*100:.2f}%
    
+   Boosting Comparison (Gradient Boosting vs Hist Gradient Boosting):
+   {chr(10).join([f'   • {r.Model}: Fit={r.Fit_Time_s:.2f}s, CV={r.CV_Time_s:.2f}s, Predict={r.Single_Predict_ms:.3f}ms/data (batch {r.Batch_Predict_ms:.1f}ms), Test={r.Test_Acc*100:.2f}%'
+                  for r in boosting_comparison.itertuples()])}
+   
    Per-Class Performance:
    {chr(10).join([f'   • {cls}: Precision={evaluation_results[best_model_name]["classification_report"][cls]["precision"]*100:.1f}%, Recall={evaluation_results[best_model_name]["classification_report"][cls]["recall"]*100:.1f}%, F1={evaluation_results[best_model_name]["classification_report"][cls]["f1-score"]*100:.1f}%'
                   for cls in deployment_model.classes_])}
@@ -862,10 +873,8 @@ report_text = f"""
    ✓ Cross-Validation Score: {cv_results[best_model_name]['mean']*100:.2f}%
    
    Files Saved:
-   • model_gizi_optimized.pkl
-   • label_encoder_gender.pkl
-   • selected_features.pkl
-   • model_metadata_complete.json
+   • {OPTIMIZED_BUNDLE_ROOT}/{bundle_version}/ (model, encoder, selected features, metadata)
+   • drift_reference.json
    • complete_pipeline_analysis.png
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
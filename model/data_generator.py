@@ -12,6 +12,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from status_rules import status_gizi
 
 class GiziDataGenerator:
     """
@@ -115,33 +116,8 @@ class GiziDataGenerator:
         Tentukan status gizi berdasarkan Z-score
         Menggunakan standar WHO
         """
-        # Prioritas: BB/TB > TB/U > BB/U
-        
-        # Wasting (BB/TB)
-        if z_bb_tb < -3:
-            return 'Gizi Buruk'  # Severely wasted
-        elif z_bb_tb < -2:
-            return 'Gizi Kurang'  # Wasted
-        
-        # Stunting (TB/U)
-        if z_tb_u < -3:
-            return 'Gizi Buruk'  # Severely stunted
-        elif z_tb_u < -2:
-            return 'Gizi Kurang'  # Stunted
-        
-        # Underweight (BB/U)
-        if z_bb_u < -3:
-            return 'Gizi Buruk'  # Severely underweight
-        elif z_bb_u < -2:
-            return 'Gizi Kurang'  # Underweight
-        
-        # Overweight/Obesity (BB/TB)
-        if z_bb_tb > 3:
-            return 'Obesitas'
-        elif z_bb_tb > 2:
-            return 'Gizi Lebih'
-        
-        return 'Normal'
+        # Prioritas: BB/TB > TB/U > BB/U (profil 'antropometri' di status_rules.py)
+        return status_gizi(z_bb_u, z_tb_u, z_bb_tb, 'antropometri')
     
     def generate_child_data(self, umur_bulan, jenis_kelamin, status_target=None):
         """
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Data Validation Engine - Validasi & cleaning data gizi secara vektor
+Semua pengecekan (null, rentang nilai, batas IQR, duplikat) dihitung dalam
+satu pass NumPy, digabung menjadi satu mask boolean, dan diterapkan sekali.
+Baris yang ditolak dicatat di reject report per baris untuk dikirim balik
+ke admin yang meng-upload dataset.
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# (min, max, nama) - rentang valid data antropometri
+VALIDATION_RULES = {
+    'umur_bulan': (0, 60, "Umur"),
+    'berat_badan': (2, 30, "Berat Badan"),
+    'tinggi_badan': (45, 120, "Tinggi Badan"),
+    'lingkar_lengan': (10, 25, "Lingkar Lengan"),
+}
+
+OUTLIER_COLUMNS = ['berat_badan', 'tinggi_badan', 'lingkar_lengan',
+                   'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+
+REPORT_COLUMNS = ['baris', 'kolom', 'nilai', 'aturan', 'keterangan']
+
+
+def validate_frame(df, rules=VALIDATION_RULES, outlier_columns=OUTLIER_COLUMNS, iqr_k=3.0,
+                   drop_duplicates=True):
+    """
+    Validasi DataFrame dalam satu pass
+
+    Parameters:
+    - df: DataFrame dengan kolom kanonik (lihat schema_loader.py)
+    - rules: dict kolom -> (min, max, nama)
+    - outlier_columns: kolom yang dihitung outlier-nya (IQR, tetap disimpan)
+    - iqr_k: pengali IQR (3*IQR = kurang agresif)
+
+    Return: dict berisi DataFrame bersih, mask, statistik, dan reject report
+    """
+    range_cols = [c for c in rules if c in df.columns]
+    outlier_cols = [c for c in outlier_columns if c in df.columns]
+    numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    other_cols = [c for c in df.columns if c not in numeric_cols]
+    col_index = {c: i for i, c in enumerate(numeric_cols)}
+
+    # 1. Null mask + imputasi median untuk semua kolom numerik sekaligus
+    X = df[numeric_cols].to_numpy(copy=True)
+    if not np.issubdtype(X.dtype, np.floating):
+        X = X.astype(np.float64)
+    null_mask = np.isnan(X)
+    null_counts = null_mask.sum(axis=0)
+    empty = null_counts == len(X)  # kolom opsional yang tidak ada di skema sumber
+    filled = (null_counts > 0) & ~empty
+    if filled.any():
+        medians = np.nanmedian(X[:, filled], axis=0)
+        X[:, filled] = np.where(null_mask[:, filled], medians, X[:, filled])
+
+    # Kategori di luar vocabulary (schema_loader.py menyimpan nilai aslinya) -> baris ditolak
+    category_mask = np.zeros(len(df), dtype=bool)
+    unmapped_cells = {}
+    category_entries = []
+    for c, values in df.attrs.get('unmapped', {}).items():
+        positions = df.index.get_indexer(list(values))
+        found = positions >= 0
+        category_mask[positions[found]] = True
+        unmapped_cells[c] = positions[found]
+        category_entries.append(pd.DataFrame({
+            'baris': np.array(list(values), dtype=object)[found],
+            'kolom': c,
+            'nilai': np.array(list(values.values()), dtype=object)[found],
+            'aturan': 'category',
+            'keterangan': 'nilai tidak dikenal - baris ditolak',
+        }))
+
+    # Kolom non-numerik (label, jenis kelamin) tidak diimputasi: baris kosong ditolak
+    label_null = np.zeros((len(df), len(other_cols)), dtype=bool)
+    for j, c in enumerate(other_cols):
+        label_null[:, j] = df[c].isna().to_numpy()
+        label_null[unmapped_cells.get(c, []), j] = False
+    other_nulls = {c: int(label_null[:, j].sum()) for j, c in enumerate(other_cols)}
+
+    # 2. Range check: semua kolom dibandingkan sekaligus via broadcasting
+    ridx = np.array([col_index[c] for c in range_cols], dtype=np.intp)
+    low = np.array([rules[c][0] for c in range_cols], dtype=X.dtype)
+    high = np.array([rules[c][1] for c in range_cols], dtype=X.dtype)
+    R = X[:, ridx]
+    range_violation = (R < low) | (R > high)
+
+    # 3. IQR bound untuk semua kolom outlier dalam satu panggilan quantile
+    outlier_cols = [c for c in outlier_cols if not empty[col_index[c]]]
+    oidx = np.array([col_index[c] for c in outlier_cols], dtype=np.intp)
+    O = X[:, oidx]
+    q1, q3 = np.quantile(np.ascontiguousarray(O.T), [0.25, 0.75], axis=1)
+    iqr = q3 - q1
+    outlier_mask = (O < q1 - iqr_k * iqr) | (O > q3 + iqr_k * iqr)
+
+    # 4. Duplikat & mask gabungan, diterapkan satu kali
+    duplicate_mask = df.duplicated().to_numpy() if drop_duplicates else np.zeros(len(df), bool)
+    keep = ~range_violation.any(axis=1) & ~duplicate_mask & ~category_mask & ~label_null.any(axis=1)
+
+    cleaned = df.loc[keep].copy()
+    cleaned.attrs = {k: v for k, v in df.attrs.items() if k != 'unmapped'}
+    for c, i in col_index.items():
+        if filled[i]:
+            cleaned[c] = X[keep, i]
+
+    null_mask[:, empty] = False
+    report = build_reject_report(df.index.to_numpy(), R, range_violation, range_cols,
+                                 low, high, duplicate_mask, null_mask, numeric_cols,
+                                 category_entries, label_null, other_cols)
+
+    return {
+        'data': cleaned,
+        'keep_mask': keep,
+        'null_counts': {c: int(null_counts[i]) for c, i in col_index.items() if null_counts[i]}
+                       | {c: n for c, n in other_nulls.items() if n},
+        'range_violations': {c: int(range_violation[:, i].sum()) for i, c in enumerate(range_cols)},
+        'outlier_counts': {c: int(outlier_mask[:, i].sum()) for i, c in enumerate(outlier_cols)},
+        'duplicates': int(duplicate_mask.sum()),
+        'unmapped': int(category_mask.sum()),
+        'rejected': int((~keep).sum()),
+        'reject_report': report,
+    }
+
+
+def build_reject_report(index, R, range_violation, range_cols, low, high,
+                        duplicate_mask, null_mask, numeric_cols, extra_parts=(),
+                        label_null=None, label_cols=()):
+    """
+    Reject report format panjang: satu baris per (baris data, pelanggaran)
+    extra_parts: DataFrame tambahan berkolom REPORT_COLUMNS (mis. kategori tidak dikenal)
+    label_null: mask null kolom non-numerik (label_cols) - baris ditolak, tidak diimputasi
+    """
+    rows, cols = np.nonzero(range_violation)
+    messages = np.array([f"di luar rentang [{lo:g}, {hi:g}] - baris ditolak"
+                         for lo, hi in zip(low, high)], dtype=object)
+    range_part = pd.DataFrame({
+        'baris': index[rows],
+        'kolom': np.array(range_cols, dtype=object)[cols],
+        'nilai': R[rows, cols],
+        'aturan': 'range',
+        'keterangan': messages[cols],
+    })
+
+    dup_rows = np.nonzero(duplicate_mask)[0]
+    dup_part = pd.DataFrame({
+        'baris': index[dup_rows],
+        'kolom': '*',
+        'nilai': np.nan,
+        'aturan': 'duplicate',
+        'keterangan': 'duplikat baris sebelumnya - baris ditolak',
+    })
+
+    null_rows, null_cols = np.nonzero(null_mask)
+    null_part = pd.DataFrame({
+        'baris': index[null_rows],
+        'kolom': np.array(numeric_cols, dtype=object)[null_cols],
+        'nilai': np.nan,
+        'aturan': 'null',
+        'keterangan': 'nilai kosong - diisi median',
+    })
+
+    label_part = pd.DataFrame(columns=REPORT_COLUMNS)
+    if label_null is not None:
+        label_rows, label_idx = np.nonzero(label_null)
+        label_part = pd.DataFrame({
+            'baris': index[label_rows],
+            'kolom': np.array(label_cols, dtype=object)[label_idx],
+            'nilai': np.nan,
+            'aturan': 'null',
+            'keterangan': 'nilai kosong - baris ditolak',
+        })
+
+    parts = [p for p in (range_part, dup_part, null_part, label_part, *extra_parts) if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(parts, ignore_index=True).sort_values(['baris', 'aturan'], kind='stable')
+
+
+def write_reject_report(result, filepath):
+    """Simpan reject report (CSV) untuk admin"""
+    result['reject_report'].to_csv(filepath, index=False)
+    return filepath
+
+
+def _synthetic_frame(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'jenis_kelamin': pd.Categorical.from_codes(rng.integers(0, 2, n_rows), ['L', 'P']),
+        'umur_bulan': rng.integers(0, 62, n_rows).astype(np.int16),
+        'berat_badan': rng.normal(12, 4, n_rows).astype(np.float32),
+        'tinggi_badan': rng.normal(85, 15, n_rows).astype(np.float32),
+        'lingkar_lengan': rng.normal(15, 2.5, n_rows).astype(np.float32),
+        'z_score_bb_u': rng.normal(0, 1.3, n_rows).astype(np.float32),
+        'z_score_tb_u': rng.normal(0, 1.3, n_rows).astype(np.float32),
+        'z_score_bb_tb': rng.normal(0, 1.3, n_rows).astype(np.float32),
+    })
+    df.loc[rng.integers(0, n_rows, n_rows // 1000), 'berat_badan'] = np.nan
+    return df
+
+
+def _legacy_clean(df):
+    """Pendekatan lama clean_data(): loop kolom dan filter ulang berkali-kali"""
+    for col in OUTLIER_COLUMNS:
+        Q1, Q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        ((df[col] < Q1 - 3 * (Q3 - Q1)) | (df[col] > Q3 + 3 * (Q3 - Q1))).sum()
+    for col in df.columns:
+        if df[col].isnull().sum() > 0:
+            df[col] = df[col].fillna(df[col].median())
+    for col, (min_val, max_val, name) in VALIDATION_RULES.items():
+        ((df[col] < min_val) | (df[col] > max_val)).sum()
+    for col, (min_val, max_val, name) in VALIDATION_RULES.items():
+        df = df[(df[col] >= min_val) & (df[col] <= max_val)]
+    return df
+
+
+def benchmark(sizes):
+    """Timing engine vektor vs pendekatan lama"""
+    print(f"{'Rows':>12} {'Vectorized':>12} {'Legacy':>12} {'Speedup':>9}")
+    for n_rows in sizes:
+        df = _synthetic_frame(n_rows)
+        start = time.perf_counter()
+        validate_frame(df, drop_duplicates=False)
+        vec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _legacy_clean(df.copy())
+        legacy = time.perf_counter() - start
+        print(f"{n_rows:>12,} {vec:>11.2f}s {legacy:>11.2f}s {legacy / vec:>8.1f}x")
+
+
+def main():
+    """Validasi CSV upload dan tulis reject report, atau jalankan benchmark"""
+    parser = argparse.ArgumentParser(description='Validasi dataset gizi + reject report')
+    parser.add_argument('csv_file', nargs='?')
+    parser.add_argument('--report', help='Path reject report (default: <csv>_reject_report.csv)')
+    parser.add_argument('--benchmark', type=int, nargs='*',
+                        help='Benchmark untuk jumlah baris tertentu, misal 1000000 10000000')
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        benchmark(args.benchmark or [1_000_000, 10_000_000])
+        return
+    if not args.csv_file:
+        parser.error('csv_file wajib diisi kecuali --benchmark')
+
+    from schema_loader import read_csv_unified
+    df = read_csv_unified(args.csv_file)
+    result = validate_frame(df)
+    report_path = args.report or os.path.splitext(args.csv_file)[0] + '_reject_report.csv'
+    write_reject_report(result, report_path)
+
+    print(f"✓ Validasi selesai: {args.csv_file}")
+    print(f"  - Total baris:   {len(df)}")
+    print(f"  - Baris valid:   {len(result['data'])}")
+    print(f"  - Ditolak:       {result['rejected']} (duplikat: {result['duplicates']}, "
+          f"kategori tidak dikenal: {result['unmapped']})")
+    for col, count in result['range_violations'].items():
+        if count:
+            print(f"    ⚠ {col}: {count} nilai di luar rentang")
+    print(f"  - Reject report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
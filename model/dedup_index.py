@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Dedup Index - Indeks hash baris persisten untuk deduplikasi antar dataset upload
+clean_data() hanya membuang duplikat di dalam satu file; pengukuran yang sama
+yang di-upload ulang di beberapa uploads/*.csv ikut dilatih berulang kali.
+Indeks ini mengingat setiap baris yang pernah di-ingest sebagai hash uint64:
+
+  - hashes.u64 : hash terurut (uint64) di disk, dibaca sebagai np.memmap dan
+                 dicari dengan binary search; riwayat tidak pernah dimuat penuh
+  - bloom.bits : Bloom filter (~10 bit per baris, 7 probe, ~1% false positive)
+                 di memori; hanya hash yang "mungkin ada" dicek ke hashes.u64
+
+Baris baru dikumpulkan selama satu sesi lalu di-merge ke hashes.u64 secara
+streaming (blok demi blok) saat commit(). Caller commit hanya setelah data
+benar-benar dipakai (insert / training berhasil).
+
+Hash dihitung dari kolom kanonik (schema_loader.py), jadi baris yang sama
+dari skema CSV berbeda dikenali sebagai duplikat. Z-score tidak ikut di-hash
+karena diturunkan dari pengukuran dengan presisi berbeda per generator.
+
+Usage:
+  python dedup_index.py add dataset_gizi_anak.csv        # daftarkan riwayat
+  python dedup_index.py check ../uploads/baru.csv        # hitung duplikat saja
+  python dedup_index.py filter ../uploads/baru.csv -o baru_unik.csv
+  python dedup_index.py benchmark --rows 5000000
+"""
+
+import os
+import time
+import tempfile
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from aggregation import snapshot_lock
+from schema_loader import SCHEMAS, detect_schema
+
+INDEX_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dedup_index')
+HASH_FILE = 'hashes.u64'
+BLOOM_FILE = 'bloom.bits'
+
+HASH_COLUMNS = ['jenis_kelamin', 'umur_bulan', 'berat_badan', 'tinggi_badan',
+                'lingkar_lengan', 'status_gizi']
+NUMERIC_COLUMNS = ['umur_bulan', 'berat_badan', 'tinggi_badan', 'lingkar_lengan']
+DECIMALS = 2
+BITS_PER_ITEM = 10
+N_PROBES = 7
+MIN_CAPACITY = 1 << 16
+BLOCK_SIZE = 1 << 20
+CHUNKSIZE = 50000
+
+
+def index_dir(name):
+    """
+    Direktori indeks per konsumen (mis. 'model' untuk training,
+    'dataset_training/<database>' untuk DB, lihat bulk_import.py)
+    """
+    return os.path.join(INDEX_ROOT, name)
+
+
+def row_hashes(df, status_aliases=None):
+    """
+    Hash uint64 per baris dari kolom kanonik
+
+    Parameters:
+    - df: DataFrame dengan nama kolom kanonik (lingkar_lengan boleh tidak ada)
+    - status_aliases: pemetaan label status ke nama kanonik (mis. 'Normal' -> 'Gizi Baik')
+
+    Return: np.ndarray uint64
+    """
+    status = df['status_gizi'].astype(str).str.strip()
+    if status_aliases:
+        status = status.replace(status_aliases)
+    key = {
+        'jenis_kelamin': df['jenis_kelamin'].astype(str).str.strip().str.upper().to_numpy(dtype=object),
+        'status_gizi': status.to_numpy(dtype=object),
+    }
+    # Nilai dikuantisasi ke 0.01 agar float32 (schema_loader) dan float64 (pd.read_csv)
+    # dari teks CSV yang sama menghasilkan hash yang sama; NaN -> -1
+    scale = 10 ** DECIMALS
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            values = np.full(len(df), np.nan)
+        quantized = np.rint(values * scale)
+        key[col] = np.where(np.isnan(quantized), -1, quantized).astype(np.int64)
+    frame = pd.DataFrame(key)[HASH_COLUMNS]
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+def _in_sorted(sorted_hashes, values):
+    """Mask keanggotaan values (terurut) di array terurut (boleh memmap)"""
+    if len(sorted_hashes) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(sorted_hashes, values)
+    found = pos < len(sorted_hashes)
+    found[found] = sorted_hashes[pos[found]] == values[found]
+    return found
+
+
+def _merge_sorted(a, b, out, block_size=BLOCK_SIZE):
+    """
+    Gabungkan dua array terurut yang saling lepas ke out; a boleh memmap besar
+    (dibaca per blok), b di memori. Posisi akhir tiap elemen = posisinya sendiri
+    + jumlah elemen array lain yang lebih kecil.
+    """
+    out[np.arange(len(b)) + np.searchsorted(a, b)] = b
+    for start in range(0, len(a), block_size):
+        block = np.asarray(a[start:start + block_size])
+        out[start + np.arange(len(block)) + np.searchsorted(b, block)] = block
+    return out
+
+
+class BloomFilter:
+    """
+    Bloom filter bit array (n_bits pangkat dua) dengan double hashing dari
+    hash uint64: probe_i = (h_low + i * h_high) mod n_bits
+    """
+
+    def __init__(self, bits, n_probes=N_PROBES):
+        self.bits = bits
+        self.n_bits = len(bits) * 8
+        self.n_probes = n_probes
+
+    @classmethod
+    def for_capacity(cls, capacity):
+        n_bits = 1 << int(np.ceil(np.log2(max(capacity, MIN_CAPACITY) * BITS_PER_ITEM)))
+        return cls(np.zeros(n_bits // 8, dtype=np.uint8))
+
+    @property
+    def capacity(self):
+        return self.n_bits // BITS_PER_ITEM
+
+    def _positions(self, hashes):
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.n_probes, dtype=np.uint64)
+        return (low[:, None] + probes * high[:, None]) & np.uint64(self.n_bits - 1)
+
+    def add(self, hashes):
+        positions = self._positions(hashes).ravel()
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+
+    def might_contain(self, hashes):
+        positions = self._positions(hashes)
+        bits = self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).all(axis=1)
+
+
+class DedupIndex:
+    """
+    Set hash baris yang sudah di-ingest (hashes.u64 + bloom.bits di directory)
+
+    Gunakan lewat open_index() agar satu sesi filter/commit memegang lock.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hash_path = os.path.join(directory, HASH_FILE)
+        self.bloom_path = os.path.join(directory, BLOOM_FILE)
+        self.hashes = self._open_hashes()
+        if os.path.exists(self.bloom_path):
+            self.bloom = BloomFilter(np.fromfile(self.bloom_path, dtype=np.uint8))
+        else:
+            self.bloom = BloomFilter.for_capacity(len(self.hashes))
+            self._add_blocks(self.bloom, self.hashes)
+        self.pending = np.empty(0, dtype=np.uint64)
+        self.n_bloom_checks = 0
+        self.n_disk_checks = 0
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _open_hashes(self):
+        if not os.path.exists(self.hash_path) or os.path.getsize(self.hash_path) == 0:
+            return np.empty(0, dtype=np.uint64)
+        return np.memmap(self.hash_path, dtype=np.uint64, mode='r')
+
+    @staticmethod
+    def _add_blocks(bloom, hashes):
+        for start in range(0, len(hashes), BLOCK_SIZE):
+            bloom.add(np.asarray(hashes[start:start + BLOCK_SIZE]))
+
+    def _ensure_capacity(self, n_total):
+        """Bangun ulang Bloom filter 2x lebih besar jika n_total melebihi kapasitasnya"""
+        if n_total <= self.bloom.capacity:
+            return
+        self.bloom = BloomFilter.for_capacity(2 * n_total)
+        self._add_blocks(self.bloom, self.hashes)
+        self.bloom.add(self.pending)
+
+    def filter(self, hashes):
+        """
+        Tandai baris baru (belum pernah di-ingest, belum muncul di sesi ini, dan
+        kemunculan pertama di dalam hashes) lalu catat sebagai pending
+
+        Return: mask bool, True = baris baru
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        self._ensure_capacity(len(self.hashes) + len(self.pending) + len(hashes))
+        new = np.zeros(len(hashes), dtype=bool)
+        new[np.unique(hashes, return_index=True)[1]] = True
+
+        candidates = np.flatnonzero(new)
+        maybe = self.bloom.might_contain(hashes[candidates])
+        self.n_bloom_checks += len(candidates)
+        candidates = candidates[maybe]
+        if len(candidates):
+            # Urutkan agar binary search di memmap berjalan maju (akses halaman lokal)
+            candidates = candidates[np.argsort(hashes[candidates], kind='stable')]
+            values = hashes[candidates]
+            self.n_disk_checks += len(values)
+            seen = _in_sorted(self.hashes, values) | _in_sorted(self.pending, values)
+            new[candidates[seen]] = False
+
+        fresh = np.sort(hashes[new])
+        self.bloom.add(fresh)
+        self.pending = _merge_sorted(self.pending, fresh,
+                                     np.empty(len(self.pending) + len(fresh), dtype=np.uint64))
+        return new
+
+    def commit(self):
+        """
+        Merge hash pending ke hashes.u64 secara streaming lalu simpan Bloom filter
+
+        Bloom filter ditulis lebih dulu: jika proses berhenti di tengah, filter
+        hanya berisi bit ekstra (false positive), tidak pernah kehilangan hash.
+
+        Return: jumlah hash yang ditambahkan
+        """
+        n_new = len(self.pending)
+        if n_new == 0:
+            return 0
+        n_total = len(self.hashes) + n_new
+        self._write_atomic(self.bloom_path, lambda path: self.bloom.bits.tofile(path))
+        self._write_atomic(self.hash_path, lambda path: self._merge_into(path, n_total))
+        self.hashes = self._open_hashes()
+        self.pending = np.empty(0, dtype=np.uint64)
+        return n_new
+
+    def _merge_into(self, path, n_total):
+        out = np.memmap(path, dtype=np.uint64, mode='w+', shape=(n_total,))
+        _merge_sorted(self.hashes, self.pending, out)
+        out.flush()
+        del out
+
+    def _write_atomic(self, filepath, writer):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.' + os.path.basename(filepath) + '.')
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+@contextmanager
+def open_index(directory=None):
+    """DedupIndex dengan lock eksklusif antar proses selama sesi filter/commit"""
+    directory = directory or index_dir('model')
+    os.makedirs(directory, exist_ok=True)
+    with snapshot_lock(os.path.join(directory, HASH_FILE)):
+        yield DedupIndex(directory)
+
+
+def dedupe_csv(index, filepath, output=None, chunksize=CHUNKSIZE):
+    """
+    Stream CSV upload (skema apa pun) melalui indeks
+
+    Parameters:
+    - output: jika diisi, baris baru ditulis ke CSV ini dengan format asli
+
+    Return: dict statistik (read, new, duplicates)
+    """
+    schema = SCHEMAS[detect_schema(filepath)]
+    stats = {'read': 0, 'new': 0, 'duplicates': 0}
+    header = True
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        hashes = row_hashes(chunk.rename(columns=schema['columns']), schema['status_aliases'])
+        new = index.filter(hashes)
+        stats['read'] += len(chunk)
+        stats['new'] += int(new.sum())
+        if output is not None:
+            chunk[new].to_csv(output, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    stats['duplicates'] = stats['read'] - stats['new']
+    return stats
+
+
+def benchmark(n_rows, n_query=200000, seed=42):
+    """
+    Indeks n_rows hash acak, lalu filter upload n_query baris (50% duplikat)
+
+    Return: dict hasil
+    """
+    rng = np.random.default_rng(seed)
+    history = rng.integers(0, np.iinfo(np.uint64).max, size=n_rows, dtype=np.uint64, endpoint=True)
+    upload = np.concatenate([rng.choice(history, n_query // 2),
+                             rng.integers(0, np.iinfo(np.uint64).max, size=n_query - n_query // 2,
+                                          dtype=np.uint64, endpoint=True)])
+    with tempfile.TemporaryDirectory() as directory:
+        with open_index(directory) as index:
+            start = time.perf_counter()
+            for begin in range(0, n_rows, BLOCK_SIZE):
+                index.filter(history[begin:begin + BLOCK_SIZE])
+            index.commit()
+            build_s = time.perf_counter() - start
+
+        with open_index(directory) as index:
+            start = time.perf_counter()
+            new = np.concatenate([index.filter(upload[begin:begin + CHUNKSIZE])
+                                  for begin in range(0, n_query, CHUNKSIZE)])
+            filter_s = time.perf_counter() - start
+            start = time.perf_counter()
+            index.commit()
+            commit_s = time.perf_counter() - start
+            return {
+                'n_rows': n_rows,
+                'n_query': n_query,
+                'duplicates': int((~new).sum()),
+                'hash_mb': os.path.getsize(index.hash_path) / 1024 / 1024,
+                'bloom_mb': index.bloom.bits.nbytes / 1024 / 1024,
+                'disk_check_pct': 100 * index.n_disk_checks / max(index.n_bloom_checks, 1),
+                'build_s': build_s,
+                'filter_rows_s': n_query / filter_s,
+                'commit_s': commit_s,
+            }
+
+
+def main():
+    """CLI add / check / filter / benchmark indeks dedup"""
+    parser = argparse.ArgumentParser(description='Indeks deduplikasi baris antar dataset upload')
+    parser.add_argument('--index', default='model',
+                        help="Nama indeks di dedup_index/ ('model' = training, "
+                             "'dataset_training/<database>' = DB, lihat bulk_import.py)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_add = sub.add_parser('add', help='Daftarkan semua baris CSV ke indeks')
+    p_add.add_argument('csv', nargs='+')
+    p_check = sub.add_parser('check', help='Hitung baris duplikat tanpa mengubah indeks')
+    p_check.add_argument('csv', nargs='+')
+    p_filter = sub.add_parser('filter', help='Tulis baris baru ke CSV lalu daftarkan ke indeks')
+    p_filter.add_argument('csv')
+    p_filter.add_argument('-o', '--output', required=True)
+    p_bench = sub.add_parser('benchmark', help='Throughput filter vs ukuran riwayat')
+    p_bench.add_argument('--rows', type=int, default=1000000)
+    p_bench.add_argument('--query', type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        r = benchmark(args.rows, args.query)
+        print("=" * 60)
+        print("DEDUP INDEX BENCHMARK")
+        print("=" * 60)
+        print(f"Riwayat : {r['n_rows']} hash ({r['hash_mb']:.1f} MB di disk, "
+              f"Bloom {r['bloom_mb']:.1f} MB di memori), build {r['build_s']:.2f}s")
+        print(f"Upload  : {r['n_query']} baris, {r['duplicates']} duplikat, "
+              f"{r['filter_rows_s']:.0f} rows/s")
+        print(f"Bloom   : {r['disk_check_pct']:.1f}% baris perlu dicek ke disk")
+        print(f"Commit  : {r['commit_s']:.2f}s")
+        return
+
+    with open_index(index_dir(args.index)) as index:
+        paths = args.csv if isinstance(args.csv, list) else [args.csv]
+        output = getattr(args, 'output', None)
+        for path in paths:
+            stats = dedupe_csv(index, path, output)
+            print(f"  {path}: {stats['read']} baris, {stats['new']} baru, {stats['duplicates']} duplikat")
+        if args.command == 'check':
+            print(f"✓ Indeks tidak diubah ({len(index)} hash)")
+            return
+        added = index.commit()
+        print(f"✓ +{added} hash -> {len(index)} hash di {index.directory}")
+        if output is not None:
+            print(f"✓ Baris baru: {output}")
+
+
+if __name__ == "__main__":
+    main()
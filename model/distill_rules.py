@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Distilasi Random Forest menjadi pohon keputusan dangkal / aturan IF-THEN
+Hasil diekspor sebagai JSON dan modul Python murni sehingga prediksi tidak
+membutuhkan sklearn maupun traversal 200 tree.
+"""
+
+import json
+import time
+import argparse
+import warnings
+import numpy as np
+
+RULES_JSON_FILE = 'model_rules.json'
+RULES_PY_FILE = 'model_rules.py'
+
+
+def augment_samples(X, n_samples, noise=0.3, random_state=42):
+    """Buat sampel tambahan di sekitar data training agar batas keputusan forest terwakili"""
+    rng = np.random.default_rng(random_state)
+    X = np.asarray(X, dtype=np.float64)
+    base = X[rng.integers(0, len(X), n_samples)]
+    jitter = rng.normal(0, noise, base.shape) * X.std(axis=0)
+    return base + jitter
+
+
+def distill(teacher, X, feature_names, max_depth=6, min_samples_leaf=5,
+            n_augment=20000, random_state=42):
+    """
+    Latih pohon dangkal (student) pada prediksi forest (teacher)
+
+    Parameters:
+    - teacher: model yang sudah di-fit (RandomForestClassifier)
+    - X: fitur training
+    - feature_names: urutan nama fitur
+    - max_depth: kedalaman maksimum student tree
+    - n_augment: jumlah sampel sintetis tambahan yang dilabeli teacher
+    """
+    from sklearn.tree import DecisionTreeClassifier
+
+    X = np.asarray(X, dtype=np.float64)
+    if n_augment:
+        X = np.vstack([X, augment_samples(X, n_augment, random_state=random_state)])
+    y_teacher = teacher.predict(X)
+
+    student = DecisionTreeClassifier(max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+                                     random_state=random_state)
+    student.fit(X, y_teacher)
+    return export_tree(student, feature_names)
+
+
+def export_tree(tree_model, feature_names):
+    """Ekspor DecisionTreeClassifier menjadi struktur dict bersarang (JSON-friendly)"""
+    tree = tree_model.tree_
+    classes = [str(c) for c in tree_model.classes_]
+
+    def node_to_dict(node):
+        if tree.children_left[node] == -1:
+            counts = tree.value[node, 0]
+            proba = counts / counts.sum()
+            return {
+                'class': classes[int(proba.argmax())],
+                'confidence': round(float(proba.max()), 4),
+                'samples': int(tree.n_node_samples[node]),
+            }
+        return {
+            'feature': feature_names[tree.feature[node]],
+            'threshold': float(tree.threshold[node]),
+            'left': node_to_dict(tree.children_left[node]),
+            'right': node_to_dict(tree.children_right[node]),
+        }
+
+    return {
+        'feature_names': list(feature_names),
+        'classes': classes,
+        'max_depth': int(tree_model.get_depth()),
+        'n_leaves': int(tree_model.get_n_leaves()),
+        'tree': node_to_dict(0),
+    }
+
+
+def tree_to_rules(rules_tree):
+    """Ratakan pohon menjadi rule list: [{'conditions': [...], 'class': ..., ...}]"""
+    rules = []
+
+    def walk(node, conditions):
+        if 'class' in node:
+            rules.append({**node, 'conditions': conditions})
+            return
+        walk(node['left'], conditions + [[node['feature'], '<=', node['threshold']]])
+        walk(node['right'], conditions + [[node['feature'], '>', node['threshold']]])
+
+    walk(rules_tree['tree'], [])
+    return rules
+
+
+def tree_to_python(rules_tree):
+    """Generate source code Python murni (if/else bersarang) dari pohon"""
+    lines = [
+        '"""',
+        'Aturan status gizi hasil distilasi Random Forest (generated oleh distill_rules.py)',
+        'Tidak membutuhkan sklearn - cukup panggil predict(fitur_dict)',
+        '"""',
+        '',
+        f"FEATURE_NAMES = {rules_tree['feature_names']!r}",
+        f"CLASSES = {rules_tree['classes']!r}",
+        '',
+        '',
+        'def predict(f):',
+        '    """Return (status_gizi, confidence) untuk dict fitur"""',
+    ]
+
+    def emit(node, depth):
+        indent = '    ' * depth
+        if 'class' in node:
+            lines.append(f"{indent}return {node['class']!r}, {node['confidence']!r}")
+            return
+        lines.append(f"{indent}if f[{node['feature']!r}] <= {node['threshold']!r}:")
+        emit(node['left'], depth + 1)
+        lines.append(f"{indent}else:")
+        emit(node['right'], depth + 1)
+
+    emit(rules_tree['tree'], 1)
+    return '\n'.join(lines) + '\n'
+
+
+class RuleModel:
+    """
+    Evaluator aturan tanpa dependensi sklearn
+    """
+
+    def __init__(self, rules_tree):
+        self.rules_tree = rules_tree
+        self.feature_names = rules_tree['feature_names']
+        self.classes_ = np.array(rules_tree['classes'])
+
+    @classmethod
+    def load(cls, filepath=RULES_JSON_FILE):
+        with open(filepath, 'r') as f:
+            return cls(json.load(f))
+
+    def predict_one(self, features):
+        """Prediksi satu sampel (dict nama_fitur -> nilai), return (kelas, confidence)"""
+        node = self.rules_tree['tree']
+        while 'class' not in node:
+            node = node['left'] if features[node['feature']] <= node['threshold'] else node['right']
+        return node['class'], node['confidence']
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return np.array([self.predict_one(dict(zip(self.feature_names, row)))[0] for row in X])
+
+
+def fidelity_report(teacher, rule_model, X_test, y_test):
+    """Fidelity (agreement dengan forest), akurasi, dan latency prediksi"""
+    X_test = np.asarray(X_test, dtype=np.float64)
+    teacher_pred = teacher.predict(X_test)
+    rule_pred = rule_model.predict(X_test)
+
+    rows = [dict(zip(rule_model.feature_names, row)) for row in X_test]
+    start = time.perf_counter()
+    for row in rows:
+        rule_model.predict_one(row)
+    rule_latency = (time.perf_counter() - start) / len(rows) * 1e6
+
+    start = time.perf_counter()
+    for row in X_test[:200]:
+        teacher.predict_proba(row.reshape(1, -1))
+    teacher_latency = (time.perf_counter() - start) / min(len(X_test), 200) * 1e6
+
+    return {
+        'fidelity': float(np.mean(teacher_pred == rule_pred)),
+        'rule_accuracy': float(np.mean(rule_pred == np.asarray(y_test))),
+        'forest_accuracy': float(np.mean(teacher_pred == np.asarray(y_test))),
+        'rule_latency_us': rule_latency,
+        'forest_latency_us': teacher_latency,
+    }
+
+
+def main():
+    """Distilasi model yang di-deploy dan ekspor aturan"""
+    parser = argparse.ArgumentParser(description='Distilasi Random Forest menjadi aturan')
+    parser.add_argument('--model', default='model_gizi_rf.pkl')
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--augment', type=int, default=20000)
+    args = parser.parse_args()
+
+    import joblib
+    from sklearn.model_selection import train_test_split
+    from train_model import load_and_preprocess_data
+    from label_vocab import load_vocabulary, decode_model
+    warnings.filterwarnings('ignore')
+
+    print("=" * 60)
+    print("DISTILASI MODEL - Forest -> Rules")
+    print("=" * 60)
+
+    teacher = decode_model(joblib.load(args.model), load_vocabulary())
+    X, y, _, feature_columns = load_and_preprocess_data()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    rules_tree = distill(teacher, X_train.values, feature_columns,
+                         max_depth=args.max_depth, n_augment=args.augment)
+
+    with open(RULES_JSON_FILE, 'w') as f:
+        json.dump({**rules_tree, 'rules': tree_to_rules(rules_tree)}, f, indent=2)
+    with open(RULES_PY_FILE, 'w') as f:
+        f.write(tree_to_python(rules_tree))
+
+    report = fidelity_report(teacher, RuleModel(rules_tree), X_test.values, y_test)
+
+    print(f"\n🌳 Student tree: depth {rules_tree['max_depth']}, {rules_tree['n_leaves']} rules")
+    print(f"\n🎯 Hasil pada test split ({len(X_test)} sampel):")
+    print(f"  Fidelity ke forest: {report['fidelity'] * 100:.2f}%")
+    print(f"  Akurasi rules:      {report['rule_accuracy'] * 100:.2f}%")
+    print(f"  Akurasi forest:     {report['forest_accuracy'] * 100:.2f}%")
+    print(f"\n⏱ Latency per prediksi:")
+    print(f"  Rules:  {report['rule_latency_us']:.1f} µs")
+    print(f"  Forest: {report['forest_latency_us']:.1f} µs")
+    print(f"\n✓ Rules saved: {RULES_JSON_FILE}, {RULES_PY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
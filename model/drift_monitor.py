@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Drift Monitor - Pemantauan distribusi input & output prediksi secara streaming
+Profil referensi (distribusi data training) disimpan saat training. Setiap
+prediksi hanya menambah counter pada sketch berukuran tetap (histogram di atas
+batas kuantil referensi + sum/sumsq + counter kelas), jadi memori tidak tumbuh
+dan data mentah tidak disimpan. Drift diukur dengan PSI dan KS terhadap referensi.
+
+Profil referensi dibuat di STEP 10 complete_pipline.py atau lewat CLI:
+  python drift_monitor.py dataset_gizi_anak.csv
+Laporan drift live: GET /drift di prediction_server.py
+"""
+
+import json
+import argparse
+import numpy as np
+
+REFERENCE_FILE = 'drift_reference.json'
+
+MONITORED_FEATURES = ['umur_bulan', 'berat_badan', 'tinggi_badan',
+                      'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+
+# Ambang PSI umum: < 0.1 stabil, 0.1-0.25 bergeser sedang, > 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+KS_ALPHA_COEF = 1.36  # alpha = 0.05
+MIN_SAMPLES = 200
+EPS = 1e-4
+
+
+def _proportions(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    return counts / total if total else counts
+
+
+def psi(expected, actual):
+    """Population Stability Index antara dua vektor proporsi"""
+    e = np.clip(expected, EPS, None)
+    a = np.clip(actual, EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_binned(expected, actual):
+    """Statistik KS dari CDF per bin (batas bawah KS sampel penuh)"""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+def build_reference(df, status=None, n_bins=10):
+    """
+    Buat profil referensi dari data training
+
+    Parameters:
+    - df: DataFrame dengan kolom MONITORED_FEATURES
+    - status: Series label status gizi (distribusi kelas referensi)
+    - n_bins: jumlah bin kuantil per fitur
+    """
+    features = {}
+    for name in MONITORED_FEATURES:
+        values = df[name].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'),
+                             minlength=len(edges) + 1)
+        features[name] = {
+            'edges': edges.tolist(),
+            'proportions': _proportions(counts).tolist(),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+        }
+
+    reference = {'n_samples': int(len(df)), 'features': features, 'classes': {}}
+    if status is not None:
+        counts = status.value_counts()
+        reference['classes'] = {str(k): float(v / counts.sum()) for k, v in counts.items()}
+    return reference
+
+
+def save_reference(reference, filepath=REFERENCE_FILE):
+    with open(filepath, 'w') as f:
+        json.dump(reference, f, indent=2)
+
+
+def load_reference(filepath=REFERENCE_FILE):
+    with open(filepath) as f:
+        return json.load(f)
+
+
+class DriftSketch:
+    """
+    Sketch streaming berukuran tetap di satu array float64
+
+    Layout per fitur: [count bin..., n, sum, sumsq], lalu counter per kelas.
+    Array bisa berupa view dari shared memory (RawArray) agar beberapa worker
+    menulis slot masing-masing dan parent cukup menjumlahkan.
+    """
+
+    def __init__(self, reference, buffer=None):
+        self.reference = reference
+        self.edges = [np.asarray(reference['features'][name]['edges'])
+                      for name in MONITORED_FEATURES]
+        self.classes = list(reference['classes'])
+        self.offsets = np.cumsum([0] + [len(e) + 4 for e in self.edges])
+        self.class_offset = int(self.offsets[-1])
+        # Kelas di luar referensi masuk slot terakhir
+        self.size = self.class_offset + len(self.classes) + 1
+        self.data = np.zeros(self.size) if buffer is None else buffer
+
+    @staticmethod
+    def buffer_size(reference):
+        edges = sum(len(f['edges']) + 4 for f in reference['features'].values())
+        return edges + len(reference['classes']) + 1
+
+    def update(self, records, statuses=()):
+        """Tambahkan batch prediksi (list dict input+z-score dan list status)"""
+        for j, name in enumerate(MONITORED_FEATURES):
+            values = np.array([r[name] for r in records if r.get(name) is not None],
+                              dtype=np.float64)
+            if not len(values):
+                continue
+            start, n_bins = self.offsets[j], len(self.edges[j]) + 1
+            bins = np.searchsorted(self.edges[j], values, side='right')
+            self.data[start:start + n_bins] += np.bincount(bins, minlength=n_bins)
+            self.data[start + n_bins:start + n_bins + 3] += [len(values), values.sum(),
+                                                             np.square(values).sum()]
+        for status in statuses:
+            idx = self.classes.index(status) if status in self.classes else len(self.classes)
+            self.data[self.class_offset + idx] += 1
+
+    def report(self, data=None):
+        """Bandingkan sketch (atau jumlah sketch beberapa worker) dengan referensi"""
+        data = self.data if data is None else data
+        n_ref = self.reference['n_samples']
+        features = {}
+        for j, name in enumerate(MONITORED_FEATURES):
+            ref = self.reference['features'][name]
+            start, n_bins = self.offsets[j], len(self.edges[j]) + 1
+            counts = data[start:start + n_bins]
+            n, total, sumsq = data[start + n_bins:start + n_bins + 3]
+            if n == 0:
+                features[name] = {'n': 0}
+                continue
+            live = _proportions(counts)
+            expected = np.asarray(ref['proportions'])
+            mean = total / n
+            std = np.sqrt(max(sumsq / n - mean * mean, 0.0))
+            ks = ks_binned(expected, live)
+            ks_critical = KS_ALPHA_COEF * np.sqrt((n + n_ref) / (n * n_ref))
+            value = psi(expected, live)
+            features[name] = {
+                'n': int(n),
+                'psi': round(value, 4),
+                'ks': round(ks, 4),
+                'ks_critical': round(float(ks_critical), 4),
+                'mean': round(float(mean), 3),
+                'std': round(float(std), 3),
+                'mean_shift_sd': round(float((mean - ref['mean']) / ref['std']), 3)
+                                 if ref['std'] else None,
+                'drift': bool(n >= MIN_SAMPLES and (value > PSI_DRIFT or ks > ks_critical)),
+                'warning': bool(n >= MIN_SAMPLES and value > PSI_WARNING),
+            }
+
+        class_counts = data[self.class_offset:self.class_offset + len(self.classes) + 1]
+        n_pred = int(class_counts.sum())
+        classes = {'n': n_pred}
+        if n_pred and self.classes:
+            live = _proportions(class_counts[:-1])
+            expected = np.asarray([self.reference['classes'][c] for c in self.classes])
+            value = psi(expected, live)
+            classes.update({
+                'psi': round(value, 4),
+                'frequencies': {c: round(float(p), 4) for c, p in zip(self.classes, live)},
+                'unknown_class': int(class_counts[-1]),
+                'drift': bool(n_pred >= MIN_SAMPLES and value > PSI_DRIFT),
+            })
+
+        drifted = [name for name, f in features.items() if f.get('drift')]
+        if classes.get('drift'):
+            drifted.append('status_gizi')
+        return {'drift_detected': bool(drifted), 'drifted': drifted,
+                'features': features, 'predictions': classes}
+
+
+def main():
+    """Buat profil referensi dari CSV training"""
+    parser = argparse.ArgumentParser(description='Profil referensi untuk drift monitoring')
+    parser.add_argument('csv_files', nargs='+')
+    parser.add_argument('--output', default=REFERENCE_FILE)
+    args = parser.parse_args()
+
+    from schema_loader import load_corpora
+    df = load_corpora(args.csv_files)
+    reference = build_reference(df, df['status_gizi'])
+    save_reference(reference, args.output)
+    print(f"✓ Drift reference saved: {args.output} ({reference['n_samples']} samples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Early Exit - Prediksi Random Forest "anytime" dengan berhenti saat vote sudah pasti
+Tree dievaluasi per chunk. Setiap tree menyumbang paling banyak 1 ke probabilitas
+kelas mana pun, jadi jika selisih kelas teratas dan kedua > jumlah tree tersisa,
+argmax hasil akhir tidak mungkin berubah dan sisa tree dilewati untuk sampel itu.
+Budget latency opsional menghentikan evaluasi lebih awal (hasil parsial).
+
+Usage:
+  python early_exit.py                         # benchmark speedup + agreement
+  python early_exit.py --chunk-size 10 --budget-ms 5
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from compact_forest import CompactForest
+
+CHUNK_SIZE = 20
+
+
+class AnytimeForest:
+    """
+    Evaluasi RandomForestClassifier / CompactForest per chunk tree dengan early
+    exit per sampel
+
+    Parameters:
+    - model: RandomForestClassifier atau CompactForest, atau CalibratedModel
+      (kalibrasi diterapkan ke probabilitas parsial)
+    - chunk_size: jumlah tree per langkah sebelum cek margin
+    """
+
+    def __init__(self, model, chunk_size=CHUNK_SIZE):
+        self.calibration = getattr(model, 'table', None)
+        model = getattr(model, 'model', model)
+        self.classes_ = model.classes_
+        self.chunk_size = chunk_size
+        self._compact = model if isinstance(model, CompactForest) else None
+        if self._compact is not None:
+            self._n_trees = model.n_estimators
+            return
+
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not all(hasattr(est, 'tree_') for est in estimators):
+            raise ValueError(f"Model {type(model).__name__} tidak didukung untuk early exit")
+        self._trees = [est.tree_ for est in estimators]
+        self._n_trees = len(self._trees)
+        self._leaf_proba = []
+        for tree in self._trees:
+            value = tree.value[:, 0, :]
+            self._leaf_proba.append(value / value.sum(axis=1, keepdims=True))
+
+    @property
+    def n_estimators(self):
+        return self._n_trees
+
+    def _chunk_sum(self, X, begin, end):
+        """Jumlah probabilitas leaf tree [begin, end) untuk setiap sampel"""
+        if self._compact is not None:
+            leaves = self._compact.apply(X, slice(begin, end))
+            return self._compact.leaf_proba(leaves).sum(axis=1)
+        return sum(self._leaf_proba[t][self._trees[t].apply(X)] for t in range(begin, end))
+
+    def predict_proba(self, X, budget_ms=None, early_exit=True):
+        """
+        Return: (probabilitas, jumlah tree yang dievaluasi per sampel,
+                 decided: kelas teratas sudah pasti sama dengan evaluasi penuh)
+        """
+        start = time.perf_counter()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_trees = self.n_estimators
+        totals = np.zeros((len(X), len(self.classes_)))
+        trees_used = np.zeros(len(X), dtype=np.int64)
+        active = np.arange(len(X))
+        decided = np.zeros(len(X), dtype=bool)
+
+        for begin in range(0, n_trees, self.chunk_size):
+            end = min(begin + self.chunk_size, n_trees)
+            totals[active] += self._chunk_sum(X[active], begin, end)
+            trees_used[active] = end
+
+            if end == n_trees:
+                decided[active] = True
+                break
+            if early_exit:
+                top2 = np.partition(totals[active], -2, axis=1)[:, -2:]
+                settled = top2[:, 1] - top2[:, 0] > n_trees - end
+                decided[active[settled]] = True
+                active = active[~settled]
+            if not len(active):
+                break
+            if budget_ms is not None and (time.perf_counter() - start) * 1000 >= budget_ms:
+                break
+
+        proba = totals / trees_used[:, None]
+        if self.calibration is not None:
+            proba = self.calibration.transform(proba)
+        return proba, trees_used, decided
+
+    def predict(self, X, budget_ms=None):
+        proba, trees_used, decided = self.predict_proba(X, budget_ms)
+        return self.classes_[proba.argmax(axis=1)], trees_used, decided
+
+
+def _time_ms(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def benchmark(model, X, chunk_size=CHUNK_SIZE, budget_ms=None, n_single=200, repeat=5):
+    """
+    Bandingkan early exit vs evaluasi semua tree (batch dan 1 data)
+
+    Return: dict hasil benchmark
+    """
+    anytime = AnytimeForest(model, chunk_size)
+    full_pred = model.predict(X)
+    pred, trees_used, decided = anytime.predict(X, budget_ms)
+
+    singles = [X[i:i + 1] for i in range(min(n_single, len(X)))]
+    return {
+        'n_samples': len(X),
+        'n_estimators': anytime.n_estimators,
+        'mean_trees_used': float(trees_used.mean()),
+        'early_exit_rate': float((trees_used < anytime.n_estimators).mean()),
+        'decided_rate': float(decided.mean()),
+        'agreement': float((pred == full_pred).mean()),
+        'batch_full_ms': _time_ms(lambda: model.predict_proba(X), repeat),
+        'batch_all_trees_ms': _time_ms(lambda: anytime.predict_proba(X, early_exit=False), repeat),
+        'batch_early_ms': _time_ms(lambda: anytime.predict_proba(X, budget_ms), repeat),
+        'single_full_ms': _time_ms(lambda: [model.predict_proba(x) for x in singles], 1) / len(singles),
+        'single_all_trees_ms': _time_ms(
+            lambda: [anytime.predict_proba(x, early_exit=False) for x in singles], 1) / len(singles),
+        'single_early_ms': _time_ms(lambda: [anytime.predict_proba(x, budget_ms) for x in singles], 1) / len(singles),
+    }
+
+
+def main():
+    """Benchmark early exit pada model aktif dan dataset training"""
+    from predict_gizi import load_model
+
+    parser = argparse.ArgumentParser(description='Benchmark early exit Random Forest')
+    parser.add_argument('--dataset', default='dataset_gizi_anak.csv')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    model, le_gender, metadata = load_model()
+    df = pd.read_csv(args.dataset)
+    df['jenis_kelamin_encoded'] = le_gender.transform(df['jenis_kelamin'])
+    X = df[metadata['feature_columns']].to_numpy()
+
+    r = benchmark(model, X, args.chunk_size, args.budget_ms)
+
+    print("=" * 60)
+    print("EARLY EXIT BENCHMARK")
+    print("=" * 60)
+    print(f"Data                : {r['n_samples']} sampel, {r['n_estimators']} tree, chunk {args.chunk_size}")
+    print(f"Rata-rata tree      : {r['mean_trees_used']:.1f} ({r['early_exit_rate']*100:.1f}% sampel exit lebih awal)")
+    print(f"Decided             : {r['decided_rate']*100:.2f}%")
+    print(f"Agreement vs full   : {r['agreement']*100:.2f}%")
+    print(f"Batch predict_proba : {r['batch_full_ms']:.1f} ms")
+    print(f"Batch semua tree    : {r['batch_all_trees_ms']:.1f} ms")
+    print(f"Batch early exit    : {r['batch_early_ms']:.1f} ms "
+          f"({r['batch_all_trees_ms']/r['batch_early_ms']:.1f}x)")
+    print(f"1 data predict_proba: {r['single_full_ms']:.2f} ms")
+    print(f"1 data semua tree   : {r['single_all_trees_ms']:.2f} ms")
+    print(f"1 data early exit   : {r['single_early_ms']:.2f} ms "
+          f"({r['single_all_trees_ms']/r['single_early_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Explain - Kontribusi fitur per prediksi dari dekomposisi jalur tree (Saabas)
+Setiap split di jalur root -> leaf menggeser distribusi kelas; pergeseran itu
+diatribusikan ke fitur split. Total kontribusi per leaf dihitung sekali saat
+explainer dibuat, sehingga explain() hanya apply() + gather + mean, dengan
+biaya setara satu predict_proba.
+
+Berlaku untuk model sklearn berbasis tree (RandomForest / DecisionTree) dan
+CompactForest (compact_forest.py).
+Kontribusi menjelaskan probabilitas forest mentah (sebelum kalibrasi):
+bias + sum(kontribusi) == predict_proba forest.
+
+Usage:
+  python explain.py                       # benchmark latency + cek aditivitas
+  python explain.py --budget-ms 20 --batch 64
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from compact_forest import CompactForest
+
+
+class PathExplainer:
+    """
+    Tabel kontribusi (leaf, fitur, kelas) untuk seluruh tree di forest
+
+    Parameters:
+    - model: RandomForestClassifier / DecisionTreeClassifier yang sudah di-fit,
+      CompactForest, atau wrapper dengan atribut `model` (mis. CalibratedModel)
+    """
+
+    def __init__(self, model):
+        model = getattr(model, 'model', model)
+        self.model = model
+        self.classes_ = model.classes_
+        self.n_features = model.n_features_in_
+        n_classes = len(self.classes_)
+
+        if isinstance(model, CompactForest):
+            # apply() CompactForest sudah mengembalikan id node global
+            left, right, feature, value = model.node_arrays()
+            roots = model.arrays['roots']
+            self._offsets = np.zeros(len(roots), dtype=np.intp)
+        else:
+            estimators = getattr(model, 'estimators_', [model])
+            if not all(hasattr(est, 'tree_') for est in estimators):
+                raise ValueError(f"Model {type(model).__name__} tidak didukung untuk explanation")
+            trees = [est.tree_ for est in estimators]
+            sizes = np.array([tree.node_count for tree in trees])
+            self._offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+            # Semua tree digabung: id node global = offset tree + id lokal
+            left = np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1)
+                                   for t, o in zip(trees, self._offsets)])
+            right = np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1)
+                                    for t, o in zip(trees, self._offsets)])
+            feature = np.concatenate([t.feature for t in trees])
+            value = np.concatenate([t.value[:, 0, :] for t in trees])
+            roots = self._offsets
+        value = value / value.sum(axis=1, keepdims=True)
+
+        self.bias = value[roots].mean(axis=0)
+
+        # Akumulasi kontribusi top-down, satu level kedalaman per iterasi
+        cum = np.zeros((len(value), self.n_features, n_classes), dtype=np.float64)
+        frontier = roots
+        while len(frontier):
+            frontier = frontier[left[frontier] >= 0]
+            for child in (left[frontier], right[frontier]):
+                cum[child] = cum[frontier]
+                cum[child, feature[frontier]] += value[child] - value[frontier]
+            frontier = np.concatenate([left[frontier], right[frontier]])
+
+        is_leaf = left < 0
+        self._leaf_row = np.full(len(value), -1, dtype=np.int32)
+        self._leaf_row[is_leaf] = np.arange(is_leaf.sum())
+        self._leaf_contrib = cum[is_leaf].astype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self._leaf_contrib.nbytes + self._leaf_row.nbytes
+
+    def explain(self, X):
+        """
+        Kontribusi untuk batch X
+
+        Return: array (n_samples, n_features, n_classes), dijumlah dengan self.bias
+        sama dengan predict_proba forest
+        """
+        leaves = self.model.apply(X)
+        if leaves.ndim == 1:
+            leaves = leaves[:, None]
+        rows = self._leaf_row[leaves + self._offsets]
+        return self._leaf_contrib[rows].mean(axis=1, dtype=np.float64)
+
+    def explain_records(self, X, class_indices, feature_names, top_k=None):
+        """
+        Explanation siap JSON untuk kelas yang diprediksi (dalam persen);
+        base + sum(contributions) == forest_probability (sebelum kalibrasi)
+
+        Parameters:
+        - class_indices: index kelas yang dijelaskan per sampel
+        - top_k: hanya k fitur dengan |kontribusi| terbesar (None = semua)
+        """
+        contributions = self.explain(X)
+        results = []
+        for contrib, k in zip(contributions, class_indices):
+            per_feature = contrib[:, k]
+            order = np.argsort(-np.abs(per_feature))[:top_k]
+            results.append({
+                'class': str(self.classes_[k]),
+                'base': round(float(self.bias[k] * 100), 2),
+                'forest_probability': round(float((self.bias[k] + per_feature.sum()) * 100), 2),
+                'contributions': {feature_names[j]: round(float(per_feature[j] * 100), 2)
+                                  for j in order},
+            })
+        return results
+
+
+def benchmark(explainer, X, batch_size=64, repeat=50):
+    """Latency explain() untuk 1 data dan satu batch (ms)"""
+    single = X[:1]
+    batch = X[:batch_size]
+    explainer.explain(single)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        explainer.explain(single)
+    single_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        explainer.explain(batch)
+    batch_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        explainer.model.predict_proba(single)
+    predict_ms = (time.perf_counter() - start) * 1000 / repeat
+    return single_ms, batch_ms, predict_ms
+
+
+def main():
+    """Benchmark explainer pada model aktif dan dataset training"""
+    from predict_gizi import load_model
+
+    parser = argparse.ArgumentParser(description='Benchmark explanation kontribusi fitur')
+    parser.add_argument('--dataset', default='dataset_gizi_anak.csv')
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--budget-ms', type=float, default=20.0,
+                        help='Budget latency explain() untuk 1 data')
+    args = parser.parse_args()
+
+    model, le_gender, metadata = load_model()
+    start = time.perf_counter()
+    explainer = PathExplainer(model)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    df = pd.read_csv(args.dataset)
+    df['jenis_kelamin_encoded'] = le_gender.transform(df['jenis_kelamin'])
+    X = df[metadata['feature_columns']].to_numpy()
+
+    contributions = explainer.explain(X[:args.batch])
+    raw = explainer.model.predict_proba(X[:args.batch])
+    max_error = np.abs(explainer.bias + contributions.sum(axis=1) - raw).max()
+    single_ms, batch_ms, predict_ms = benchmark(explainer, X, args.batch)
+
+    print("=" * 60)
+    print("EXPLANATION BENCHMARK")
+    print("=" * 60)
+    print(f"Build explainer     : {build_ms:.1f} ms ({explainer.nbytes/1024:.0f} KB)")
+    print(f"Aditivitas (maks err): {max_error:.2e}")
+    print(f"predict_proba 1 data: {predict_ms:.2f} ms")
+    print(f"explain 1 data      : {single_ms:.2f} ms")
+    print(f"explain {args.batch} data     : {batch_ms:.2f} ms ({batch_ms/args.batch:.3f} ms/data)")
+    if single_ms <= args.budget_ms:
+        print(f"✓ Dalam budget {args.budget_ms:.0f} ms")
+    else:
+        print(f"⚠ Melebihi budget {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
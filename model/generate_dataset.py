@@ -8,6 +8,8 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import random
+from who_standards import who_params
+from status_rules import status_gizi
 
 # Standar WHO Z-Score untuk klasifikasi
 # BB/U (Berat Badan per Umur)
@@ -34,53 +36,18 @@ def klasifikasi_bb_tb(z_score):
     return 'Obesitas'
 
 # Tentukan status gizi keseluruhan
+# Prioritas: Gizi Buruk > Gizi Kurang > Stunting > Gizi Lebih (profil 'dataset' di status_rules.py)
 def tentukan_status_gizi(z_bb_u, z_tb_u, z_bb_tb):
-    kat_bb_u = klasifikasi_bb_u(z_bb_u)
-    kat_tb_u = klasifikasi_tb_u(z_tb_u)
-    kat_bb_tb = klasifikasi_bb_tb(z_bb_tb)
-    
-    # Prioritas: Gizi Buruk > Gizi Kurang > Stunting > Wasting
-    if kat_bb_u == 'Gizi Buruk' or kat_bb_tb == 'Sangat Kurus':
-        return 'Gizi Buruk'
-    elif kat_bb_u == 'Gizi Kurang' or kat_bb_tb == 'Kurus':
-        return 'Gizi Kurang'
-    elif kat_tb_u in ['Sangat Pendek', 'Pendek']:
-        return 'Stunting'
-    elif kat_bb_u == 'Gizi Lebih' or kat_bb_tb in ['Gemuk', 'Obesitas']:
-        return 'Gizi Lebih'
-    else:
-        return 'Gizi Baik'
+    return status_gizi(z_bb_u, z_tb_u, z_bb_tb, 'dataset')
 
-# Standar WHO median dan SD (simplified version)
+# Standar WHO median dan SD (simplified version, koefisien di who_standards.py)
 # Untuk dataset lengkap, gunakan tabel WHO resmi
 def get_who_standard(jenis_kelamin, umur_bulan, indikator):
     """
     Mendapatkan median dan SD dari standar WHO
     Data ini adalah aproksimasi, untuk produksi gunakan tabel WHO lengkap
     """
-    
-    if indikator == 'BB/U':  # Berat badan (kg)
-        if jenis_kelamin == 'L':  # Laki-laki
-            median = 3.3 + (umur_bulan * 0.15)
-            sd = 0.4 + (umur_bulan * 0.01)
-        else:  # Perempuan
-            median = 3.2 + (umur_bulan * 0.14)
-            sd = 0.4 + (umur_bulan * 0.01)
-    
-    elif indikator == 'TB/U':  # Tinggi badan (cm)
-        if jenis_kelamin == 'L':
-            median = 49.9 + (umur_bulan * 1.1)
-            sd = 1.9 + (umur_bulan * 0.02)
-        else:
-            median = 49.1 + (umur_bulan * 1.0)
-            sd = 1.9 + (umur_bulan * 0.02)
-    
-    elif indikator == 'BB/TB':  # Berat per tinggi
-        # Simplified - seharusnya berdasarkan tinggi badan
-        median = 15 + (umur_bulan * 0.05)
-        sd = 1.2
-    
-    return median, sd
+    return who_params(jenis_kelamin, umur_bulan, indikator)
 
 # Generate dataset
 def generate_dataset(n_samples=5000):
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Growth History - Riwayat pertumbuhan per anak (time series longitudinal)
+Setiap anak punya array append-only yang ringkas (float32), diindeks dengan
+child ID. Fitur kecepatan pertumbuhan dan tren z-score dihitung secara
+inkremental saat kunjungan baru dicatat, tanpa membaca ulang seluruh riwayat.
+
+Tabel sumber: data_anak (satu baris per kunjungan) + hasil_diagnosa.
+
+Usage:
+  python growth_history.py rebuild [--sqlite FILE]   # rebuild penuh dari database
+  python growth_history.py add '<json diagnosa>'     # dipanggil result.php
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from aggregation import snapshot_lock
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'growth_history.npz')
+
+FIELDS = ['hari', 'umur_bulan', 'berat_badan', 'tinggi_badan',
+          'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+Z_FIELDS = FIELDS[4:]
+COL = {name: i for i, name in enumerate(FIELDS)}
+
+# Statistik berjalan untuk regresi linear z-score terhadap umur, terpisah per
+# kolom z-score (z_score_* di hasil_diagnosa boleh NULL, kunjungan itu dilewati):
+# n (3), sum_t (3), sum_tt (3), sum_z (3), sum_tz (3)
+N_STATS = 5 * len(Z_FIELDS)
+
+# Penurunan z-score BB/U >= 0.67 SD antar kunjungan = memotong satu garis persentil utama
+FALTERING_Z_DROP = 0.67
+DAYS_PER_MONTH = 30.4375
+
+HISTORY_QUERY = """
+SELECT d.nama_anak, d.tanggal_lahir, d.jenis_kelamin, d.umur_bulan,
+       d.berat_badan, d.tinggi_badan,
+       h.z_score_bb_u, h.z_score_tb_u, h.z_score_bb_tb, h.tanggal_diagnosa
+FROM data_anak d
+JOIN hasil_diagnosa h ON h.data_anak_id = d.id
+"""
+
+
+def child_key(nama_anak, tanggal_lahir, jenis_kelamin):
+    """ID anak; data_anak menyimpan baris baru per kunjungan tanpa ID anak tetap"""
+    return f"{str(nama_anak).strip().lower()}|{str(tanggal_lahir)[:10]}|{jenis_kelamin}"
+
+
+def _day_number(values):
+    """Tanggal -> nomor hari (sejak 1970-01-01), NaN bila kosong"""
+    dates = pd.to_datetime(values, format='mixed', errors='coerce')
+    days = dates.to_numpy().astype('datetime64[D]').astype(np.int64).astype(np.float64)
+    days[dates.isna().to_numpy()] = np.nan
+    return days
+
+
+def _regression_stats(t, z):
+    """Statistik regresi per kunjungan, shape (n, N_STATS); z NaN tidak dihitung"""
+    valid = ~np.isnan(z) & ~np.isnan(t)[:, None]
+    t = np.where(valid, t[:, None], 0.0)
+    z = np.where(valid, z, 0.0)
+    return np.hstack([valid.astype(np.float64), t, t * t, z, t * z])
+
+
+def _slopes(state):
+    """Kemiringan z-score per bulan dari statistik berjalan (NaN jika < 2 kunjungan valid)"""
+    n, st, stt, sz, stz = state.reshape(5, len(Z_FIELDS))
+    denom = n * stt - st * st
+    ok = (n >= 2) & (denom > 0)
+    slopes = np.full(len(Z_FIELDS), np.nan)
+    slopes[ok] = (n[ok] * stz[ok] - st[ok] * sz[ok]) / denom[ok]
+    return slopes
+
+
+class GrowthHistory:
+    """
+    Store riwayat kunjungan per anak dengan fitur pertumbuhan inkremental
+    """
+
+    def __init__(self):
+        self.index = {}       # child_id -> slot
+        self.child_ids = []
+        self.buffers = []     # per slot: array (capacity, len(FIELDS)) float32
+        self.lengths = []
+        self.state = np.zeros((0, N_STATS))
+
+    def __len__(self):
+        return len(self.child_ids)
+
+    def _slot(self, child_id):
+        slot = self.index.get(child_id)
+        if slot is None:
+            slot = len(self.child_ids)
+            self.index[child_id] = slot
+            self.child_ids.append(child_id)
+            self.buffers.append(np.empty((4, len(FIELDS)), dtype=np.float32))
+            self.lengths.append(0)
+            if slot == len(self.state):
+                grown = np.zeros((max(16, 2 * slot), N_STATS))
+                grown[:slot] = self.state
+                self.state = grown
+        return slot
+
+    def add_visit(self, child_id, umur_bulan, berat_badan, tinggi_badan,
+                  z_score_bb_u, z_score_tb_u, z_score_bb_tb, tanggal=None):
+        """
+        Catat kunjungan baru dan return fitur pertumbuhan (O(1) per kunjungan)
+
+        Parameters:
+        - tanggal: tanggal kunjungan (opsional), dipakai bila umur_bulan sama
+        """
+        hari = _day_number(pd.Series([tanggal]))[0] if tanggal is not None else np.nan
+        row = np.array([hari, umur_bulan, berat_badan, tinggi_badan,
+                        z_score_bb_u, z_score_tb_u, z_score_bb_tb], dtype=np.float32)
+
+        slot = self._slot(child_id)
+        n = self.lengths[slot]
+        previous = self.buffers[slot][n - 1].copy() if n else None
+
+        # Append (kapasitas digandakan bila penuh)
+        if n == len(self.buffers[slot]):
+            grown = np.empty((max(4, 2 * n), len(FIELDS)), dtype=np.float32)
+            grown[:n] = self.buffers[slot][:n]
+            self.buffers[slot] = grown
+        self.buffers[slot][n] = row
+        self.lengths[slot] = n + 1
+
+        state = self.state[slot]
+        state += _regression_stats(np.array([float(umur_bulan)]), row[None, 4:].astype(np.float64))[0]
+
+        return self._features(row, previous, state, n + 1)
+
+    @staticmethod
+    def _features(row, previous, state, n_visits):
+        features = {'n_kunjungan': n_visits}
+        slopes = _slopes(state)
+        for name, slope in zip(Z_FIELDS, slopes):
+            features[f'slope_{name}'] = None if np.isnan(slope) else round(float(slope), 4)
+
+        if previous is None:
+            features.update({'interval_bulan': None, 'velocity_bb': None, 'velocity_tb': None,
+                             'weight_faltering': False})
+            for name in Z_FIELDS:
+                features[f'delta_{name}'] = None
+            return features
+
+        interval = float(row[COL['umur_bulan']] - previous[COL['umur_bulan']])
+        if interval <= 0 and not np.isnan(row[0] - previous[0]):
+            interval = float(row[0] - previous[0]) / DAYS_PER_MONTH
+        delta = row - previous
+        features['interval_bulan'] = round(interval, 2)
+        features['velocity_bb'] = (round(float(delta[COL['berat_badan']]) / interval, 3)
+                                   if interval > 0 else None)
+        features['velocity_tb'] = (round(float(delta[COL['tinggi_badan']]) / interval, 3)
+                                   if interval > 0 else None)
+        for name in Z_FIELDS:
+            features[f'delta_{name}'] = (None if np.isnan(delta[COL[name]])
+                                         else round(float(delta[COL[name]]), 3))
+        features['weight_faltering'] = bool(delta[COL['z_score_bb_u']] <= -FALTERING_Z_DROP)
+        return features
+
+    def history(self, child_id):
+        """Riwayat kunjungan satu anak sebagai dict nama_kolom -> array"""
+        slot = self.index.get(child_id)
+        if slot is None:
+            return None
+        data = self.buffers[slot][:self.lengths[slot]]
+        return {name: data[:, i] for i, name in enumerate(FIELDS)}
+
+    def trajectory(self, child_id):
+        """Kemiringan z-score (per bulan) seluruh riwayat, dari statistik berjalan"""
+        slot = self.index.get(child_id)
+        if slot is None:
+            return None
+        return dict(zip(Z_FIELDS, _slopes(self.state[slot]).tolist()))
+
+    @classmethod
+    def from_records(cls, df):
+        """
+        Bulk build dari DataFrame kunjungan (kolom child_id + FIELDS kecuali 'hari',
+        opsional 'tanggal'), tanpa loop per kunjungan
+        """
+        df = df.copy()
+        df['hari'] = _day_number(df['tanggal']) if 'tanggal' in df.columns else np.nan
+        df = df.sort_values(['child_id', 'umur_bulan', 'hari'], kind='stable')
+
+        ids, starts = np.unique(df['child_id'].to_numpy(), return_index=True)
+        data = df[FIELDS].to_numpy(dtype=np.float32)
+        t = df['umur_bulan'].to_numpy(dtype=np.float64)
+        z = data[:, 4:].astype(np.float64)
+
+        # Statistik regresi per anak via reduceat (satu pass vektor)
+        state = (np.add.reduceat(_regression_stats(t, z), starts, axis=0) if len(df)
+                 else np.zeros((0, N_STATS)))
+
+        history = cls()
+        history.child_ids = ids.tolist()
+        history.index = {child_id: i for i, child_id in enumerate(history.child_ids)}
+        ends = np.append(starts[1:], len(df))
+        history.buffers = [data[s:e] for s, e in zip(starts, ends)]
+        history.lengths = (ends - starts).tolist()
+        history.state = state
+        return history
+
+    @classmethod
+    def from_db(cls, conn):
+        """Rebuild seluruh riwayat dari database (koneksi DB-API: pymysql/sqlite3)"""
+        cursor = conn.cursor()
+        cursor.execute(HISTORY_QUERY)
+        columns = [c[0] for c in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=columns)
+        cursor.close()
+
+        df['child_id'] = [child_key(*row) for row in
+                          df[['nama_anak', 'tanggal_lahir', 'jenis_kelamin']].itertuples(index=False)]
+        df = df.rename(columns={'tanggal_diagnosa': 'tanggal'})
+        for col in FIELDS[1:]:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        return cls.from_records(df)
+
+    def save(self, filepath=HISTORY_FILE):
+        """Simpan secara atomik dalam layout CSR: satu array data + offsets per anak"""
+        parts = [buf[:n] for buf, n in zip(self.buffers, self.lengths)]
+        data = np.concatenate(parts) if parts else np.zeros((0, len(FIELDS)), np.float32)
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.growth_history.', suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(f,
+                                child_ids=np.array(self.child_ids, dtype=str),
+                                offsets=np.concatenate([[0], np.cumsum(self.lengths)]).astype(np.int64),
+                                data=data, state=self.state[:len(self.child_ids)])
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath=HISTORY_FILE):
+        with np.load(filepath, allow_pickle=False) as f:
+            ids, offsets, data, state = f['child_ids'], f['offsets'], f['data'], f['state']
+        history = cls()
+        history.child_ids = ids.tolist()
+        history.index = {child_id: i for i, child_id in enumerate(history.child_ids)}
+        history.buffers = [data[s:e] for s, e in zip(offsets[:-1], offsets[1:])]
+        history.lengths = np.diff(offsets).tolist()
+        if state.shape[1] != N_STATS:
+            # File format lama (statistik gabungan): hitung ulang dari riwayat kunjungan
+            state = (np.add.reduceat(_regression_stats(data[:, COL['umur_bulan']].astype(np.float64),
+                                                       data[:, 4:].astype(np.float64)),
+                                     offsets[:-1], axis=0) if len(data) else np.zeros((0, N_STATS)))
+        history.state = state
+        return history
+
+
+def add_diagnosa(diagnosa, filepath=HISTORY_FILE):
+    """
+    Catat satu diagnosa baru sebagai kunjungan di file riwayat
+
+    Return: fitur pertumbuhan kunjungan itu, None jika riwayat belum di-rebuild
+    (riwayat dari nol akan kehilangan kunjungan lama di database)
+    """
+    if not os.path.exists(filepath):
+        return None
+    child_id = child_key(diagnosa['nama_anak'], diagnosa['tanggal_lahir'], diagnosa['jenis_kelamin'])
+    z = [np.nan if diagnosa.get(name) is None else float(diagnosa[name]) for name in Z_FIELDS]
+    with snapshot_lock(filepath):
+        history = GrowthHistory.load(filepath)
+        features = history.add_visit(child_id, float(diagnosa['umur_bulan']), float(diagnosa['berat_badan']),
+                                     float(diagnosa['tinggi_badan']), *z,
+                                     tanggal=diagnosa.get('tanggal_diagnosa'))
+        history.save(filepath)
+    return features
+
+
+def main():
+    """CLI rebuild / add riwayat pertumbuhan"""
+    parser = argparse.ArgumentParser(description='Riwayat pertumbuhan per anak')
+    parser.add_argument('--history', default=HISTORY_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_rebuild = sub.add_parser('rebuild', help='Rebuild penuh dari database')
+    p_rebuild.add_argument('--sqlite', help='Gunakan file SQLite alih-alih MySQL')
+    p_rebuild.add_argument('--host', default='localhost')
+    p_rebuild.add_argument('--user', default='root')
+    p_rebuild.add_argument('--password', default='')
+    p_rebuild.add_argument('--database', default='gizi_db')
+    p_add = sub.add_parser('add', help='Tambah satu diagnosa (JSON) dan tampilkan fitur pertumbuhan')
+    p_add.add_argument('diagnosa_json')
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        try:
+            features = add_diagnosa(json.loads(args.diagnosa_json), args.history)
+        except (ValueError, KeyError, TypeError) as e:
+            print(json.dumps({'error': f'Invalid input: {e}'}))
+            sys.exit(1)
+        if features is None:
+            print(json.dumps({'success': True, 'skipped': f'riwayat belum di-rebuild: {args.history}'}))
+            return
+        print(json.dumps({'success': True, 'features': features}))
+        return
+
+    if args.sqlite:
+        import sqlite3
+        conn = sqlite3.connect(args.sqlite)
+    elif pymysql is None:
+        print("✗ Error: pymysql belum terinstall (pip install pymysql)")
+        sys.exit(1)
+    else:
+        conn = pymysql.connect(host=args.host, user=args.user, password=args.password,
+                               database=args.database)
+
+    history = GrowthHistory.from_db(conn)
+    conn.close()
+    with snapshot_lock(args.history):
+        history.save(args.history)
+
+    visits = sum(history.lengths)
+    print(f"✓ Growth history rebuilt: {len(history)} anak, {visits} kunjungan")
+    print(f"  Saved: {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Histogram Gradient Boosting - Alternatif GradientBoostingClassifier di model zoo
+Fitur di-bin sekali (batas kuantil maks. 255 bin, uint8) dan batas bin ikut
+sebagai parameter estimator, sehingga clone() di setiap fold CV memakai binning
+yang sama. Boosting memakai HistGradientBoostingClassifier (multithread OpenMP;
+jumlah thread saat fit dibatasi lewat n_jobs sesuai core budget STEP 6).
+"""
+
+import time
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score
+from threadpoolctl import threadpool_limits
+
+MAX_BINS = 255
+
+
+def compute_bin_edges(X, max_bins=MAX_BINS):
+    """Batas bin kuantil per fitur (dihitung sekali, dipakai ulang di semua fold)"""
+    X = np.asarray(X, dtype=np.float64)
+    edges = []
+    for j in range(X.shape[1]):
+        column = X[:, j][~np.isnan(X[:, j])]
+        distinct = np.unique(column)
+        if len(distinct) <= max_bins:
+            cut = (distinct[:-1] + distinct[1:]) / 2
+        else:
+            cut = np.unique(np.quantile(column, np.linspace(0, 1, max_bins + 1)[1:-1]))
+        edges.append(cut)
+    return edges
+
+
+def apply_bins(X, bin_edges):
+    """Transformasi ke kode bin uint8"""
+    X = np.asarray(X, dtype=np.float64)
+    binned = np.empty(X.shape, dtype=np.uint8)
+    for j, cut in enumerate(bin_edges):
+        binned[:, j] = np.searchsorted(cut, X[:, j], side='right')
+    return binned
+
+
+class SharedBinHistGradientBoosting(ClassifierMixin, BaseEstimator):
+    """
+    HistGradientBoostingClassifier di atas data yang sudah di-bin dengan batas tetap
+
+    Parameters:
+    - bin_edges: hasil compute_bin_edges(); None = dihitung dari data fit
+    - n_jobs: batas thread OpenMP saat fit (None = semua core)
+    """
+
+    def __init__(self, bin_edges=None, max_iter=150, learning_rate=0.1, max_depth=7,
+                 max_leaf_nodes=31, l2_regularization=0.0, early_stopping=False,
+                 random_state=None, n_jobs=None):
+        self.bin_edges = bin_edges
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.max_leaf_nodes = max_leaf_nodes
+        self.l2_regularization = l2_regularization
+        self.early_stopping = early_stopping
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def _binned(self, X):
+        return apply_bins(X, self.bin_edges_)
+
+    def _thread_limit(self):
+        # threadpool_limits memindai library yang dimuat (~10 ms), jadi hanya dipakai saat fit
+        if self.n_jobs is None:
+            return nullcontext()
+        return threadpool_limits(limits=self.n_jobs, user_api='openmp')
+
+    def fit(self, X, y):
+        self.bin_edges_ = self.bin_edges if self.bin_edges is not None else compute_bin_edges(X)
+        self.booster_ = HistGradientBoostingClassifier(
+            max_iter=self.max_iter,
+            learning_rate=self.learning_rate,
+            max_depth=self.max_depth,
+            max_leaf_nodes=self.max_leaf_nodes,
+            l2_regularization=self.l2_regularization,
+            early_stopping=self.early_stopping,
+            random_state=self.random_state,
+        )
+        with self._thread_limit():
+            self.booster_.fit(self._binned(X), y)
+        self.classes_ = self.booster_.classes_
+        return self
+
+    def predict_proba(self, X):
+        return self.booster_.predict_proba(self._binned(X))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compare_boosting(models, fit_times, X_test, y_test, n_latency=200):
+    """
+    Bandingkan fit time, latency prediksi, dan akurasi model yang sudah dilatih
+
+    Parameters:
+    - models: dict nama -> model terlatih
+    - fit_times: dict nama -> waktu fit (detik), mis. dari train_model_zoo()
+
+    Return: DataFrame satu baris per model
+    """
+    X_test = pd.DataFrame(X_test)
+    rows = []
+    for name, model in models.items():
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        # Latency satu data (pola request dari result.php)
+        singles = [X_test.iloc[[i % len(X_test)]] for i in range(n_latency)]
+        start = time.perf_counter()
+        for row in singles:
+            model.predict(row)
+        single_ms = (time.perf_counter() - start) * 1000 / n_latency
+
+        rows.append({
+            'Model': name,
+            'Fit_Time_s': fit_times[name],
+            'Batch_Predict_ms': batch_ms,
+            'Single_Predict_ms': single_ms,
+            'Test_Acc': accuracy_score(y_test, y_pred),
+        })
+    return pd.DataFrame(rows)
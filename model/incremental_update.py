@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Incremental Update - Tambah tree baru ke Random Forest aktif tanpa retrain penuh
+Tree baru (warm_start) di-fit pada data upload baru + reservoir sample data lama,
+sehingga forest tidak "lupa" distribusi lama. Tree tertua bisa dipensiunkan agar
+ukuran ensemble tetap terbatas. Setiap update dicatat di metadata['lineage'] dan
+dipublikasikan sebagai bundle baru (model_bundle.py).
+
+Reservoir (reservoir_sample.npz) adalah sampel seragam berukuran tetap dari
+semua data yang pernah dipakai training (Algorithm R); dibuat dari dataset
+training awal jika belum ada.
+
+CSV dibaca lewat schema_loader.py (format dataset_gizi_anak.csv maupun
+antropometri) dan divalidasi dengan data_validation.py. Baris yang sudah pernah
+dipakai training (upload sebelumnya atau dataset training awal) dibuang lebih
+dulu lewat indeks dedup (dedup_index.py).
+
+Usage:
+  python incremental_update.py ../uploads/dataset_baru.csv
+  python incremental_update.py ../uploads/dataset_baru.csv --new-trees 50 --max-trees 300
+  python incremental_update.py ../uploads/dataset_baru.csv --compare   # vs retrain penuh
+  python incremental_update.py ../uploads/dataset_baru.csv --no-dedup  # pakai semua baris
+"""
+
+import os
+import json
+import time
+import argparse
+from contextlib import nullcontext
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from model_bundle import (current_bundle_dir, write_bundle, publish,
+                          MODEL_FILE, ENCODER_FILE, METADATA_FILE)
+from calibration import CalibrationTable, CALIBRATION_FILE
+from label_vocab import load_vocabulary, to_features, FEATURE_DTYPE, VOCAB_FILE
+from dedup_index import open_index, dedupe_csv, row_hashes
+from schema_loader import read_csv_unified, SCHEMAS
+from data_validation import validate_frame
+
+RESERVOIR_FILE = 'reservoir_sample.npz'
+RESERVOIR_SIZE = 2000
+NEW_TREES = 50
+LABEL_DTYPE = 'U32'
+LINGKAR_LENGAN_DEFAULT = 13.0  # sama dengan default preprocess_input (predict_gizi.py)
+
+
+class Reservoir:
+    """Sampel seragam ukuran tetap dari stream data training (Algorithm R)"""
+
+    def __init__(self, capacity, X=None, y=None, n_seen=0):
+        self.capacity = capacity
+        self.X = X
+        self.y = y
+        self.n_seen = n_seen
+
+    def __len__(self):
+        return 0 if self.y is None else len(self.y)
+
+    def add(self, X, y, rng):
+        X, y = to_features(X), np.asarray(y).astype(LABEL_DTYPE)
+        if self.X is None:
+            self.X = np.empty((0, X.shape[1]), dtype=FEATURE_DTYPE)
+            self.y = np.empty(0, dtype=LABEL_DTYPE)
+
+        # Isi slot kosong dulu
+        n_fill = min(self.capacity - len(self), len(y))
+        if n_fill:
+            self.X = np.vstack([self.X, X[:n_fill]])
+            self.y = np.concatenate([self.y, y[:n_fill]])
+        self.n_seen += n_fill
+
+        # Baris ke-i (0-based di stream) menggantikan slot acak dengan peluang capacity / (i + 1)
+        rest = len(y) - n_fill
+        if rest:
+            positions = self.n_seen + np.arange(rest)
+            slots = rng.integers(0, positions + 1)
+            accept = slots < self.capacity
+            # Urutan assignment mengikuti stream: penggantian terakhir menang
+            self.X[slots[accept]] = X[n_fill:][accept]
+            self.y[slots[accept]] = y[n_fill:][accept]
+            self.n_seen += rest
+
+    def save(self, filepath=RESERVOIR_FILE):
+        np.savez(filepath, X=self.X, y=self.y, n_seen=self.n_seen, capacity=self.capacity)
+
+    @classmethod
+    def load(cls, filepath=RESERVOIR_FILE):
+        with np.load(filepath, allow_pickle=False) as f:
+            return cls(int(f['capacity']), f['X'], f['y'], int(f['n_seen']))
+
+
+def load_csv(filepath):
+    """CSV (skema apa pun) ke layout kanonik; skema tidak dikenal -> SystemExit dengan pesan"""
+    try:
+        return read_csv_unified(filepath)
+    except ValueError as e:
+        raise SystemExit(f"✗ {e}\n  Skema yang didukung: {', '.join(SCHEMAS)} (lihat schema_loader.py)")
+
+
+def prepare_features(df, le_gender, feature_columns, classes):
+    """
+    Fitur dengan encoder yang sudah ada dari DataFrame kanonik (schema_loader.py)
+
+    Parameters:
+    - classes: kelas model; 'Obesitas' digabung ke 'Gizi Lebih' jika model tidak mengenalnya
+    """
+    df = df.copy()
+    df['jenis_kelamin_encoded'] = le_gender.transform(df['jenis_kelamin'].astype(str))
+    # Skema antropometri tidak punya lingkar lengan
+    df['lingkar_lengan'] = df['lingkar_lengan'].fillna(LINGKAR_LENGAN_DEFAULT)
+    status = df['status_gizi'].astype(str)
+    if 'Obesitas' not in set(map(str, classes)):
+        status = status.replace('Obesitas', 'Gizi Lebih')
+    return df[feature_columns], status
+
+
+def drop_seen_rows(df, dedup, base_dataset):
+    """
+    Buang baris yang sudah pernah dipakai training (dan duplikat di dalam df);
+    indeks yang masih kosong diisi dulu dengan dataset training awal
+
+    Parameters:
+    - df: DataFrame kanonik (schema_loader.py), hash sama dengan dedupe_csv()
+    """
+    if len(dedup) == 0 and len(dedup.pending) == 0:
+        dedupe_csv(dedup, base_dataset)
+    return df[dedup.filter(row_hashes(df))]
+
+
+def load_active_forest(bundle_dir):
+    """
+    (RandomForest, tabel kalibrasi atau None, le_gender, metadata, vocabulary atau None)
+    dari bundle aktif; forest tetap berkode integer jika bundle punya vocabulary
+    """
+    # Bundle boleh berisi model terkompresi; warm_start butuh estimator sklearn asli
+    forest = joblib.load(os.path.join(bundle_dir, MODEL_FILE))
+    le_gender = joblib.load(os.path.join(bundle_dir, ENCODER_FILE))
+    with open(os.path.join(bundle_dir, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    calibration_path = os.path.join(bundle_dir, CALIBRATION_FILE)
+    table = CalibrationTable.load(calibration_path) if os.path.exists(calibration_path) else None
+    if not isinstance(forest, RandomForestClassifier):
+        raise ValueError(f"Incremental update butuh RandomForestClassifier, bukan {type(forest).__name__}")
+    return forest, table, le_gender, metadata, load_vocabulary(bundle_dir)
+
+
+def incremental_update(forest, X_new, y_new, reservoir, n_new_trees=NEW_TREES, max_trees=None,
+                       vocabulary=None):
+    """
+    Tambah n_new_trees tree yang di-fit pada data baru + reservoir, lalu pensiunkan
+    tree tertua jika jumlah tree > max_trees
+
+    Parameters:
+    - vocabulary: Vocabulary bundle jika forest dilatih pada kode status (label_vocab.py)
+
+    Return: dict ringkasan update (untuk lineage)
+    """
+    X_fit = to_features(np.vstack([to_features(X_new), reservoir.X]) if len(reservoir) else X_new)
+    y_fit = np.asarray(y_new).astype(LABEL_DTYPE)
+    if len(reservoir):
+        y_fit = np.concatenate([y_fit, reservoir.y])
+    known = vocabulary.status if vocabulary is not None else forest.classes_
+    missing = set(map(str, known)) - set(np.unique(y_fit))
+    extra = set(np.unique(y_fit)) - set(map(str, known))
+    if missing or extra:
+        # Tree lama dan baru harus punya kolom probabilitas yang sama
+        raise ValueError(f"Kelas berbeda dari model (kurang: {sorted(missing)}, baru: {sorted(extra)}); "
+                         "gunakan retrain penuh (train_model.py)")
+
+    n_before = len(forest.estimators_)
+    start = time.perf_counter()
+    if vocabulary is not None:
+        y_fit = vocabulary.encode_status(y_fit)
+    feature_names = getattr(forest, 'feature_names_in_', None)
+    forest.set_params(warm_start=True, n_estimators=n_before + n_new_trees)
+    forest.fit(X_fit if feature_names is None else pd.DataFrame(X_fit, columns=feature_names), y_fit)
+    forest.set_params(warm_start=False)
+    update_time = time.perf_counter() - start
+
+    retired = 0
+    if max_trees and len(forest.estimators_) > max_trees:
+        retired = len(forest.estimators_) - max_trees
+        forest.estimators_ = forest.estimators_[retired:]
+        forest.set_params(n_estimators=len(forest.estimators_))
+
+    return {
+        'type': 'incremental',
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'n_new_rows': int(len(y_new)),
+        'n_reservoir_rows': int(len(reservoir)),
+        'trees_added': n_new_trees,
+        'trees_retired': retired,
+        'n_estimators': len(forest.estimators_),
+        'update_time_s': round(update_time, 3),
+    }
+
+
+def full_retrain(X, y):
+    """Retrain penuh dengan konfigurasi train_model.py (pembanding)"""
+    model = RandomForestClassifier(n_estimators=200, max_depth=15, min_samples_split=5,
+                                   min_samples_leaf=2, random_state=42, n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def main():
+    """Update model aktif dengan CSV baru lalu publish bundle baru"""
+    parser = argparse.ArgumentParser(description='Incremental update Random Forest (warm_start)')
+    parser.add_argument('csv', help='CSV data baru (format dataset_gizi_anak.csv atau antropometri)')
+    parser.add_argument('--new-trees', type=int, default=NEW_TREES)
+    parser.add_argument('--max-trees', type=int, default=None,
+                        help='Batas jumlah tree; tree tertua dipensiunkan')
+    parser.add_argument('--reservoir', default=RESERVOIR_FILE)
+    parser.add_argument('--reservoir-size', type=int, default=RESERVOIR_SIZE)
+    parser.add_argument('--base-dataset', default='dataset_gizi_anak.csv',
+                        help='Dataset training awal (isi reservoir pertama kali / retrain pembanding)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Bandingkan dengan retrain penuh (20%% data baru jadi holdout)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='Jangan buang baris yang sudah pernah dipakai training')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bundle_dir = current_bundle_dir()
+    if bundle_dir is None:
+        raise SystemExit("✗ Belum ada bundle aktif, jalankan train_model.py dulu")
+    forest, table, le_gender, metadata, vocabulary = load_active_forest(bundle_dir)
+    feature_columns = metadata['feature_columns']
+    classes = vocabulary.status if vocabulary is not None else forest.classes_
+
+    df_upload = load_csv(args.csv)
+    n_uploaded = len(df_upload)
+    # Baris tanpa label/jenis kelamin atau di luar rentang valid ditolak (data_validation.py)
+    validation = validate_frame(df_upload)
+    df_new = validation['data']
+    if df_new.empty:
+        raise SystemExit(f"✗ Semua {n_uploaded} baris ditolak validasi")
+    n_valid = len(df_new)
+    # Lock indeks dipegang sampai bundle dipublish; hash baru di-commit setelahnya
+    with (nullcontext() if args.no_dedup else open_index()) as dedup:
+        if dedup is not None:
+            # Hash dari nilai asli (sebelum imputasi) agar sama dengan dedupe_csv()
+            unseen = drop_seen_rows(df_upload.loc[df_new.index], dedup, args.base_dataset)
+            df_new = df_new.loc[unseen.index]
+            if df_new.empty:
+                raise SystemExit(f"✗ Semua {n_valid} baris valid sudah pernah dipakai training")
+        X_new, y_new = prepare_features(df_new, le_gender, feature_columns, classes)
+        X_holdout = y_holdout = None
+        if args.compare:
+            X_new, X_holdout, y_new, y_holdout = train_test_split(
+                X_new, y_new, test_size=0.2, random_state=args.seed, stratify=y_new)
+
+        if os.path.exists(args.reservoir):
+            reservoir = Reservoir.load(args.reservoir)
+        else:
+            X_base, y_base = prepare_features(load_csv(args.base_dataset), le_gender,
+                                              feature_columns, classes)
+            reservoir = Reservoir(args.reservoir_size)
+            reservoir.add(X_base, y_base, rng)
+
+        print("=" * 60)
+        print("INCREMENTAL UPDATE")
+        print("=" * 60)
+        print(f"Model aktif : {metadata.get('bundle_version')} ({len(forest.estimators_)} tree)")
+        print(f"Data baru   : {len(y_new)} baris, reservoir {len(reservoir)} baris "
+              f"(dari {reservoir.n_seen} data lama)")
+        if validation['rejected']:
+            print(f"Ditolak     : {validation['rejected']} baris tidak lolos validasi")
+        if len(df_new) < n_valid:
+            print(f"Duplikat    : {n_valid - len(df_new)} baris sudah pernah dipakai training (dibuang)")
+
+        summary = incremental_update(forest, X_new, y_new, reservoir, args.new_trees, args.max_trees,
+                                     vocabulary)
+        summary.update(source=os.path.basename(args.csv), parent_version=metadata.get('bundle_version'))
+        print(f"✓ +{summary['trees_added']} tree, -{summary['trees_retired']} tree pensiun "
+              f"-> {summary['n_estimators']} tree ({summary['update_time_s']:.2f}s)")
+
+        if args.compare:
+            X_base, y_base = prepare_features(load_csv(args.base_dataset), le_gender,
+                                              feature_columns, classes)
+            full_model, full_time = full_retrain(pd.concat([X_base, X_new]), pd.concat([y_base, y_new]))
+            y_pred = forest.predict(to_features(X_holdout))
+            if vocabulary is not None:
+                y_pred = vocabulary.decode_status(y_pred)
+            summary['holdout_accuracy'] = float(accuracy_score(y_holdout, y_pred))
+            print(f"\nRetrain penuh  : {full_time:.2f}s, akurasi holdout "
+                  f"{accuracy_score(y_holdout, full_model.predict(X_holdout))*100:.2f}%")
+            print(f"Incremental    : {summary['update_time_s']:.2f}s, akurasi holdout "
+                  f"{summary['holdout_accuracy']*100:.2f}% ({full_time/summary['update_time_s']:.1f}x lebih cepat)")
+
+        reservoir.add(X_new, y_new, rng)
+        reservoir.save(args.reservoir)
+
+        new_metadata = {key: value for key, value in metadata.items() if key != 'bundle_version'}
+        new_metadata['n_estimators'] = summary['n_estimators']
+        new_metadata['n_samples'] = metadata.get('n_samples', 0) + summary['n_new_rows']
+        new_metadata['lineage'] = metadata.get('lineage', []) + [summary]
+        # Tabel kalibrasi lama dipertahankan (di-fit ulang saat retrain penuh berikutnya)
+        artifacts = {MODEL_FILE: forest, ENCODER_FILE: le_gender}
+        if table is not None:
+            artifacts[CALIBRATION_FILE] = table
+        if vocabulary is not None:
+            artifacts[VOCAB_FILE] = vocabulary
+        version = write_bundle(artifacts, new_metadata)
+        publish(version)
+        print(f"\n✓ Bundle published: bundles/{version}")
+        print(f"✓ Reservoir saved: {args.reservoir}")
+        if dedup is not None:
+            dedup.commit()
+            print(f"✓ Dedup index: {len(dedup)} baris terdaftar")
+
+
+if __name__ == "__main__":
+    main()
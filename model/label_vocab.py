@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Label Vocabulary - Kode integer untuk status gizi & jenis kelamin, fitur float32
+Model dilatih pada kode status int8 dan matriks fitur float32 C-contiguous;
+nama kelas hanya ada di vocabulary.json (ikut di model bundle) dan dipakai di
+tepi sistem: saat membaca CSV (encode) dan saat menulis JSON hasil prediksi
+(decode_model mengganti classes_ model dengan nama kelas ketika bundle dimuat).
+
+Kode status = urutan alfabet nama kelas, sama dengan urutan classes_ sklearn,
+sehingga kolom predict_proba tidak berubah. Kode jenis kelamin sama dengan
+LabelEncoder (label_encoder_gender.pkl).
+
+Usage:
+  python label_vocab.py                        # benchmark memori & fit time
+  python label_vocab.py --rows 200000
+"""
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+VOCAB_FILE = 'vocabulary.json'
+STATUS_DTYPE = np.int8
+SEX_DTYPE = np.int8
+FEATURE_DTYPE = np.float32
+
+
+class Vocabulary:
+    """
+    Pemetaan nama <-> kode untuk status gizi dan jenis kelamin
+
+    Parameters:
+    - status: nama kelas status gizi (indeks = kode)
+    - sex: nilai jenis kelamin (indeks = kode)
+    """
+
+    def __init__(self, status, sex=('L', 'P')):
+        self.status = np.asarray(status, dtype=object)
+        self.sex = np.asarray(sex, dtype=object)
+        self._status_index = {name: code for code, name in enumerate(self.status)}
+        self._sex_index = {name: code for code, name in enumerate(self.sex)}
+
+    @classmethod
+    def from_labels(cls, status_labels, sex_values=('L', 'P')):
+        return cls(sorted(set(map(str, status_labels))), sorted(set(map(str, sex_values))))
+
+    @staticmethod
+    def _encode(values, index, dtype, what):
+        values = pd.Series(np.asarray(values, dtype=object))
+        codes = values.map(index)
+        if codes.isna().any():
+            unknown = sorted(set(values[codes.isna()].astype(str)))
+            raise ValueError(f"{what} tidak dikenal: {unknown}")
+        return codes.to_numpy(dtype=dtype)
+
+    def encode_status(self, labels):
+        """Nama status -> kode int8 (ValueError untuk status di luar vocabulary)"""
+        return self._encode(labels, self._status_index, STATUS_DTYPE, 'Status gizi')
+
+    def decode_status(self, codes):
+        return self.status[np.asarray(codes, dtype=np.intp)]
+
+    def encode_sex(self, values):
+        return self._encode(values, self._sex_index, SEX_DTYPE, 'Jenis kelamin')
+
+    def decode_sex(self, codes):
+        return self.sex[np.asarray(codes, dtype=np.intp)]
+
+    def to_dict(self):
+        return {'status': self.status.tolist(), 'jenis_kelamin': self.sex.tolist()}
+
+    def save(self, filepath=VOCAB_FILE):
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, filepath=VOCAB_FILE):
+        with open(filepath) as f:
+            data = json.load(f)
+        return cls(data['status'], data['jenis_kelamin'])
+
+
+def load_vocabulary(directory='.'):
+    """Vocabulary dari direktori (bundle atau model/), None untuk model lama berlabel string"""
+    path = os.path.join(directory, VOCAB_FILE)
+    return Vocabulary.load(path) if os.path.exists(path) else None
+
+
+def to_features(X, feature_columns=None):
+    """Matriks fitur float32 C-contiguous (urutan kolom = feature_columns)"""
+    if feature_columns is not None:
+        X = X[feature_columns]
+    return np.ascontiguousarray(X, dtype=FEATURE_DTYPE)
+
+
+def decode_model(model, vocabulary):
+    """
+    Ganti classes_ model berkode integer dengan nama kelas (in-place), sehingga
+    predict() dan classes_ langsung menghasilkan nama. Tidak mengubah model
+    yang classes_-nya sudah berupa nama, atau jika vocabulary None.
+    """
+    if vocabulary is None:
+        return model
+    try:
+        codes = np.asarray(model.classes_).astype(np.intp)
+    except ValueError:
+        return model
+    model.classes_ = vocabulary.decode_status(codes)
+    return model
+
+
+def benchmark(df, feature_columns, n_estimators=200):
+    """
+    Bandingkan representasi lama (DataFrame float64 + label string) dengan
+    float32 + kode int8: memori data dan waktu fit Random Forest
+
+    Return: dict hasil
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    vocabulary = Vocabulary.from_labels(df['status_gizi'], df['jenis_kelamin'])
+    df = df.assign(jenis_kelamin_encoded=vocabulary.encode_sex(df['jenis_kelamin']))
+    X_old = df[feature_columns].astype(np.float64)
+    y_old = df['status_gizi'].astype(object)
+    X_new = to_features(df, feature_columns)
+    y_new = vocabulary.encode_status(df['status_gizi'])
+
+    def fit(X, y):
+        model = RandomForestClassifier(n_estimators=n_estimators, max_depth=15, min_samples_split=5,
+                                       min_samples_leaf=2, random_state=42, n_jobs=-1)
+        start = time.perf_counter()
+        model.fit(X, y)
+        return model, time.perf_counter() - start
+
+    old_model, old_time = fit(X_old, y_old)
+    new_model, new_time = fit(X_new, y_new)
+    agreement = (decode_model(new_model, vocabulary).predict(X_new)
+                 == old_model.predict(X_old)).mean()
+    return {
+        'n_samples': len(df),
+        'old_bytes': int(X_old.memory_usage(deep=True).sum() + y_old.memory_usage(deep=True)),
+        'new_bytes': int(X_new.nbytes + y_new.nbytes),
+        'old_fit_s': old_time,
+        'new_fit_s': new_time,
+        'agreement': float(agreement),
+    }
+
+
+def main():
+    """Benchmark memori dan fit time: label string/float64 vs kode int8/float32"""
+    from train_model import FEATURE_COLUMNS
+
+    parser = argparse.ArgumentParser(description='Benchmark representasi label & fitur')
+    parser.add_argument('--dataset', default='dataset_gizi_anak.csv')
+    parser.add_argument('--rows', type=int, default=None, help='Ulangi dataset sampai N baris')
+    parser.add_argument('--trees', type=int, default=200)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.dataset)
+    if args.rows:
+        df = df.iloc[np.arange(args.rows) % len(df)].reset_index(drop=True)
+
+    r = benchmark(df, FEATURE_COLUMNS, args.trees)
+
+    print("=" * 60)
+    print("LABEL VOCABULARY BENCHMARK")
+    print("=" * 60)
+    print(f"Data      : {r['n_samples']} baris, {len(FEATURE_COLUMNS)} fitur")
+    print(f"Memori    : {r['old_bytes']/1024/1024:.2f} MB (float64 + string) -> "
+          f"{r['new_bytes']/1024/1024:.2f} MB (float32 + int8), "
+          f"{r['old_bytes']/r['new_bytes']:.1f}x lebih kecil")
+    print(f"Fit RF    : {r['old_fit_s']:.2f}s -> {r['new_fit_s']:.2f}s")
+    print(f"Agreement : {r['agreement']*100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
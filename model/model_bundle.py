@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Model Bundle - Versi model yang bisa di-swap secara atomik
+Setiap training menulis satu direktori versi baru (model + encoder + metadata)
+lewat direktori staging yang di-rename, lalu dipublikasikan dengan mengganti
+manifest CURRENT via os.replace. Pembaca tidak pernah melihat kombinasi file
+dari dua training berbeda.
+
+Layout:
+  bundles/
+    CURRENT                  # {"version": "...", "published_at": "..."}
+    20250101-120000/
+      model.pkl | model_gizi_compact.npz
+      label_encoder_gender.pkl
+      calibration.npz        # opsional (calibration.py)
+      vocabulary.json        # opsional, nama kelas model berkode integer (label_vocab.py)
+      metadata.json
+
+Usage:
+  python model_bundle.py list
+  python model_bundle.py publish <version>     # rollback / promote
+  python model_bundle.py prune --keep 5
+"""
+
+import os
+import json
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+
+import joblib
+from compact_forest import CompactForest, COMPACT_MODEL_FILE
+from calibration import CalibrationTable, CalibratedModel, CALIBRATION_FILE
+from label_vocab import load_vocabulary, decode_model
+
+BUNDLE_ROOT = 'bundles'
+MANIFEST_FILE = 'CURRENT'
+MODEL_FILE = 'model.pkl'
+ENCODER_FILE = 'label_encoder_gender.pkl'
+METADATA_FILE = 'metadata.json'
+
+
+def _new_version(root):
+    version = datetime.now().strftime('%Y%m%d-%H%M%S')
+    candidate, n = version, 1
+    while os.path.exists(os.path.join(root, candidate)):
+        n += 1
+        candidate = f"{version}-{n}"
+    return candidate
+
+
+def write_bundle(artifacts, metadata, root=BUNDLE_ROOT, version=None):
+    """
+    Tulis bundle versi baru (belum dipublikasikan)
+
+    Parameters:
+    - artifacts: dict nama_file -> objek atau path file (disalin); objek dengan
+      method save() (CompactForest, CalibrationTable) disimpan dengan save(), lainnya joblib
+    - metadata: dict metadata model, disimpan sebagai metadata.json
+    - version: nama versi (default: timestamp)
+
+    Return: nama versi
+    """
+    os.makedirs(root, exist_ok=True)
+    version = version or _new_version(root)
+    staging = tempfile.mkdtemp(dir=root, prefix='.staging-')
+    try:
+        for name, obj in artifacts.items():
+            target = os.path.join(staging, name)
+            if isinstance(obj, str) and os.path.isfile(obj):
+                shutil.copy2(obj, target)
+            elif hasattr(obj, 'save'):
+                obj.save(target)
+            else:
+                joblib.dump(obj, target)
+        with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+            json.dump({**metadata, 'bundle_version': version}, f, indent=4)
+        os.rename(staging, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version
+
+
+def publish(version, root=BUNDLE_ROOT):
+    """Jadikan versi aktif: manifest baru ditulis ke file sementara lalu os.replace"""
+    if not os.path.isdir(os.path.join(root, version)):
+        raise FileNotFoundError(f"Bundle tidak ditemukan: {os.path.join(root, version)}")
+    manifest = {'version': version, 'published_at': datetime.now().isoformat(timespec='seconds')}
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.manifest-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, MANIFEST_FILE))
+    return manifest
+
+
+def read_manifest(root=BUNDLE_ROOT):
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def manifest_mtime(root=BUNDLE_ROOT):
+    """mtime manifest (ns) untuk polling perubahan, None jika belum ada"""
+    try:
+        return os.stat(os.path.join(root, MANIFEST_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def current_bundle_dir(root=BUNDLE_ROOT):
+    manifest = read_manifest(root)
+    return os.path.join(root, manifest['version']) if manifest else None
+
+
+def load_bundle(path):
+    """
+    Load (model, le_gender, metadata) dari direktori bundle
+    Model terkompresi (compact_forest.py) dipakai jika ada di bundle, kode kelas
+    diganti nama dari vocabulary.json, dan dibungkus tabel kalibrasi jika
+    calibration.npz ada.
+    """
+    compact_path = os.path.join(path, COMPACT_MODEL_FILE)
+    if os.path.exists(compact_path):
+        model = CompactForest.load(compact_path)
+    else:
+        model = joblib.load(os.path.join(path, MODEL_FILE))
+    model = decode_model(model, load_vocabulary(path))
+    calibration_path = os.path.join(path, CALIBRATION_FILE)
+    if os.path.exists(calibration_path):
+        model = CalibratedModel(model, CalibrationTable.load(calibration_path))
+    le_gender = joblib.load(os.path.join(path, ENCODER_FILE))
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    return model, le_gender, metadata
+
+
+def list_bundles(root=BUNDLE_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if not name.startswith('.') and os.path.isdir(os.path.join(root, name)))
+
+
+def prune_bundles(root=BUNDLE_ROOT, keep=5):
+    """Hapus versi lama, kecuali versi aktif dan `keep` versi terbaru"""
+    manifest = read_manifest(root)
+    active = manifest['version'] if manifest else None
+    removed = []
+    for version in list_bundles(root)[:-keep] if keep else list_bundles(root):
+        if version != active:
+            shutil.rmtree(os.path.join(root, version))
+            removed.append(version)
+    return removed
+
+
+def main():
+    """CLI untuk melihat, mempublikasikan (rollback), dan membersihkan bundle"""
+    parser = argparse.ArgumentParser(description='Manajemen versi model bundle')
+    parser.add_argument('--root', default=BUNDLE_ROOT)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    p_publish = sub.add_parser('publish')
+    p_publish.add_argument('version')
+    p_prune = sub.add_parser('prune')
+    p_prune.add_argument('--keep', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        publish(args.version, args.root)
+        print(f"✓ Published: {args.version}")
+    elif args.command == 'prune':
+        removed = prune_bundles(args.root, args.keep)
+        print(f"✓ Removed {len(removed)} bundle(s)")
+    else:
+        manifest = read_manifest(args.root)
+        active = manifest['version'] if manifest else None
+        for version in list_bundles(args.root):
+            print(f"  {'*' if version == active else ' '} {version}")
+
+
+if __name__ == "__main__":
+    main()
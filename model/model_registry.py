@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Model Registry - Model per region (mis. provinsi) dengan lazy loading dan LRU
+Setiap region punya root bundle sendiri (layout sama dengan model_bundle.py):
+
+  regional_bundles/
+    jawa_barat/
+      CURRENT
+      20250101-120000/ ...
+    papua/ ...
+
+Bundle region dimuat saat request pertama untuk region itu, disimpan di memori
+dengan batas jumlah model dan byte (LRU), dan region tanpa bundle memakai model
+nasional. Versi baru yang dipublikasikan untuk sebuah region otomatis dimuat
+pada request berikutnya.
+
+Usage:
+  python model_registry.py list
+  python model_registry.py train "Jawa Barat" --dataset dataset_jabar.csv
+  python model_registry.py import "Papua" bundles/20250101-120000
+  python model_registry.py publish "Papua" <version>      # rollback / promote
+"""
+
+import os
+import re
+import json
+import argparse
+import threading
+from collections import OrderedDict
+
+from model_bundle import (write_bundle, publish, current_bundle_dir, list_bundles,
+                          read_manifest, load_bundle, MODEL_FILE, ENCODER_FILE,
+                          METADATA_FILE)
+
+REGIONAL_ROOT = 'regional_bundles'
+MAX_MODELS = 8
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def region_key(region):
+    """Nama direktori region: 'Jawa Barat' -> 'jawa_barat'"""
+    return re.sub(r'[^a-z0-9]+', '_', str(region).strip().lower()).strip('_')
+
+
+def region_root(region, root=REGIONAL_ROOT):
+    return os.path.join(root, region_key(region))
+
+
+def regional_bundle_dir(region, root=REGIONAL_ROOT):
+    """Direktori bundle aktif untuk region, None jika region belum punya model"""
+    if not region or not region_key(region):
+        return None
+    return current_bundle_dir(region_root(region, root))
+
+
+def _bundle_nbytes(path):
+    # Ukuran file model di disk ~ memori array tree setelah dimuat
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class ModelRegistry:
+    """
+    Cache LRU bundle per region
+
+    Parameters:
+    - root: direktori root bundle regional
+    - max_models: jumlah maksimal model region di memori
+    - max_bytes: total ukuran maksimal model region di memori (model yang baru
+      dimuat selalu dipertahankan walau sendirian melebihi budget)
+    - metrics: objek dengan add(field, value) / set(field, value), mis. WorkerMetrics
+    """
+
+    STAT_FIELDS = ('loads', 'hits', 'evictions', 'fallbacks', 'load_errors')
+
+    def __init__(self, root=REGIONAL_ROOT, max_models=MAX_MODELS, max_bytes=MAX_BYTES, metrics=None):
+        self.root = root
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self.stats = {field: 0 for field in self.STAT_FIELDS}
+        self._cache = OrderedDict()   # key -> (bundle_dir, bundle, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _count(self, field, value=1):
+        self.stats[field] += value
+        if self.metrics is not None:
+            self.metrics.add(f'registry_{field}', value)
+
+    def _update_gauges(self):
+        if self.metrics is not None:
+            self.metrics.set('registry_models', len(self._cache))
+            self.metrics.set('registry_bytes', self._bytes)
+
+    def _drop(self, key):
+        _, _, nbytes = self._cache.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, region):
+        """
+        Bundle (model, le_gender, metadata) untuk region, atau None jika harus
+        memakai model nasional
+        """
+        path = regional_bundle_dir(region, self.root)
+        if path is None:
+            self._count('fallbacks')
+            return None
+
+        key = region_key(region)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == path:
+                self._cache.move_to_end(key)
+                self._count('hits')
+                return entry[1]
+
+            try:
+                bundle = load_bundle(path)
+            except Exception:
+                self._count('load_errors')
+                self._count('fallbacks')
+                return None
+            if entry is not None:
+                self._drop(key)
+            nbytes = _bundle_nbytes(path)
+            self._cache[key] = (path, bundle, nbytes)
+            self._bytes += nbytes
+            self._count('loads')
+
+            while len(self._cache) > 1 and (len(self._cache) > self.max_models
+                                            or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._cache)))
+                self._count('evictions')
+            self._update_gauges()
+            return bundle
+
+    def loaded(self):
+        """Region yang sedang di memori, urut dari yang paling lama tidak dipakai"""
+        with self._lock:
+            return list(self._cache)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+def publish_regional(region, artifacts, metadata, root=REGIONAL_ROOT):
+    """Tulis + publish bundle baru untuk region; return nama versi"""
+    target = region_root(region, root)
+    version = write_bundle(artifacts, {**metadata, 'region': region}, target)
+    publish(version, target)
+    return version
+
+
+def train_region(region, dataset, root=REGIONAL_ROOT):
+    """Training model region dari dataset (format sama dengan train_model.py)"""
+    import pandas as pd
+    from train_model import load_and_preprocess_data, encode_data, train_model
+    from label_vocab import VOCAB_FILE
+    from sklearn.metrics import accuracy_score
+
+    X, y, le_gender, feature_columns = load_and_preprocess_data(dataset)
+    X, y, vocabulary = encode_data(X, y, le_gender)
+    model, X_test, y_test, y_pred = train_model(X, y)
+    metadata = {
+        'model_type': type(model).__name__,
+        'feature_columns': feature_columns,
+        'classes': list(vocabulary.status),
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'n_samples': len(X),
+        'train_date': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    artifacts = {MODEL_FILE: model, ENCODER_FILE: le_gender, VOCAB_FILE: vocabulary}
+    return publish_regional(region, artifacts, metadata, root)
+
+
+def import_bundle(region, bundle_dir, root=REGIONAL_ROOT):
+    """Salin bundle yang sudah ada menjadi versi baru region lalu publish"""
+    artifacts = {entry.name: entry.path for entry in os.scandir(bundle_dir)
+                 if entry.is_file() and entry.name != METADATA_FILE}
+    with open(os.path.join(bundle_dir, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    metadata.pop('bundle_version', None)
+    return publish_regional(region, artifacts, metadata, root)
+
+
+def main():
+    """CLI untuk melihat, melatih, mengimpor, dan mempublikasikan model region"""
+    parser = argparse.ArgumentParser(description='Registry model per region')
+    parser.add_argument('--root', default=REGIONAL_ROOT)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    p_train = sub.add_parser('train')
+    p_train.add_argument('region')
+    p_train.add_argument('--dataset', required=True)
+    p_import = sub.add_parser('import')
+    p_import.add_argument('region')
+    p_import.add_argument('bundle_dir')
+    p_publish = sub.add_parser('publish')
+    p_publish.add_argument('region')
+    p_publish.add_argument('version')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        version = train_region(args.region, args.dataset, args.root)
+        print(f"✓ {args.region}: bundle {version} published")
+    elif args.command == 'import':
+        version = import_bundle(args.region, args.bundle_dir, args.root)
+        print(f"✓ {args.region}: bundle {version} published")
+    elif args.command == 'publish':
+        publish(args.version, region_root(args.region, args.root))
+        print(f"✓ {args.region}: published {args.version}")
+    else:
+        if not os.path.isdir(args.root):
+            print(f"Belum ada model region ({args.root})")
+            return
+        for key in sorted(os.listdir(args.root)):
+            manifest = read_manifest(os.path.join(args.root, key))
+            versions = list_bundles(os.path.join(args.root, key))
+            active = manifest['version'] if manifest else '-'
+            size = _bundle_nbytes(os.path.join(args.root, key, active)) if manifest else 0
+            print(f"  {key:<24} aktif: {active:<18} {len(versions)} versi  {size/1024/1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
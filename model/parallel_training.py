@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Parallel Training - Training beberapa model sekaligus di process pool
+Model multithread (mis. Random Forest, n_jobs) mendapat sisa core setelah
+model single-thread (Gradient Boosting, Decision Tree) masing-masing diberi
+satu core. Scoring train/validation dilakukan di worker; model disimpan ke
+disk oleh worker sehingga yang dikirim balik hanya skor dan path.
+
+complete_pipline.py berjalan sebagai script tanpa guard __main__, jadi pool
+hanya dipakai dengan start method 'fork'; di platform lain training berjalan
+berurutan di proses utama.
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+
+MODEL_DIR = 'trained_models'
+
+
+def plan_core_budget(models, n_cores=None):
+    """
+    Bagi core: model tanpa n_jobs dapat 1 core, model dengan n_jobs berbagi sisanya
+
+    Return: (jumlah worker pool, dict nama -> n_jobs)
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    threaded = [name for name, model in models.items() if 'n_jobs' in model.get_params()]
+    single = [name for name in models if name not in threaded]
+
+    n_workers = max(1, min(len(models), n_cores))
+    spare = max(1, n_cores - min(len(single), n_workers - 1))
+    per_threaded = max(1, spare // max(1, len(threaded)))
+    budget = {name: 1 for name in single}
+    budget.update({name: per_threaded for name in threaded})
+    return n_workers, budget
+
+
+def _safe_name(name):
+    return name.lower().replace(' ', '_')
+
+
+def fit_and_score(name, model, n_jobs, X_train, y_train, X_val, y_val, model_dir=MODEL_DIR):
+    """Fit satu model, hitung akurasi train/val, simpan model ke disk (dijalankan di worker)"""
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred_val = model.predict(X_val)
+    predict_time = time.perf_counter() - start
+
+    path = os.path.join(model_dir, f"{_safe_name(name)}.pkl")
+    joblib.dump(model, path)
+    return {
+        'name': name,
+        'path': path,
+        'train_acc': accuracy_score(y_train, model.predict(X_train)),
+        'val_acc': accuracy_score(y_val, y_pred_val),
+        'fit_time': fit_time,
+        'predict_ms_per_sample': predict_time * 1000 / len(X_val),
+        'n_jobs': n_jobs,
+        'pid': os.getpid(),
+    }
+
+
+def train_model_zoo(models, X_train, y_train, X_val, y_val, n_cores=None, model_dir=MODEL_DIR):
+    """
+    Training semua model secara konkuren dengan pembagian core
+
+    Return: (dict nama -> model terlatih, list hasil per model sesuai urutan `models`)
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    n_workers, budget = plan_core_budget(models, n_cores)
+    jobs = [(name, clone(model), budget[name], X_train, y_train, X_val, y_val, model_dir)
+            for name, model in models.items()]
+
+    if n_workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+            futures = [pool.submit(fit_and_score, *job) for job in jobs]
+            results = [future.result() for future in futures]
+    else:
+        results = [fit_and_score(*job) for job in jobs]
+
+    # Model dibaca ulang dari disk, tidak di-pickle lewat pipe
+    trained = {r['name']: joblib.load(r['path']) for r in results}
+    return trained, results
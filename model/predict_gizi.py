@@ -7,13 +7,40 @@ Dapat dipanggil dari PHP atau command line
 import sys
 import json
 import joblib
+import os
+import weakref
 import numpy as np
 import pandas as pd
+from compact_forest import CompactForest, COMPACT_MODEL_FILE
+from model_bundle import current_bundle_dir, load_bundle
+from calibration import CalibrationTable, CalibratedModel, CALIBRATION_FILE
+from label_vocab import load_vocabulary, decode_model
+from explain import PathExplainer
+from who_standards import who_params
+from early_exit import AnytimeForest
+from model_registry import regional_bundle_dir
+from similar_cases import find_similar, K_NEIGHBORS, MAX_NEIGHBORS
+
+# Explainer dibuat sekali per objek model (ikut terganti saat bundle di-swap)
+_explainers = weakref.WeakKeyDictionary()
+_anytime_forests = weakref.WeakKeyDictionary()
 
 def load_model():
     """Load trained model dan encoders"""
     try:
-        model = joblib.load('model_gizi_rf.pkl')
+        # Bundle versi aktif (model_bundle.py) - konsisten walau training sedang menulis
+        bundle_dir = current_bundle_dir()
+        if bundle_dir:
+            return load_bundle(bundle_dir)
+        
+        # Gunakan model terkompresi jika sudah dibuat dengan compact_forest.py
+        if os.path.exists(COMPACT_MODEL_FILE):
+            model = CompactForest.load(COMPACT_MODEL_FILE)
+        else:
+            model = joblib.load('model_gizi_rf.pkl')
+        model = decode_model(model, load_vocabulary())
+        if os.path.exists(CALIBRATION_FILE):
+            model = CalibratedModel(model, CalibrationTable.load(CALIBRATION_FILE))
         le_gender = joblib.load('label_encoder_gender.pkl')
         
         with open('model_metadata.json', 'r') as f:
@@ -31,29 +58,9 @@ def calculate_z_score(nilai, median, sd):
 def get_who_standard(jenis_kelamin, umur_bulan, indikator):
     """
     Mendapatkan median dan SD dari standar WHO
-    Ini adalah aproksimasi sederhana, untuk produksi gunakan tabel WHO lengkap
+    Nilai dibaca dari tabel who_standards.npy (sumber yang sama dengan tabel standar_who)
     """
-    if indikator == 'BB/U':  # Berat badan (kg)
-        if jenis_kelamin == 'L':
-            median = 3.3 + (umur_bulan * 0.15)
-            sd = 0.4 + (umur_bulan * 0.01)
-        else:
-            median = 3.2 + (umur_bulan * 0.14)
-            sd = 0.4 + (umur_bulan * 0.01)
-    
-    elif indikator == 'TB/U':  # Tinggi badan (cm)
-        if jenis_kelamin == 'L':
-            median = 49.9 + (umur_bulan * 1.1)
-            sd = 1.9 + (umur_bulan * 0.02)
-        else:
-            median = 49.1 + (umur_bulan * 1.0)
-            sd = 1.9 + (umur_bulan * 0.02)
-    
-    elif indikator == 'BB/TB':
-        median = 15 + (umur_bulan * 0.05)
-        sd = 1.2
-    
-    return median, sd
+    return who_params(jenis_kelamin, umur_bulan, indikator)
 
 def preprocess_input(data, le_gender):
     """Preprocess input data"""
@@ -87,36 +94,167 @@ def preprocess_input(data, le_gender):
         'z_score_bb_tb': round(float(z_bb_tb), 2)
     }
 
-def predict(data):
-    """Main prediction function"""
-    # Load model
-    model, le_gender, metadata = load_model()
+def validate_input(data, le_gender=None):
+    """
+    Validasi field wajib, tipe angka, dan jenis kelamin (jika le_gender diberikan)
+
+    Return: salinan data dengan field angka dikonversi ke float dan
+    similar_cases berupa jumlah k (dibatasi MAX_NEIGHBORS) jika diminta
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Input must be a JSON object")
+    required = ['jenis_kelamin', 'umur_bulan', 'berat_badan', 'tinggi_badan']
+    for field in required:
+        if field not in data:
+            raise ValueError(f"Missing required field: {field}")
     
+    record = dict(data)
+    if record.get('lingkar_lengan') is None:
+        record.pop('lingkar_lengan', None)  # opsional, preprocess_input memakai default
+    for field in ['umur_bulan', 'berat_badan', 'tinggi_badan', 'lingkar_lengan']:
+        if field not in record:
+            continue
+        value = record[field]
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid numeric value for {field}: {value!r}")
+        if not np.isfinite(value):
+            raise ValueError(f"Invalid numeric value for {field}: {value!r}")
+        record[field] = value
+    budget = record.get('latency_budget_ms')
+    if budget is not None and (isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0):
+        raise ValueError(f"Invalid latency_budget_ms: {budget!r}")
+    similar = record.get('similar_cases')
+    if similar is True:
+        record['similar_cases'] = K_NEIGHBORS
+    elif similar is not None and similar is not False:
+        if (isinstance(similar, bool) or not isinstance(similar, (int, float))
+                or (isinstance(similar, float) and not similar.is_integer()) or similar < 1):
+            raise ValueError(f"Invalid similar_cases: {similar!r} (expected true or an integer >= 1)")
+        record['similar_cases'] = min(int(similar), MAX_NEIGHBORS)
+    if le_gender is not None and record['jenis_kelamin'] not in set(le_gender.classes_):
+        raise ValueError(f"Invalid jenis_kelamin: {record['jenis_kelamin']!r} "
+                         f"(expected one of {list(le_gender.classes_)})")
+    return record
+
+def get_explainer(model):
+    """PathExplainer untuk model (di-cache per objek model), None jika model tidak didukung"""
+    if model not in _explainers:
+        try:
+            _explainers[model] = PathExplainer(model)
+        except ValueError:
+            _explainers[model] = None
+    return _explainers[model]
+
+def get_anytime_forest(model):
+    """AnytimeForest untuk model (di-cache per objek model), None jika model tidak didukung"""
+    if model not in _anytime_forests:
+        try:
+            _anytime_forests[model] = AnytimeForest(model)
+        except ValueError:
+            _anytime_forests[model] = None
+    return _anytime_forests[model]
+
+def predict_batch(records, model, le_gender, metadata):
+    """
+    Prediksi banyak data sekaligus dengan satu panggilan predict_proba
+    Data dengan "explain": true mendapat key `explanations` (kontribusi fitur, explain.py)
+    Data dengan "early_exit": true dievaluasi per chunk tree (early_exit.py), opsional
+    dengan "latency_budget_ms", dan mendapat key `trees_used` dan `decided`
+    (False = dihentikan budget sebelum vote pasti)
+    Model yang tidak didukung explain.py / early_exit.py: `explanations` tidak
+    disertakan dan early exit memakai predict_proba penuh (semua tree, decided true)
+    Data dengan "similar_cases": true (atau jumlah k, lihat validate_input) mendapat
+    key `similar_cases` berisi kasus termirip dari indeks kasus (similar_cases.py)
+    """
     # Preprocess
-    features, z_scores = preprocess_input(data, le_gender)
+    processed = [preprocess_input(data, le_gender) for data in records]
+    features = np.vstack([f for f, _ in processed])
     
     # Predict
-    prediction = model.predict(features)[0]
-    probabilities = model.predict_proba(features)[0]
+    early = np.array([bool(data.get('early_exit')) for data in records])
+    anytime = get_anytime_forest(model) if early.any() else None
+    trees_used = {}
+    if anytime is not None:
+        probabilities = np.empty((len(records), len(model.classes_)))
+        if not early.all():
+            probabilities[~early] = model.predict_proba(features[~early])
+        budgets = [data['latency_budget_ms'] for data in records
+                   if data.get('early_exit') and data.get('latency_budget_ms') is not None]
+        early_idx = np.flatnonzero(early)
+        probabilities[early_idx], used, decided = anytime.predict_proba(
+            features[early_idx], budget_ms=min(budgets) if budgets else None)
+        trees_used = dict(zip(early_idx.tolist(), zip(used.tolist(), decided.tolist())))
+    else:
+        probabilities = model.predict_proba(features)
+        if early.any():
+            base = getattr(model, 'model', model)
+            n_trees = len(getattr(base, 'estimators_', [base]))
+            trees_used = {i: (n_trees, True) for i in np.flatnonzero(early).tolist()}
     
-    # Get confidence
-    max_prob = max(probabilities)
-    confidence = round(float(max_prob * 100), 2)
+    # Explanations hanya untuk data yang memintanya, dalam satu batch
+    explain_idx = [i for i, data in enumerate(records) if data.get('explain')]
+    explainer = get_explainer(model) if explain_idx else None
+    explanations = {}
+    if explainer is not None:
+        explanations = dict(zip(explain_idx, explainer.explain_records(
+            features[explain_idx], np.argmax(probabilities[explain_idx], axis=1),
+            metadata['feature_columns'])))
     
-    # Class probabilities
-    class_probs = {}
-    for i, cls in enumerate(model.classes_):
-        class_probs[cls] = round(float(probabilities[i] * 100), 2)
+    # Kasus termirip: satu query indeks untuk semua data yang memintanya (k terbesar)
+    similar_idx = [i for i, data in enumerate(records) if data.get('similar_cases')]
+    similar = {}
+    if similar_idx:
+        ks = [K_NEIGHBORS if records[i]['similar_cases'] is True
+              else min(int(records[i]['similar_cases']), MAX_NEIGHBORS) for i in similar_idx]
+        # Indeks belum dibangun -> list kosong
+        found = (find_similar([{**records[i], **processed[i][1]} for i in similar_idx], max(ks))
+                 or [[] for _ in similar_idx])
+        similar = {i: cases[:k] for i, k, cases in zip(similar_idx, ks, found)}
     
-    # Result
-    result = {
-        'status_gizi': prediction,
-        'confidence': confidence,
-        'z_scores': z_scores,
-        'probabilities': class_probs,
-        'model_version': metadata.get('train_date', 'unknown')
-    }
+    results = []
+    for row, ((_, z_scores), proba) in enumerate(zip(processed, probabilities)):
+        # Get confidence
+        max_prob = max(proba)
+        confidence = round(float(max_prob * 100), 2)
+        
+        # Class probabilities
+        class_probs = {}
+        for i, cls in enumerate(model.classes_):
+            class_probs[cls] = round(float(proba[i] * 100), 2)
+        
+        # Result
+        results.append({
+            'status_gizi': str(model.classes_[int(np.argmax(proba))]),
+            'confidence': confidence,
+            'z_scores': z_scores,
+            'probabilities': class_probs,
+            'model_version': metadata.get('bundle_version', metadata.get('train_date', 'unknown'))
+        })
+        if row in trees_used:
+            results[-1]['trees_used'], results[-1]['decided'] = trees_used[row]
+        if row in explanations:
+            results[-1]['explanations'] = explanations[row]
+        if row in similar:
+            results[-1]['similar_cases'] = similar[row]
+    
+    return results
+
+def predict(data):
+    """Main prediction function"""
+    # Load model (model region jika ada, model_registry.py)
+    region_dir = regional_bundle_dir(data.get('region'))
+    if region_dir is not None:
+        model, le_gender, metadata = load_bundle(region_dir)
+    else:
+        model, le_gender, metadata = load_model()
     
+    data = validate_input(data, le_gender)
+    result = predict_batch([data], model, le_gender, metadata)[0]
+    result['model_region'] = metadata.get('region', 'national')
     return result
 
 def main():
@@ -124,7 +262,7 @@ def main():
     if len(sys.argv) < 2:
         print(json.dumps({
             'error': 'No input data provided',
-            'usage': 'python predict_gizi.py \'{"jenis_kelamin":"L","umur_bulan":24,"berat_badan":12.5,"tinggi_badan":85,"lingkar_lengan":15}\''
+            'usage': 'python predict_gizi.py \'{"jenis_kelamin":"L","umur_bulan":24,"berat_badan":12.5,"tinggi_badan":85,"lingkar_lengan":15,"explain":true}\''
         }))
         sys.exit(1)
     
@@ -134,10 +272,7 @@ def main():
         data = json.loads(input_json)
         
         # Validate required fields
-        required = ['jenis_kelamin', 'umur_bulan', 'berat_badan', 'tinggi_badan']
-        for field in required:
-            if field not in data:
-                raise ValueError(f"Missing required field: {field}")
+        validate_input(data)
         
         # Predict
         result = predict(data)
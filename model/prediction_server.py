@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Prediction Server - Layanan prediksi status gizi untuk banyak operator posyandu
+Koneksi diterima secara konkuren, request yang datang dalam beberapa milidetik
+digabung (micro-batch) ke satu panggilan predict_proba, dan beban dibagi ke
+beberapa worker hasil pre-fork yang berbagi model secara read-only.
+Bundle model baru (model_bundle.py) dideteksi lewat polling mtime manifest,
+dimuat & di-warm-up di background, lalu di-swap tanpa menghentikan layanan.
+Model kandidat (--candidate) bisa di-shadow-score pada sebagian traffic.
+Data dengan key "region" diprediksi dengan model region (model_registry.py)
+jika ada, dimuat lazy dan di-cache LRU per worker; selain itu model nasional.
+
+Endpoint:
+  POST /predict  - body JSON satu data atau list data
+  GET  /metrics  - queue depth, backpressure, dan statistik batch semua worker
+  GET  /drift    - PSI/KS distribusi input & output live vs data training
+  GET  /health   - status server
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import queue
+import signal
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from predict_gizi import load_model, predict_batch, validate_input
+from drift_monitor import DriftSketch, REFERENCE_FILE, load_reference
+from model_bundle import current_bundle_dir, load_bundle, manifest_mtime, BUNDLE_ROOT
+from shadow_scoring import ShadowScorer, SHADOW_LOG_FILE
+from model_registry import ModelRegistry, REGIONAL_ROOT, MAX_MODELS, MAX_BYTES
+
+# Slot metrik per worker di shared memory
+METRIC_FIELDS = ['requests', 'rejected', 'errors', 'batches', 'batch_items',
+                 'queue_depth', 'max_queue_depth', 'latency_ms_total', 'reloads',
+                 'shadow_scored', 'shadow_disagree', 'shadow_dropped', 'shadow_errors',
+                 'shadow_primary_ms', 'shadow_candidate_ms',
+                 'registry_loads', 'registry_hits', 'registry_evictions', 'registry_fallbacks',
+                 'registry_load_errors', 'registry_models', 'registry_bytes']
+
+# Data dummy untuk warm-up model baru sebelum di-swap
+WARMUP_RECORDS = [
+    {'jenis_kelamin': 'L', 'umur_bulan': 12, 'berat_badan': 9.5, 'tinggi_badan': 75},
+    {'jenis_kelamin': 'P', 'umur_bulan': 36, 'berat_badan': 13.0, 'tinggi_badan': 94},
+]
+
+
+class QueueFullError(Exception):
+    """Antrian penuh - request ditolak (backpressure)"""
+
+
+class WorkerMetrics:
+    """Metrik satu worker, disimpan di RawArray yang dibagi antar proses"""
+
+    def __init__(self, shared, slot):
+        self.shared = shared
+        self.base = slot * len(METRIC_FIELDS)
+        self.lock = threading.Lock()
+
+    def add(self, field, value=1):
+        with self.lock:
+            self.shared[self.base + METRIC_FIELDS.index(field)] += value
+
+    def set(self, field, value):
+        self.shared[self.base + METRIC_FIELDS.index(field)] = value
+
+    def get(self, field):
+        return self.shared[self.base + METRIC_FIELDS.index(field)]
+
+
+def collect_metrics(shared, n_workers, max_queue):
+    """Gabungkan metrik semua worker"""
+    workers = []
+    for slot in range(n_workers):
+        base = slot * len(METRIC_FIELDS)
+        workers.append({field: shared[base + i] for i, field in enumerate(METRIC_FIELDS)})
+
+    total = {field: sum(w[field] for w in workers) for field in METRIC_FIELDS}
+    total['max_queue_depth'] = max(w['max_queue_depth'] for w in workers)
+    total['avg_batch_size'] = total['batch_items'] / total['batches'] if total['batches'] else 0.0
+    total['avg_latency_ms'] = (total['latency_ms_total'] / total['batch_items']
+                               if total['batch_items'] else 0.0)
+    total['queue_capacity'] = max_queue * n_workers
+    if total['shadow_scored']:
+        total['shadow_agreement'] = 1 - total['shadow_disagree'] / total['shadow_scored']
+    return {'total': total, 'workers': workers}
+
+
+class MicroBatcher:
+    """
+    Kumpulkan request dalam jendela waktu singkat lalu prediksi sekaligus
+    """
+
+    def __init__(self, model_bundle, metrics, batch_window_ms=5, max_batch=64, max_queue=256,
+                 drift=None, shadow=None, registry=None):
+        self.model_bundle = model_bundle
+        self.metrics = metrics
+        self.registry = registry
+        self.drift = drift
+        self.shadow = shadow
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        """Masukkan satu data ke antrian, return Future berisi hasil prediksi"""
+        future = Future()
+        try:
+            self.queue.put_nowait((record, future, time.perf_counter()))
+        except queue.Full:
+            self.metrics.add('rejected')
+            raise QueueFullError('Prediction queue is full')
+
+        depth = self.queue.qsize()
+        self.metrics.set('queue_depth', depth)
+        if depth > self.metrics.get('max_queue_depth'):
+            self.metrics.set('max_queue_depth', depth)
+        return future
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _predict(self, records, model_bundle):
+        """Satu predict_batch per region dalam batch (model nasional sebagai fallback)"""
+        if self.registry is None:
+            return predict_batch(records, *model_bundle)
+
+        groups = {}
+        for i, record in enumerate(records):
+            groups.setdefault(record.get('region'), []).append(i)
+        results = [None] * len(records)
+        for region, indices in groups.items():
+            bundle = self.registry.get(region) if region else None
+            model_region = bundle[2].get('region') if bundle is not None else 'national'
+            group_results = predict_batch([records[i] for i in indices], *(bundle or model_bundle))
+            for i, result in zip(indices, group_results):
+                result['model_region'] = model_region
+                results[i] = result
+        return results
+
+    def _predict_each(self, records, model_bundle):
+        """Prediksi per data; exception disimpan sebagai hasil data tersebut saja"""
+        results = []
+        for record in records:
+            try:
+                results.append(self._predict([record], model_bundle)[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.metrics.set('queue_depth', self.queue.qsize())
+            records = [record for record, _, _ in batch]
+            model_bundle = self.model_bundle
+            predict_ms = None
+            try:
+                start = time.perf_counter()
+                results = self._predict(records, model_bundle)
+                predict_ms = (time.perf_counter() - start) * 1000
+            except Exception:
+                # Satu data bermasalah tidak boleh menggagalkan request lain di batch yang sama
+                results = self._predict_each(records, model_bundle)
+
+            now = time.perf_counter()
+            self.metrics.add('batches')
+            self.metrics.add('batch_items', len(batch))
+            self.metrics.add('latency_ms_total', sum((now - t) * 1000 for _, _, t in batch))
+            succeeded = []
+            for (record, future, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self.metrics.add('errors')
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                    succeeded.append((record, result))
+
+            # Batch fallback tidak punya waktu predict gabungan untuk dibandingkan
+            if self.shadow is not None and predict_ms is not None:
+                self.shadow.offer(records, results, predict_ms,
+                                  model_bundle[2].get('bundle_version'))
+
+            if self.drift is not None and succeeded:
+                self.drift.update([{**record, **result['z_scores']} for record, result in succeeded],
+                                  [result['status_gizi'] for _, result in succeeded])
+
+
+class BundleWatcher:
+    """
+    Polling manifest bundle; model baru dimuat dan di-warm-up dulu, baru di-swap
+    ke batcher (request yang sedang jalan tetap memakai model lama)
+    """
+
+    def __init__(self, batcher, metrics, mtime, interval=2.0):
+        self.batcher = batcher
+        self.metrics = metrics
+        self.mtime = mtime
+        self.interval = interval
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            mtime = manifest_mtime()
+            if mtime is None or mtime == self.mtime:
+                continue
+            self.mtime = mtime
+            try:
+                bundle = load_bundle(current_bundle_dir())
+                predict_batch(WARMUP_RECORDS, *bundle)
+            except Exception as e:
+                print(f"⚠ Worker {os.getpid()}: gagal memuat bundle baru: {e}")
+                sys.stdout.flush()
+                continue
+            # Satu assignment atribut; batch berikutnya memakai model baru
+            self.batcher.model_bundle = bundle
+            self.metrics.add('reloads')
+            print(f"✓ Worker {os.getpid()}: model {bundle[2].get('bundle_version')} aktif")
+            sys.stdout.flush()
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """HTTP handler; setiap koneksi dilayani thread sendiri"""
+
+    server_version = 'GiziPredictionServer/1.0'
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.metrics_snapshot())
+        elif self.path == '/drift':
+            if self.server.drift_snapshot is None:
+                self._send_json(404, {'error': f'Drift reference not loaded ({REFERENCE_FILE})'})
+            else:
+                self._send_json(200, self.server.drift_snapshot())
+        elif self.path == '/health':
+            metadata = self.server.batcher.model_bundle[2]
+            self._send_json(200, {'status': 'ok', 'pid': os.getpid(),
+                                  'model_version': metadata.get('bundle_version',
+                                                                metadata.get('train_date'))})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length))
+            records = data if isinstance(data, list) else [data]
+            if not records:
+                raise ValueError('Empty batch')
+            # Validasi & normalisasi sebelum masuk antrian: data rusak ditolak di sini,
+            # bukan menggagalkan micro-batch bersama request lain
+            le_gender = self.server.batcher.model_bundle[1]
+            records = [validate_input(record, le_gender) for record in records]
+        except json.JSONDecodeError as e:
+            self._send_json(400, {'error': f'Invalid JSON: {str(e)}'})
+            return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        self.server.metrics.add('requests', len(records))
+        try:
+            futures = [self.server.batcher.submit(record) for record in records]
+            results = [future.result(timeout=self.server.request_timeout) for future in futures]
+        except QueueFullError as e:
+            self._send_json(503, {'error': str(e), 'retry_after_ms': 50})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self._send_json(200, results if isinstance(data, list) else results[0])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, bind_and_activate=True):
+        super().__init__(address, PredictionHandler, bind_and_activate)
+        self.batcher = None
+        self.metrics = None
+        self.metrics_snapshot = None
+        self.drift_snapshot = None
+        self.request_timeout = 10
+
+
+def run_worker(server, slot, shared, args, model_bundle, drift_shared=None, reference=None,
+               candidate_bundle=None):
+    """Loop utama satu worker (dijalankan setelah fork)"""
+    metrics = WorkerMetrics(shared, slot)
+    server.metrics = metrics
+    drift = None
+    if reference is not None:
+        # Setiap worker menulis sketch di slot sendiri; laporan menjumlahkan semua slot
+        slots = np.frombuffer(drift_shared).reshape(args.workers, -1)
+        drift = DriftSketch(reference, slots[slot])
+        server.drift_snapshot = lambda: drift.report(slots.sum(axis=0))
+    shadow = None
+    if candidate_bundle is not None:
+        shadow = ShadowScorer(candidate_bundle, metrics, args.shadow_fraction, args.shadow_log)
+    registry = None
+    if os.path.isdir(args.regional_root):
+        registry = ModelRegistry(args.regional_root, args.registry_max_models,
+                                 args.registry_max_mb * 1024 * 1024, metrics)
+    server.batcher = MicroBatcher(model_bundle, metrics, args.batch_window_ms,
+                                  args.max_batch, args.max_queue, drift, shadow, registry)
+    if args.reload_interval > 0:
+        BundleWatcher(server.batcher, metrics, args.bundle_mtime, args.reload_interval)
+    server.metrics_snapshot = lambda: collect_metrics(shared, args.workers, args.max_queue)
+    server.serve_forever()
+
+
+def main():
+    """Jalankan server dengan pre-forked worker pool"""
+    parser = argparse.ArgumentParser(description='Prediction server status gizi')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-window-ms', type=float, default=5)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-queue', type=int, default=256)
+    parser.add_argument('--drift-reference', default=REFERENCE_FILE,
+                        help='Profil referensi training untuk GET /drift')
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help='Interval polling bundle baru (detik), 0 = nonaktif')
+    parser.add_argument('--candidate',
+                        help='Versi bundle (atau path) model kandidat untuk shadow scoring')
+    parser.add_argument('--shadow-fraction', type=float, default=0.1)
+    parser.add_argument('--shadow-log', default=SHADOW_LOG_FILE)
+    parser.add_argument('--regional-root', default=REGIONAL_ROOT,
+                        help='Root bundle model per region (model_registry.py)')
+    parser.add_argument('--registry-max-models', type=int, default=MAX_MODELS)
+    parser.add_argument('--registry-max-mb', type=float, default=MAX_BYTES / 1024 / 1024)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        args.workers = 1
+
+    # Model dimuat sekali di parent lalu dibagi copy-on-write ke worker
+    args.bundle_mtime = manifest_mtime()
+    model_bundle = load_model()
+    candidate_bundle = None
+    if args.candidate:
+        candidate_dir = args.candidate
+        if not os.path.isdir(candidate_dir):
+            candidate_dir = os.path.join(BUNDLE_ROOT, args.candidate)
+        candidate_bundle = load_bundle(candidate_dir)
+    shared = multiprocessing.RawArray('d', args.workers * len(METRIC_FIELDS))
+    reference, drift_shared = None, None
+    if os.path.exists(args.drift_reference):
+        reference = load_reference(args.drift_reference)
+        drift_shared = multiprocessing.RawArray('d', args.workers
+                                                * DriftSketch.buffer_size(reference))
+    server = PredictionServer((args.host, args.port))
+    print(f"✓ Prediction server listening on http://{args.host}:{args.port} "
+          f"({args.workers} worker)")
+    if candidate_bundle is not None:
+        print(f"  Shadow scoring: {args.candidate} ({args.shadow_fraction * 100:.0f}% traffic)")
+    sys.stdout.flush()
+
+    if args.workers == 1:
+        run_worker(server, 0, shared, args, model_bundle, drift_shared, reference,
+                   candidate_bundle)
+        return
+
+    # Bekukan objek yang sudah ada agar GC tidak menyentuh halaman memori model
+    gc.freeze()
+    children = {}
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                run_worker(server, slot, shared, args, model_bundle, drift_shared, reference,
+                           candidate_bundle)
+            finally:
+                os._exit(0)
+        children[pid] = slot
+
+    def shutdown(signum, frame):
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for slot in range(args.workers):
+        spawn(slot)
+
+    # Restart worker yang mati
+    while True:
+        pid, _ = os.wait()
+        slot = children.pop(pid, None)
+        if slot is not None:
+            print(f"⚠ Worker {pid} exited, restarting slot {slot}")
+            spawn(slot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Schema Loader - Loader CSV terpadu untuk semua korpus data gizi
+Skema dideteksi dari header saja, lalu kolom dan label dipetakan ke satu
+layout bertipe (float32/int16/categorical) sehingga korpus campuran bisa
+digabung untuk training tanpa melewati kolom object pandas.
+
+Skema yang dikenali:
+  - gizi_anak    : dataset_gizi_anak.csv (generate_dataset.py)
+  - antropometri : data_gizi_antropometri_*.csv, training_data.csv (data_generator.py)
+"""
+
+import csv
+import sys
+import numpy as np
+import pandas as pd
+
+SEX_CATEGORIES = ['L', 'P']
+STATUS_CATEGORIES = ['Gizi Baik', 'Gizi Kurang', 'Gizi Buruk', 'Stunting', 'Gizi Lebih', 'Obesitas']
+
+SEX_DTYPE = pd.CategoricalDtype(SEX_CATEGORIES)
+STATUS_DTYPE = pd.CategoricalDtype(STATUS_CATEGORIES)
+
+# Layout kanonik (urutan kolom & tipe hasil load). Umur dibaca float32 agar sel
+# kosong / desimal tidak menggagalkan load; validasinya di data_validation.py
+CANONICAL_DTYPES = {
+    'jenis_kelamin': SEX_DTYPE,
+    'umur_bulan': 'float32',
+    'berat_badan': 'float32',
+    'tinggi_badan': 'float32',
+    'lingkar_lengan': 'float32',
+    'z_score_bb_u': 'float32',
+    'z_score_tb_u': 'float32',
+    'z_score_bb_tb': 'float32',
+    'status_gizi': STATUS_DTYPE,
+}
+
+SCHEMAS = {
+    'gizi_anak': {
+        'columns': {name: name for name in CANONICAL_DTYPES},
+        'status_aliases': {},
+    },
+    'antropometri': {
+        'columns': {
+            'Jenis_Kelamin': 'jenis_kelamin',
+            'Umur_Bulan': 'umur_bulan',
+            'Berat_Badan_kg': 'berat_badan',
+            'Tinggi_Badan_cm': 'tinggi_badan',
+            'Z_Score_BB_U': 'z_score_bb_u',
+            'Z_Score_TB_U': 'z_score_tb_u',
+            'Z_Score_BB_TB': 'z_score_bb_tb',
+            'Status_Gizi': 'status_gizi',
+        },
+        'status_aliases': {'Normal': 'Gizi Baik'},
+    },
+}
+
+
+def read_header(filepath):
+    """Baca baris header saja"""
+    with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f))
+
+
+def detect_schema(filepath):
+    """Deteksi nama skema dari header CSV"""
+    header = set(read_header(filepath))
+    for name, schema in SCHEMAS.items():
+        required = {src for src, dst in schema['columns'].items() if dst != 'lingkar_lengan'}
+        if required <= header:
+            return name
+    raise ValueError(f"Skema CSV tidak dikenali: {filepath} (header: {sorted(header)})")
+
+
+def _recode(values, aliases, dtype):
+    """
+    Petakan categorical ke dtype kanonik lewat codes (tanpa kolom object)
+
+    Return: (Categorical, dict label baris -> nilai asli yang tidak dikenal)
+    """
+    source = values.cat.categories
+    target = pd.Index(dtype.categories)
+    lookup = target.get_indexer([aliases.get(c, c) for c in source])
+    lookup = np.append(lookup, -1)  # code -1 (NaN) tetap NaN
+    codes = values.cat.codes.to_numpy()
+    recoded = lookup[codes]
+    unknown = (recoded == -1) & (codes != -1)
+    unmapped = dict(zip(values.index[unknown], source[codes[unknown]].astype(str)))
+    return pd.Categorical.from_codes(recoded, dtype=dtype), unmapped
+
+
+def _unify(df, schema, merge_obesitas):
+    df = df.rename(columns=schema['columns'])
+    aliases = dict(schema['status_aliases'])
+    if merge_obesitas:
+        aliases['Obesitas'] = 'Gizi Lebih'
+
+    # Nilai di luar vocabulary menjadi NaN; nilai aslinya disimpan di attrs['unmapped']
+    # agar data_validation.py bisa menolak barisnya (bukan mengisi dengan modus)
+    unmapped = {}
+    df['jenis_kelamin'], unmapped['jenis_kelamin'] = _recode(df['jenis_kelamin'], {}, SEX_DTYPE)
+    df['status_gizi'], unmapped['status_gizi'] = _recode(df['status_gizi'], aliases, STATUS_DTYPE)
+    if 'lingkar_lengan' not in df.columns:
+        df['lingkar_lengan'] = np.full(len(df), np.nan, dtype=np.float32)
+    df = df[list(CANONICAL_DTYPES)]
+    df.attrs['unmapped'] = {col: values for col, values in unmapped.items() if values}
+    return df
+
+
+def read_csv_unified(filepath, merge_obesitas=False, chunksize=None):
+    """
+    Load satu CSV (skema apa pun) ke layout kanonik
+
+    Parameters:
+    - filepath: path CSV
+    - merge_obesitas: gabungkan 'Obesitas' ke 'Gizi Lebih' (vocabulary 5 kelas model)
+    - chunksize: jika diisi, return iterator DataFrame per chunk
+    """
+    schema = SCHEMAS[detect_schema(filepath)]
+    header = set(read_header(filepath))
+    usecols = [src for src in schema['columns'] if src in header]
+    dtypes = {}
+    for src in usecols:
+        dtype = CANONICAL_DTYPES[schema['columns'][src]]
+        dtypes[src] = 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+
+    reader = pd.read_csv(filepath, usecols=usecols, dtype=dtypes, chunksize=chunksize)
+    if chunksize is None:
+        return _unify(reader, schema, merge_obesitas)
+    return (_unify(chunk, schema, merge_obesitas) for chunk in reader)
+
+
+def load_corpora(filepaths, merge_obesitas=False, drop_unused_status=True):
+    """Load dan gabungkan beberapa CSV dengan skema berbeda"""
+    if isinstance(filepaths, str):
+        filepaths = [filepaths]
+    frames = [read_csv_unified(path, merge_obesitas) for path in filepaths]
+    # Label baris berubah karena ignore_index: geser key attrs['unmapped'] per file
+    unmapped, offset = {}, 0
+    for frame in frames:
+        for col, values in frame.attrs.get('unmapped', {}).items():
+            positions = frame.index.get_indexer(list(values))
+            unmapped.setdefault(col, {}).update(zip((positions + offset).tolist(), values.values()))
+        offset += len(frame)
+    df = pd.concat(frames, ignore_index=True)
+    df.attrs['unmapped'] = unmapped
+    if drop_unused_status:
+        df['status_gizi'] = df['status_gizi'].cat.remove_unused_categories()
+    return df
+
+
+def main():
+    """Tampilkan hasil deteksi skema dan ringkasan layout terpadu"""
+    filepaths = sys.argv[1:] or ['dataset_gizi_anak.csv']
+    for path in filepaths:
+        print(f"  {path}: skema '{detect_schema(path)}'")
+
+    df = load_corpora(filepaths)
+    print(f"\n✓ Loaded {len(df)} samples dari {len(filepaths)} file")
+    print(f"  Memory Usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+    print(f"\n  Dtypes:\n{df.dtypes.to_string()}")
+    print(f"\n  Distribusi status:\n{df['status_gizi'].value_counts().to_string()}")
+
+
+if __name__ == "__main__":
+    main()
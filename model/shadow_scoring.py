@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Shadow Scoring - Evaluasi model kandidat pada traffic live
+Sebagian request (fraction) diprediksi ulang oleh model kandidat di thread
+background, di luar jalur respons. Hasil yang berbeda dengan model produksi
+dan latency kedua model dicatat ke log JSONL untuk dinilai sebelum kandidat
+dipromosikan (python model_bundle.py publish <versi>).
+
+Usage:
+  python prediction_server.py --candidate <versi bundle> --shadow-fraction 0.1
+  python shadow_scoring.py shadow_log.jsonl      # ringkasan log
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+from predict_gizi import predict_batch
+
+SHADOW_LOG_FILE = 'shadow_log.jsonl'
+
+
+class ShadowScorer:
+    """
+    Antrian + thread background untuk scoring kandidat; offer() tidak pernah blocking
+    """
+
+    def __init__(self, candidate_bundle, metrics, fraction=0.1, log_path=SHADOW_LOG_FILE,
+                 max_queue=256, seed=None):
+        self.candidate_bundle = candidate_bundle
+        self.metrics = metrics
+        self.fraction = fraction
+        self.log_path = log_path
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.random = random.Random(seed)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def offer(self, records, results, primary_ms, primary_version):
+        """Ambil sampel batch yang sudah dijawab model produksi"""
+        sampled = [(r, res) for r, res in zip(records, results)
+                   if self.random.random() < self.fraction]
+        if not sampled:
+            return
+        try:
+            self.queue.put_nowait((sampled, primary_ms * len(sampled) / len(records),
+                                   primary_version))
+        except queue.Full:
+            self.metrics.add('shadow_dropped', len(sampled))
+
+    def _run(self):
+        while True:
+            sampled, primary_ms, primary_version = self.queue.get()
+            records = [r for r, _ in sampled]
+            try:
+                start = time.perf_counter()
+                candidate = predict_batch(records, *self.candidate_bundle)
+                candidate_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                self.metrics.add('shadow_errors', len(records))
+                self._log({'type': 'error', 'error': str(e), 'n': len(records)})
+                continue
+
+            disagreements = []
+            for record, (_, primary), cand in zip(records, sampled, candidate):
+                if primary['status_gizi'] != cand['status_gizi']:
+                    disagreements.append({
+                        'input': record,
+                        'primary': primary['status_gizi'],
+                        'primary_confidence': primary['confidence'],
+                        'candidate': cand['status_gizi'],
+                        'candidate_confidence': cand['confidence'],
+                    })
+
+            self.metrics.add('shadow_scored', len(records))
+            self.metrics.add('shadow_disagree', len(disagreements))
+            self.metrics.add('shadow_primary_ms', primary_ms)
+            self.metrics.add('shadow_candidate_ms', candidate_ms)
+            self._log({
+                'type': 'batch',
+                'n': len(records),
+                'primary_version': primary_version,
+                'candidate_version': self.candidate_bundle[2].get('bundle_version'),
+                'primary_ms': round(primary_ms, 3),
+                'candidate_ms': round(candidate_ms, 3),
+                'disagreements': disagreements,
+            })
+
+    def _log(self, entry):
+        entry['time'] = datetime.now().isoformat(timespec='seconds')
+        entry['pid'] = os.getpid()
+        # Satu write() per baris dengan O_APPEND: aman dari beberapa worker
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def summarize_log(log_path=SHADOW_LOG_FILE):
+    """Ringkasan agreement, pasangan label yang berbeda, dan latency kedua model"""
+    n, pairs, errors = 0, Counter(), 0
+    primary_ms, candidate_ms = [], []
+    versions = set()
+    with open(log_path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry['type'] == 'error':
+                errors += entry['n']
+                continue
+            n += entry['n']
+            versions.add((entry['primary_version'], entry['candidate_version']))
+            # Latency per item agar batch dengan ukuran berbeda sebanding
+            primary_ms.append(entry['primary_ms'] / entry['n'])
+            candidate_ms.append(entry['candidate_ms'] / entry['n'])
+            for d in entry['disagreements']:
+                pairs[(d['primary'], d['candidate'])] += 1
+
+    def percentiles(values):
+        if not values:
+            return {}
+        p50, p95 = np.percentile(values, [50, 95])
+        return {'p50_ms': round(float(p50), 4), 'p95_ms': round(float(p95), 4)}
+
+    disagree = sum(pairs.values())
+    return {
+        'scored': n,
+        'errors': errors,
+        'agreement': round(1 - disagree / n, 4) if n else None,
+        'disagreements': {f"{p} -> {c}": k for (p, c), k in pairs.most_common()},
+        'latency_per_item': {'primary': percentiles(primary_ms),
+                             'candidate': percentiles(candidate_ms)},
+        'versions': sorted(f"{p} vs {c}" for p, c in versions),
+    }
+
+
+def main():
+    """Tampilkan ringkasan log shadow scoring"""
+    parser = argparse.ArgumentParser(description='Ringkasan shadow scoring model kandidat')
+    parser.add_argument('log_file', nargs='?', default=SHADOW_LOG_FILE)
+    args = parser.parse_args()
+
+    summary = summarize_log(args.log_file)
+    print("=" * 60)
+    print("SHADOW SCORING SUMMARY")
+    print("=" * 60)
+    print(f"  Versions:   {', '.join(summary['versions'])}")
+    print(f"  Scored:     {summary['scored']} (errors: {summary['errors']})")
+    if summary['agreement'] is not None:
+        print(f"  Agreement:  {summary['agreement'] * 100:.2f}%")
+    for pair, count in summary['disagreements'].items():
+        print(f"    ⚠ {pair}: {count}")
+    for name, stats in summary['latency_per_item'].items():
+        if stats:
+            print(f"  Latency {name:<9}: p50 {stats['p50_ms']:.4f} ms, p95 {stats['p95_ms']:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Shared Matrix - Matriks training float32 + label dalam satu buffer memmap bersama
+Fitur (float32, C-contiguous) dan kode label (int32) ditulis sekali ke satu file
+di /dev/shm (tmpfs; fallback direktori temp). Worker proses membaca buffer yang
+sama tanpa salinan:
+  - pool fork (tuning_store.py) mewarisi mapping-nya
+  - joblib/loky (cross_val_score n_jobs) mengirim np.memmap sebagai referensi
+    file, bukan isi array
+Random Forest / Decision Tree memang bekerja di float32, jadi hasil fit identik
+dengan input float64 dan konversi per fit ikut hilang.
+
+Usage:
+  python shared_matrix.py                              # benchmark RSS vs jumlah worker
+  python shared_matrix.py --rows 200000 --workers 1 2 4
+"""
+
+import os
+import time
+import tempfile
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+SHM_DIR = '/dev/shm'
+
+
+def _default_dir():
+    return SHM_DIR if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK) else tempfile.gettempdir()
+
+
+class SharedMatrix:
+    """
+    X (float32) dan y (kode int32) dalam satu file memmap read-only
+
+    Parameters:
+    - X: DataFrame / array 2D fitur
+    - y: label (string atau angka); kode = indeks di classes_ (urutan np.unique,
+      sama dengan urutan kelas sklearn sehingga StratifiedKFold menghasilkan fold identik)
+    - directory: lokasi file buffer (default /dev/shm)
+
+    Dipakai sebagai context manager; file dihapus saat keluar.
+    """
+
+    def __init__(self, X, y, directory=None):
+        self.columns = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        values = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = values.shape
+        self.nbytes = values.nbytes + n_rows * np.dtype(np.int32).itemsize
+
+        fd, self.path = tempfile.mkstemp(prefix='gizi_matrix_', suffix='.dat',
+                                         dir=directory or _default_dir())
+        os.close(fd)
+        try:
+            # Layout: [X float32 n x d | y int32 n]
+            buffer = np.memmap(self.path, dtype=np.uint8, mode='w+', shape=(self.nbytes,))
+            buffer[:values.nbytes] = values.view(np.uint8).reshape(-1)
+            buffer[values.nbytes:] = codes.astype(np.int32).view(np.uint8)
+            buffer.flush()
+            del buffer
+        except BaseException:
+            os.remove(self.path)
+            raise
+
+        self.X = np.memmap(self.path, dtype=np.float32, mode='r', shape=(n_rows, n_cols))
+        self.y = np.memmap(self.path, dtype=np.int32, mode='r', shape=(n_rows,),
+                           offset=values.nbytes)
+
+    def labels(self, codes):
+        """Kode -> label asli"""
+        return self.classes_[np.asarray(codes)]
+
+    def close(self):
+        self.X = self.y = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            # Windows: file masih di-map oleh worker; dibersihkan bersama direktori temp
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------------------------------------------------------
+# Pengukuran memori seluruh pohon proses (Linux /proc)
+# ----------------------------------------------------------------------------
+
+def _children(pid):
+    """PID semua turunan (langsung dan tidak langsung) dari pid"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Field ke-4 = ppid; nama proses (field 2) bisa mengandung spasi
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _memory_kb(pid):
+    """(Rss, Pss) dalam KB; Pss membagi halaman bersama ke semua proses pemakainya"""
+    rss = pss = 0
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Rss:'):
+                    rss = int(line.split()[1])
+                elif line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+class PeakMemory:
+    """
+    Sampling total RSS/PSS proses ini + semua worker selama blok with
+
+    RSS menghitung halaman bersama (buffer memmap, library) sekali per proses;
+    PSS menghitungnya sekali secara total, jadi PSS = pemakaian memori sebenarnya.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak_rss_mb = self.peak_pss_mb = 0.0
+        self._stop = threading.Event()
+
+    def sample(self):
+        pids = [os.getpid()] + _children(os.getpid())
+        rss, pss = map(sum, zip(*(_memory_kb(pid) for pid in pids)))
+        self.peak_rss_mb = max(self.peak_rss_mb, rss / 1024)
+        self.peak_pss_mb = max(self.peak_pss_mb, pss / 1024)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def benchmark(X, y, workers=(1, 2, 4), n_estimators=50, n_splits=5):
+    """
+    cross_val_score dengan salinan per worker (DataFrame float64 + label string)
+    vs buffer bersama, untuk setiap jumlah worker
+
+    Return: DataFrame satu baris per (mode, workers)
+    """
+    from joblib.externals.loky import get_reusable_executor
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=15, random_state=42, n_jobs=1)
+    rows = []
+    with SharedMatrix(X, y) as shared:
+        for n_workers in workers:
+            for mode, X_run, y_run in (('copy', X, y), ('shared', shared.X, shared.y)):
+                # Worker loky dibuat ulang agar tiap run mulai dari kondisi yang sama
+                get_reusable_executor().shutdown(wait=True)
+                start = time.perf_counter()
+                with PeakMemory() as peak:
+                    scores = cross_val_score(model, X_run, y_run, cv=cv, n_jobs=n_workers)
+                rows.append({
+                    'Mode': mode,
+                    'Workers': n_workers,
+                    'Peak_RSS_MB': peak.peak_rss_mb,
+                    'Peak_PSS_MB': peak.peak_pss_mb,
+                    'Time_s': time.perf_counter() - start,
+                    'CV_Mean': scores.mean(),
+                })
+    get_reusable_executor().shutdown(wait=True)
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Benchmark memori CV: salinan per worker vs buffer memmap bersama"""
+    parser = argparse.ArgumentParser(description='Benchmark shared training matrix')
+    parser.add_argument('--dataset', default='dataset_gizi_anak.csv')
+    parser.add_argument('--rows', type=int, default=100000,
+                        help='Jumlah baris (dataset diulang jika kurang)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--trees', type=int, default=50)
+    args = parser.parse_args()
+
+    if not os.path.isdir('/proc'):
+        raise SystemExit("✗ Pengukuran memori butuh /proc (Linux)")
+
+    df = pd.read_csv(args.dataset)
+    df = df.iloc[np.arange(args.rows) % len(df)].reset_index(drop=True)
+    df['jenis_kelamin_encoded'] = (df['jenis_kelamin'] == 'P').astype(int)
+    X = df.select_dtypes('number')
+    y = df['status_gizi']
+
+    print("=" * 60)
+    print("SHARED MATRIX BENCHMARK")
+    print("=" * 60)
+    print(f"Data: {X.shape[0]} baris x {X.shape[1]} fitur "
+          f"(float64 {X.to_numpy().nbytes/1024/1024:.1f} MB, float32 {X.shape[0]*X.shape[1]*4/1024/1024:.1f} MB)\n")
+
+    results = benchmark(X, y, args.workers, args.trees)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+    print("\nPeak PSS (shared vs copy):")
+    for n_workers, group in results.groupby('Workers'):
+        copy, shared = group.set_index('Mode').loc[['copy', 'shared'], 'Peak_PSS_MB']
+        print(f"  {n_workers} worker: {copy:.0f} MB -> {shared:.0f} MB (selisih {shared - copy:+.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
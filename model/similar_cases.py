@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Similar Cases - Indeks nearest-neighbour kasus anak yang mirip
+Setiap kasus (baris korpus training atau diagnosa di hasil_diagnosa) menjadi
+vektor antropometri + z-score + fitur turunan engineer_features() yang
+distandardisasi. Satu KD-tree per jenis kelamin menjawab query k tetangga
+terdekat; diagnosa baru masuk ke buffer append (dicari brute force) dan
+KD-tree dibangun ulang saat buffer sudah besar, sehingga menambah kasus tidak
+perlu membangun ulang seluruh indeks.
+
+Kasus dari riwayat diagnosa membawa child_id (growth_history.py), sehingga
+perkembangan anak tersebut bisa ditampilkan bersama hasil pencarian.
+
+Usage:
+  python similar_cases.py build --corpus dataset_gizi_anak.csv [--sqlite gizi.db]
+  python similar_cases.py add '<json diagnosa>'            # dipanggil result.php
+  python similar_cases.py query '{"jenis_kelamin":"L","umur_bulan":24,...}' --k 5
+  python similar_cases.py benchmark
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from aggregation import snapshot_lock
+from growth_history import child_key, GrowthHistory, HISTORY_FILE
+from who_standards import who_params
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+CASE_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'case_index.npz')
+K_NEIGHBORS = 5
+MAX_NEIGHBORS = 50  # batas k yang boleh diminta per prediksi
+# KD-tree dibangun ulang jika buffer > max(MIN_REBUILD, REBUILD_FRACTION x kasus terindeks)
+MIN_REBUILD = 256
+REBUILD_FRACTION = 0.1
+LEAF_SIZE = 40
+
+RAW_FEATURES = ['umur_bulan', 'berat_badan', 'tinggi_badan', 'lingkar_lengan',
+                'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+# Fitur turunan, rumus sama dengan engineer_features() di complete_pipline.py
+DERIVED_FEATURES = ['bmi', 'z_score_mean', 'muac_zscore']
+CASE_FEATURES = RAW_FEATURES + DERIVED_FEATURES
+SEXES = ('L', 'P')
+
+DIAGNOSA_QUERY = """
+SELECT h.id, d.nama_anak, d.tanggal_lahir, d.jenis_kelamin, d.umur_bulan,
+       d.berat_badan, d.tinggi_badan, d.lingkar_lengan,
+       h.z_score_bb_u, h.z_score_tb_u, h.z_score_bb_tb, h.status_gizi, h.tanggal_diagnosa
+FROM hasil_diagnosa h
+JOIN data_anak d ON h.data_anak_id = d.id
+"""
+
+# filepath -> (mtime, objek); dimuat ulang saat file diganti (add dari result.php)
+_cache = {}
+
+
+def with_z_scores(data):
+    """Lengkapi input dengan z-score yang belum ada (standar WHO yang sama dengan predict_gizi.py)"""
+    record = dict(data)
+    for name, indikator, column in (('z_score_bb_u', 'BB/U', 'berat_badan'),
+                                    ('z_score_tb_u', 'TB/U', 'tinggi_badan'),
+                                    ('z_score_bb_tb', 'BB/TB', 'berat_badan')):
+        if record.get(name) is None:
+            median, sd = who_params(record['jenis_kelamin'], record['umur_bulan'], indikator)
+            record[name] = (float(record[column]) - median) / sd
+    return record
+
+
+def _derive(raw):
+    """Kolom RAW_FEATURES (array n x 7) -> matriks CASE_FEATURES"""
+    umur, berat, tinggi, lila = raw[:, 0], raw[:, 1], raw[:, 2], raw[:, 3].copy()
+    # Lingkar lengan kosong (korpus antropometri, input tanpa LiLA) = nilai harapan umur
+    expected_muac = 11 + umur * 0.08
+    lila[np.isnan(lila)] = expected_muac[np.isnan(lila)]
+    return np.column_stack([
+        umur, berat, tinggi, lila, raw[:, 4:7],
+        berat / ((tinggi / 100) ** 2),
+        raw[:, 4:7].mean(axis=1),
+        (lila - expected_muac) / 1.5,
+    ])
+
+
+def case_vectors(df):
+    """Matriks fitur kasus (float64, kolom = CASE_FEATURES) dari DataFrame kolom mentah"""
+    raw = np.column_stack([pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+                           if col in df else np.full(len(df), np.nan) for col in RAW_FEATURES])
+    return _derive(raw)
+
+
+def record_vectors(records):
+    """Matriks fitur kasus dari list dict input (tanpa DataFrame, untuk query per request)"""
+    raw = np.array([[np.nan if data.get(col) is None else float(data[col]) for col in RAW_FEATURES]
+                    for data in records], dtype=np.float64).reshape(-1, len(RAW_FEATURES))
+    return _derive(raw)
+
+
+class CaseIndex:
+    """
+    Indeks kasus: vektor terstandardisasi + label, KD-tree per jenis kelamin + buffer append
+
+    Kasus [0, n_indexed) ada di KD-tree, [n_indexed, n) di buffer.
+    Standardisasi (mean/scale) ditetapkan saat build dan tidak berubah saat add().
+    """
+
+    def __init__(self, mean, scale, vectors, sex, status, source, ref, child_id, n_indexed=None):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.sex = np.asarray(sex, dtype='U1')
+        self.status = np.asarray(status, dtype='U32')
+        self.source = np.asarray(source, dtype='U16')
+        self.ref = np.asarray(ref, dtype='U64')
+        self.child_id = np.asarray(child_id, dtype='U160')
+        self.n_indexed = len(self.vectors) if n_indexed is None else int(n_indexed)
+        self._build_trees()
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def n_buffered(self):
+        return len(self) - self.n_indexed
+
+    def _build_trees(self):
+        self._trees = {}
+        indexed = self.sex[:self.n_indexed]
+        for sex in SEXES:
+            rows = np.flatnonzero(indexed == sex)
+            if len(rows):
+                self._trees[sex] = (KDTree(self.vectors[rows], leaf_size=LEAF_SIZE), rows)
+
+    def rebuild(self):
+        """Masukkan buffer ke KD-tree"""
+        self.n_indexed = len(self)
+        self._build_trees()
+
+    @classmethod
+    def build(cls, cases):
+        """
+        Indeks baru dari DataFrame kasus (kolom RAW_FEATURES, jenis_kelamin,
+        status_gizi, source, ref, opsional child_id)
+        """
+        X = case_vectors(cases)
+        valid = ~np.isnan(X).any(axis=1) & cases['jenis_kelamin'].astype(str).isin(SEXES).to_numpy()
+        X, cases = X[valid], cases[valid]
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale[scale == 0] = 1.0
+        child_id = cases['child_id'] if 'child_id' in cases else np.full(len(cases), '')
+        return cls(mean, scale, (X - mean) / scale, cases['jenis_kelamin'].astype(str),
+                   cases['status_gizi'].astype(str), cases['source'], cases['ref'].astype(str),
+                   pd.Series(child_id).fillna('').astype(str))
+
+    def add(self, cases):
+        """
+        Tambah kasus baru ke buffer (O(buffer) per query sampai rebuild berikutnya)
+
+        Return: jumlah kasus yang ditambahkan
+        """
+        X = case_vectors(cases)
+        valid = ~np.isnan(X).any(axis=1) & cases['jenis_kelamin'].astype(str).isin(SEXES).to_numpy()
+        if not valid.any():
+            return 0
+        cases = cases[valid]
+        child_id = cases['child_id'] if 'child_id' in cases else pd.Series('', index=cases.index)
+        self.vectors = np.vstack([self.vectors, ((X[valid] - self.mean) / self.scale).astype(np.float32)])
+        self.sex = np.concatenate([self.sex, cases['jenis_kelamin'].astype(str).to_numpy('U1')])
+        self.status = np.concatenate([self.status, cases['status_gizi'].astype(str).to_numpy('U32')])
+        self.source = np.concatenate([self.source, cases['source'].astype(str).to_numpy('U16')])
+        self.ref = np.concatenate([self.ref, cases['ref'].astype(str).to_numpy('U64')])
+        self.child_id = np.concatenate([self.child_id, child_id.fillna('').astype(str).to_numpy('U160')])
+        if self.n_buffered > max(MIN_REBUILD, REBUILD_FRACTION * self.n_indexed):
+            self.rebuild()
+        return int(valid.sum())
+
+    def _nearest(self, vector, sex, k):
+        """(jarak, indeks kasus) k tetangga terdekat: KD-tree + buffer brute force"""
+        distances, rows = [], []
+        tree = self._trees.get(sex)
+        if tree is not None:
+            kd_tree, tree_rows = tree
+            dist, idx = kd_tree.query(vector[None, :], k=min(k, len(tree_rows)))
+            distances.append(dist[0])
+            rows.append(tree_rows[idx[0]])
+
+        buffered = np.flatnonzero(self.sex[self.n_indexed:] == sex) + self.n_indexed
+        if len(buffered):
+            dist = np.sqrt(((self.vectors[buffered] - vector) ** 2).sum(axis=1))
+            distances.append(dist)
+            rows.append(buffered)
+
+        if not rows:
+            return np.empty(0), np.empty(0, dtype=np.intp)
+        distances, rows = np.concatenate(distances), np.concatenate(rows)
+        order = np.argsort(distances, kind='stable')[:k]
+        return distances[order], rows[order]
+
+    def case_record(self, row, distance):
+        """Satu kasus sebagai dict JSON (nilai mentah dikembalikan dari vektor)"""
+        values = self.vectors[row].astype(np.float64) * self.scale + self.mean
+        record = {
+            'source': str(self.source[row]),
+            'ref': str(self.ref[row]),
+            'jenis_kelamin': str(self.sex[row]),
+            'status_gizi': str(self.status[row]),
+            'distance': round(float(distance), 4),
+        }
+        for name in RAW_FEATURES:
+            record[name] = round(float(values[CASE_FEATURES.index(name)]), 2)
+        record['umur_bulan'] = int(round(record['umur_bulan']))
+        if self.child_id[row]:
+            record['child_id'] = str(self.child_id[row])
+        return record
+
+    def query(self, records, k=K_NEIGHBORS):
+        """
+        k kasus termirip untuk setiap input (dict dengan RAW_FEATURES + jenis_kelamin)
+
+        Return: list (per input) berisi list dict kasus, urut dari yang paling mirip
+        """
+        vectors = (record_vectors(records) - self.mean) / self.scale
+        results = []
+        for vector, data in zip(vectors.astype(np.float32), records):
+            sex = str(data.get('jenis_kelamin'))
+            if np.isnan(vector).any():
+                results.append([])
+                continue
+            distances, rows = self._nearest(vector, sex, k)
+            results.append([self.case_record(row, dist) for row, dist in zip(rows, distances)])
+        return results
+
+    def save(self, filepath=CASE_INDEX_FILE):
+        """Simpan array kasus secara atomik (KD-tree dibangun ulang saat load)"""
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.case_index.', suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, mean=self.mean, scale=self.scale, vectors=self.vectors, sex=self.sex,
+                     status=self.status, source=self.source, ref=self.ref,
+                     child_id=self.child_id, n_indexed=self.n_indexed)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath=CASE_INDEX_FILE):
+        with np.load(filepath, allow_pickle=False) as f:
+            return cls(f['mean'], f['scale'], f['vectors'], f['sex'], f['status'], f['source'],
+                       f['ref'], f['child_id'], int(f['n_indexed']))
+
+
+def corpus_cases(filepaths):
+    """Kasus dari korpus training (CSV skema apa pun, schema_loader.py)"""
+    from schema_loader import load_corpora
+
+    frames = []
+    for path in filepaths:
+        df = load_corpora(path)
+        df['source'] = 'training'
+        df['ref'] = [f"{os.path.basename(path)}:{i}" for i in range(len(df))]
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def diagnosa_cases(df):
+    """Kasus dari baris diagnosa (kolom data_anak + hasil_diagnosa)"""
+    df = df.copy()
+    df['source'] = 'diagnosa'
+    df['ref'] = df['id'].astype(str) if 'id' in df else ''
+    if {'nama_anak', 'tanggal_lahir'} <= set(df.columns):
+        df['child_id'] = [child_key(*row) for row in
+                          df[['nama_anak', 'tanggal_lahir', 'jenis_kelamin']].itertuples(index=False)]
+    return df
+
+
+def fetch_diagnosa(conn):
+    """Seluruh riwayat diagnosa dari database (koneksi DB-API)"""
+    cursor = conn.cursor()
+    cursor.execute(DIAGNOSA_QUERY)
+    columns = [c[0] for c in cursor.description]
+    df = pd.DataFrame(cursor.fetchall(), columns=columns)
+    cursor.close()
+    return diagnosa_cases(df)
+
+
+def add_diagnosa(diagnosa, filepath=CASE_INDEX_FILE):
+    """Tambah satu diagnosa baru ke indeks yang tersimpan (0 jika indeks belum dibangun)"""
+    if not os.path.exists(filepath):
+        return 0
+    with snapshot_lock(filepath):
+        index = CaseIndex.load(filepath)
+        added = index.add(diagnosa_cases(pd.DataFrame([with_z_scores(diagnosa)])))
+        index.save(filepath)
+    return added
+
+
+def attach_progress(results, history):
+    """Tambahkan ringkasan perkembangan (growth_history.py) ke kasus dari riwayat diagnosa"""
+    for cases in results:
+        for case in cases:
+            child_id = case.get('child_id')
+            visits = history.history(child_id) if child_id else None
+            if visits is None:
+                continue
+            slopes = history.trajectory(child_id)
+            case['progress'] = {
+                'n_kunjungan': int(len(visits['umur_bulan'])),
+                'umur_terakhir': int(visits['umur_bulan'][-1]),
+                'z_score_terakhir': {name: None if np.isnan(visits[name][-1])
+                                     else round(float(visits[name][-1]), 2)
+                                     for name in ('z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb')},
+                'slope_per_bulan': {name: None if np.isnan(value) else round(float(value), 4)
+                                    for name, value in slopes.items()},
+            }
+    return results
+
+
+def _cached(loader, filepath):
+    try:
+        mtime = os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    entry = _cache.get(filepath)
+    if entry is None or entry[0] != mtime:
+        entry = _cache[filepath] = (mtime, loader(filepath))
+    return entry[1]
+
+
+def find_similar(records, k=K_NEIGHBORS, filepath=CASE_INDEX_FILE):
+    """
+    Kasus termirip untuk list input (format predict_gizi.py), dengan progress
+    growth history jika tersedia; None jika indeks belum dibangun
+    """
+    index = _cached(CaseIndex.load, filepath)
+    if index is None:
+        return None
+    results = index.query([with_z_scores(data) for data in records], k)
+    history = _cached(GrowthHistory.load, HISTORY_FILE)
+    if history is not None:
+        attach_progress(results, history)
+    return results
+
+
+def _connect(args):
+    if args.sqlite:
+        import sqlite3
+        return sqlite3.connect(args.sqlite)
+    if pymysql is None:
+        print("✗ Error: pymysql belum terinstall (pip install pymysql)")
+        sys.exit(1)
+    return pymysql.connect(host=args.host, user=args.user, password=args.password,
+                           database=args.database)
+
+
+def benchmark(index, queries, k=K_NEIGHBORS):
+    """Latency query satu kasus (ms): rata-rata dan p99"""
+    index.query(queries[:1], k)
+    times = []
+    for data in queries:
+        start = time.perf_counter()
+        index.query([data], k)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.mean(times)), float(np.percentile(times, 99))
+
+
+def main():
+    """CLI build / add / query / benchmark indeks kasus"""
+    parser = argparse.ArgumentParser(description='Indeks kasus anak yang mirip (nearest neighbour)')
+    parser.add_argument('--index', default=CASE_INDEX_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help='Bangun indeks dari korpus training (+ riwayat diagnosa)')
+    p_build.add_argument('--corpus', nargs='+', default=['dataset_gizi_anak.csv'])
+    p_build.add_argument('--no-db', action='store_true', help='Tanpa riwayat diagnosa dari database')
+    p_build.add_argument('--sqlite', help='Gunakan file SQLite alih-alih MySQL')
+    p_build.add_argument('--host', default='localhost')
+    p_build.add_argument('--user', default='root')
+    p_build.add_argument('--password', default='')
+    p_build.add_argument('--database', default='gizi_db')
+    p_add = sub.add_parser('add', help='Tambah satu diagnosa (JSON)')
+    p_add.add_argument('diagnosa_json')
+    p_query = sub.add_parser('query', help='Cari kasus termirip (JSON input seperti predict_gizi.py)')
+    p_query.add_argument('data_json')
+    p_query.add_argument('--k', type=int, default=K_NEIGHBORS)
+    p_bench = sub.add_parser('benchmark', help='Latency query per kasus')
+    p_bench.add_argument('--corpus', default='dataset_gizi_anak.csv')
+    p_bench.add_argument('--n', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        cases = corpus_cases(args.corpus)
+        n_diagnosa = 0
+        if not args.no_db:
+            conn = _connect(args)
+            diagnosa = fetch_diagnosa(conn)
+            conn.close()
+            n_diagnosa = len(diagnosa)
+            cases = pd.concat([cases, diagnosa], ignore_index=True)
+        index = CaseIndex.build(cases)
+        index.save(args.index)
+        print(f"✓ Case index: {len(index)} kasus ({len(index) - n_diagnosa} training, "
+              f"{n_diagnosa} diagnosa), {len(CASE_FEATURES)} fitur")
+        print(f"  Saved: {args.index}")
+        return
+
+    if args.command == 'add':
+        try:
+            added = add_diagnosa(json.loads(args.diagnosa_json), args.index)
+        except (ValueError, KeyError) as e:
+            print(json.dumps({'error': f'Invalid input: {e}'}))
+            sys.exit(1)
+        print(json.dumps({'success': True, 'added': added}))
+        return
+
+    if args.command == 'query':
+        results = find_similar([json.loads(args.data_json)], args.k, args.index)
+        if results is None:
+            print(json.dumps({'error': f'Indeks belum dibangun: {args.index}'}))
+            sys.exit(1)
+        print(json.dumps(results[0], indent=2))
+        return
+
+    index = CaseIndex.load(args.index)
+    queries = pd.read_csv(args.corpus).sample(n=args.n, replace=True, random_state=42).to_dict('records')
+    mean_ms, p99_ms = benchmark(index, queries)
+    print("=" * 60)
+    print("SIMILAR CASES BENCHMARK")
+    print("=" * 60)
+    print(f"Indeks : {len(index)} kasus ({index.n_indexed} di KD-tree, {index.n_buffered} di buffer)")
+    print(f"Query  : k={K_NEIGHBORS}, rata-rata {mean_ms:.3f} ms, p99 {p99_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Status Rules - Rule engine vektor status gizi dari z-score (BB/U, TB/U, BB/TB)
+Aturan status gizi sebelumnya ada sebagai rantai if/elif skalar di tiga tempat
+dengan isi yang berbeda. Di sini setiap versi menjadi profil bernama berupa
+daftar aturan berurutan; seluruh array z-score dilabeli sekaligus dengan
+np.select (aturan pertama yang cocok menang), sehingga korpus training bisa
+dilabeli ulang tanpa loop per baris ketika aturan WHO berubah.
+
+Profil:
+  - dataset      : tentukan_status_gizi() di generate_dataset.py (dataset_gizi_anak.csv)
+  - web          : tentukanStatusGizi() di includes/functions.php (form diagnosa)
+  - antropometri : GiziDataGenerator.determine_status_gizi() di data_generator.py
+
+Baris dengan z-score kosong (NaN) tidak dilabeli (None); relabel membiarkan
+label lamanya.
+
+Usage:
+  python status_rules.py compare dataset_gizi_anak.csv            # label tersimpan vs profil
+  python status_rules.py relabel dataset_gizi_anak.csv -o relabeled.csv [--profile web]
+  python status_rules.py relabel-db --sqlite gizi.db [--dry-run]   # tabel dataset_training
+  python status_rules.py benchmark --rows 5000000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from schema_loader import SCHEMAS, detect_schema
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+Z_COLUMNS = {'bb_u': 'z_score_bb_u', 'tb_u': 'z_score_tb_u', 'bb_tb': 'z_score_bb_tb'}
+
+OPERATORS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+# Aturan: (label, [(indikator, operator, ambang), ...]); klausa di-OR, urutan = prioritas
+PROFILES = {
+    'dataset': {
+        'rules': [
+            ('Gizi Buruk', [('bb_u', '<', -3), ('bb_tb', '<', -3)]),
+            ('Gizi Kurang', [('bb_u', '<', -2), ('bb_tb', '<', -2)]),
+            ('Stunting', [('tb_u', '<', -2)]),
+            ('Gizi Lebih', [('bb_u', '>', 2), ('bb_tb', '>', 1)]),   # BB/TB Gemuk ikut Gizi Lebih
+        ],
+        'default': 'Gizi Baik',
+    },
+    'web': {
+        'rules': [
+            ('Gizi Buruk', [('bb_u', '<', -3), ('bb_tb', '<', -3)]),
+            ('Gizi Kurang', [('bb_u', '<', -2), ('bb_tb', '<', -2)]),
+            ('Stunting', [('tb_u', '<', -2)]),
+            ('Gizi Lebih', [('bb_u', '>', 2), ('bb_tb', '>', 2)]),   # hanya BB/TB Obesitas
+        ],
+        'default': 'Gizi Baik',
+    },
+    'antropometri': {
+        'rules': [
+            ('Gizi Buruk', [('bb_tb', '<', -3)]),
+            ('Gizi Kurang', [('bb_tb', '<', -2)]),
+            ('Gizi Buruk', [('tb_u', '<', -3)]),
+            ('Gizi Kurang', [('tb_u', '<', -2)]),
+            ('Gizi Buruk', [('bb_u', '<', -3)]),
+            ('Gizi Kurang', [('bb_u', '<', -2)]),
+            ('Obesitas', [('bb_tb', '>', 3)]),
+            ('Gizi Lebih', [('bb_tb', '>', 2)]),
+        ],
+        'default': 'Normal',
+    },
+}
+
+# Profil bawaan per skema CSV (schema_loader.py)
+SCHEMA_PROFILES = {'gizi_anak': 'dataset', 'antropometri': 'antropometri'}
+
+CHUNKSIZE = 200000
+
+
+def classify(z_bb_u, z_tb_u, z_bb_tb, profile='dataset'):
+    """
+    Label status gizi untuk array z-score
+
+    Parameters:
+    - z_bb_u, z_tb_u, z_bb_tb: array (atau skalar) z-score
+    - profile: nama profil di PROFILES
+
+    Return: np.ndarray object berisi label (None jika ada z-score NaN)
+    """
+    spec = PROFILES[profile]
+    z = {name: np.atleast_1d(np.asarray(values, dtype=np.float64))
+         for name, values in (('bb_u', z_bb_u), ('tb_u', z_tb_u), ('bb_tb', z_bb_tb))}
+    conditions = [np.logical_or.reduce([OPERATORS[op](z[indicator], threshold)
+                                        for indicator, op, threshold in clauses])
+                  for _, clauses in spec['rules']]
+    # Pilih indeks aturan (int) lalu petakan ke label: lebih cepat dari np.select pada string
+    codes = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    labels = np.array([label for label, _ in spec['rules']] + [spec['default'], None], dtype=object)
+    missing = np.isnan(z['bb_u']) | np.isnan(z['tb_u']) | np.isnan(z['bb_tb'])
+    codes[missing] = len(conditions) + 1
+    return labels[codes]
+
+
+def status_gizi(z_bb_u, z_tb_u, z_bb_tb, profile='dataset'):
+    """Label satu anak (pembungkus skalar classify)"""
+    return classify(z_bb_u, z_tb_u, z_bb_tb, profile)[0]
+
+
+def classify_frame(df, profile='dataset'):
+    """Label untuk DataFrame berkolom z_score_bb_u / z_score_tb_u / z_score_bb_tb"""
+    return classify(*(pd.to_numeric(df[Z_COLUMNS[name]], errors='coerce').to_numpy(dtype=np.float64)
+                      for name in ('bb_u', 'tb_u', 'bb_tb')), profile)
+
+
+def relabel_csv(filepath, output, profile=None, chunksize=CHUNKSIZE):
+    """
+    Label ulang CSV (skema apa pun) per chunk; kolom lain ditulis apa adanya
+
+    Return: dict statistik (rows, changed, unlabeled, transitions Counter-like dict)
+    """
+    schema_name = detect_schema(filepath)
+    columns = SCHEMAS[schema_name]['columns']
+    profile = profile or SCHEMA_PROFILES[schema_name]
+    source = {canonical: src for src, canonical in columns.items()}
+    stats = {'rows': 0, 'changed': 0, 'unlabeled': 0, 'transitions': {}}
+
+    header = True
+    # Semua kolom dibaca sebagai teks: hanya kolom z-score yang diparse, baris ditulis
+    # ulang persis seperti aslinya (tanpa format ulang float)
+    for chunk in pd.read_csv(filepath, chunksize=chunksize, dtype=str, keep_default_na=False):
+        old = chunk[source['status_gizi']].to_numpy(dtype=object)
+        new = classify_frame(chunk.rename(columns=columns), profile)
+        unlabeled = pd.isna(new)
+        new[unlabeled] = old[unlabeled]
+        changed = new != old
+        _count_transitions(stats['transitions'], old[changed], new[changed])
+        stats['rows'] += len(chunk)
+        stats['changed'] += int(changed.sum())
+        stats['unlabeled'] += int(unlabeled.sum())
+        if output is not None:
+            chunk[source['status_gizi']] = new
+            chunk.to_csv(output, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    stats['profile'] = profile
+    return stats
+
+
+def _count_transitions(counts, old, new):
+    if len(old) == 0:
+        return
+    pairs = pd.DataFrame({'old': old, 'new': new}).value_counts()
+    for (before, after), n in pairs.items():
+        counts[(before, after)] = counts.get((before, after), 0) + int(n)
+
+
+def relabel_table(conn, profile='dataset', table='dataset_training', chunksize=CHUNKSIZE, dry_run=False):
+    """
+    Label ulang tabel database per chunk (keyset pagination pada id);
+    hanya baris yang labelnya berubah di-UPDATE
+
+    Return: dict statistik seperti relabel_csv
+    """
+    placeholder = '?' if conn.__class__.__module__.startswith('sqlite3') else '%s'
+    select = (f"SELECT id, z_score_bb_u, z_score_tb_u, z_score_bb_tb, status_gizi FROM {table} "
+              f"WHERE id > {placeholder} ORDER BY id LIMIT {int(chunksize)}")
+    update = f"UPDATE {table} SET status_gizi = {placeholder} WHERE id = {placeholder}"
+    stats = {'rows': 0, 'changed': 0, 'unlabeled': 0, 'transitions': {}, 'profile': profile}
+
+    cursor = conn.cursor()
+    last_id = 0
+    while True:
+        cursor.execute(select, (last_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        chunk = pd.DataFrame(rows, columns=['id', *Z_COLUMNS.values(), 'status_gizi'])
+        last_id = int(chunk['id'].iloc[-1])
+        old = chunk['status_gizi'].to_numpy(dtype=object)
+        new = classify_frame(chunk, profile)
+        unlabeled = pd.isna(new)
+        changed = ~unlabeled & (new != old)
+        _count_transitions(stats['transitions'], old[changed], new[changed])
+        stats['rows'] += len(chunk)
+        stats['changed'] += int(changed.sum())
+        stats['unlabeled'] += int(unlabeled.sum())
+        if not dry_run and changed.any():
+            cursor.executemany(update, list(zip(new[changed], chunk['id'].to_numpy()[changed].tolist())))
+            conn.commit()
+    cursor.close()
+    return stats
+
+
+def _connect(args):
+    if args.sqlite:
+        import sqlite3
+        return sqlite3.connect(args.sqlite)
+    if pymysql is None:
+        print("✗ Error: pymysql belum terinstall (pip install pymysql)")
+        sys.exit(1)
+    return pymysql.connect(host=args.host, user=args.user, password=args.password,
+                           database=args.database)
+
+
+def _print_stats(stats):
+    print(f"  Profil    : {stats['profile']}")
+    print(f"  Baris     : {stats['rows']}")
+    print(f"  Berubah   : {stats['changed']} ({100 * stats['changed'] / max(stats['rows'], 1):.2f}%)")
+    if stats['unlabeled']:
+        print(f"  ⚠ {stats['unlabeled']} baris tanpa z-score lengkap (label lama dipertahankan)")
+    for (before, after), n in sorted(stats['transitions'].items(), key=lambda item: -item[1]):
+        print(f"    {before:<12} -> {after:<12} {n}")
+
+
+def _legacy_status_gizi(z_bb_u, z_tb_u, z_bb_tb):
+    """Rantai if/elif lama tentukan_status_gizi() (generate_dataset.py), untuk benchmark"""
+    from generate_dataset import klasifikasi_bb_u, klasifikasi_tb_u, klasifikasi_bb_tb
+
+    kat_bb_u = klasifikasi_bb_u(z_bb_u)
+    kat_tb_u = klasifikasi_tb_u(z_tb_u)
+    kat_bb_tb = klasifikasi_bb_tb(z_bb_tb)
+    if kat_bb_u == 'Gizi Buruk' or kat_bb_tb == 'Sangat Kurus':
+        return 'Gizi Buruk'
+    elif kat_bb_u == 'Gizi Kurang' or kat_bb_tb == 'Kurus':
+        return 'Gizi Kurang'
+    elif kat_tb_u in ['Sangat Pendek', 'Pendek']:
+        return 'Stunting'
+    elif kat_bb_u == 'Gizi Lebih' or kat_bb_tb in ['Gemuk', 'Obesitas']:
+        return 'Gizi Lebih'
+    return 'Gizi Baik'
+
+
+def benchmark(n_rows, seed=42):
+    """
+    Profil 'dataset' secara vektor vs loop skalar if/elif lama pada z-score acak
+
+    Return: dict hasil
+    """
+    rng = np.random.default_rng(seed)
+    z = np.round(rng.normal(0, 1.5, size=(3, n_rows)), 2)
+
+    start = time.perf_counter()
+    labels = classify(*z, 'dataset')
+    vector_s = time.perf_counter() - start
+
+    n_scalar = min(n_rows, 200000)
+    start = time.perf_counter()
+    expected = [_legacy_status_gizi(a, b, c) for a, b, c in zip(*z[:, :n_scalar].tolist())]
+    scalar_s = (time.perf_counter() - start) * n_rows / n_scalar
+    return {
+        'n_rows': n_rows,
+        'vector_s': vector_s,
+        'scalar_s': scalar_s,
+        'n_checked': n_scalar,
+        'agreement': float(np.mean(labels[:n_scalar] == np.array(expected, dtype=object))),
+    }
+
+
+def main():
+    """CLI compare / relabel / relabel-db / benchmark"""
+    parser = argparse.ArgumentParser(description='Rule engine vektor status gizi')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_compare = sub.add_parser('compare', help='Bandingkan label tersimpan dengan setiap profil')
+    p_compare.add_argument('csv', nargs='+')
+    p_relabel = sub.add_parser('relabel', help='Label ulang CSV ke file baru')
+    p_relabel.add_argument('csv')
+    p_relabel.add_argument('-o', '--output', required=True)
+    p_relabel.add_argument('--profile', choices=list(PROFILES),
+                           help='Default: sesuai skema CSV (gizi_anak -> dataset, antropometri -> antropometri)')
+    p_relabel.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    p_db = sub.add_parser('relabel-db', help='Label ulang tabel dataset_training')
+    p_db.add_argument('--profile', choices=list(PROFILES), default='dataset')
+    p_db.add_argument('--dry-run', action='store_true', help='Hitung perubahan tanpa UPDATE')
+    p_db.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    p_db.add_argument('--sqlite', help='Gunakan file SQLite alih-alih MySQL')
+    p_db.add_argument('--host', default='localhost')
+    p_db.add_argument('--user', default='root')
+    p_db.add_argument('--password', default='')
+    p_db.add_argument('--database', default='gizi_db')
+    p_bench = sub.add_parser('benchmark', help='Vektor vs loop skalar')
+    p_bench.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        for path in args.csv:
+            print(f"\n{path} (skema '{detect_schema(path)}'):")
+            for profile in PROFILES:
+                stats = relabel_csv(path, None, profile)
+                print(f"  {profile:<13} {100 * (1 - stats['changed'] / max(stats['rows'], 1)):6.2f}% "
+                      f"sama dengan label tersimpan ({stats['changed']} berbeda)")
+        return
+
+    if args.command == 'relabel':
+        if os.path.abspath(args.output) == os.path.abspath(args.csv):
+            print("✗ Error: output harus file berbeda dari input")
+            sys.exit(1)
+        start = time.perf_counter()
+        stats = relabel_csv(args.csv, args.output, args.profile, args.chunksize)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Relabel: {args.csv} -> {args.output} ({elapsed:.2f}s)")
+        _print_stats(stats)
+        return
+
+    if args.command == 'relabel-db':
+        conn = _connect(args)
+        start = time.perf_counter()
+        try:
+            stats = relabel_table(conn, args.profile, chunksize=args.chunksize, dry_run=args.dry_run)
+        finally:
+            conn.close()
+        elapsed = time.perf_counter() - start
+        print(f"✓ Relabel dataset_training{' (dry run)' if args.dry_run else ''} ({elapsed:.2f}s)")
+        _print_stats(stats)
+        return
+
+    r = benchmark(args.rows)
+    print("=" * 60)
+    print("STATUS RULES BENCHMARK")
+    print("=" * 60)
+    print(f"Data      : {r['n_rows']} baris z-score, profil 'dataset'")
+    print(f"Vektor    : {r['vector_s']:.3f}s ({r['n_rows'] / r['vector_s']:.0f} rows/s)")
+    print(f"Skalar    : {r['scalar_s']:.2f}s (estimasi dari {r['n_checked']} baris)")
+    print(f"Speedup   : {r['scalar_s'] / r['vector_s']:.0f}x")
+    print(f"Agreement : {r['agreement']*100:.2f}% (vs if/elif lama)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,14 @@ import joblib
 import json
 import matplotlib.pyplot as plt
 import seaborn as sns
+from model_bundle import write_bundle, publish, MODEL_FILE, ENCODER_FILE
+from calibration import (fit_calibration, expected_calibration_error, brier_score,
+                         CALIBRATION_FILE)
+from label_vocab import Vocabulary, to_features, VOCAB_FILE
+
+FEATURE_COLUMNS = ['jenis_kelamin_encoded', 'umur_bulan', 'berat_badan', 
+                   'tinggi_badan', 'lingkar_lengan', 
+                   'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
 
 def load_and_preprocess_data(filepath='dataset_gizi_anak.csv'):
     """Load dan preprocessing dataset"""
@@ -28,9 +36,7 @@ def load_and_preprocess_data(filepath='dataset_gizi_anak.csv'):
     df['jenis_kelamin_encoded'] = le_gender.fit_transform(df['jenis_kelamin'])
     
     # Features dan Target
-    feature_columns = ['jenis_kelamin_encoded', 'umur_bulan', 'berat_badan', 
-                      'tinggi_badan', 'lingkar_lengan', 
-                      'z_score_bb_u', 'z_score_tb_u', 'z_score_bb_tb']
+    feature_columns = list(FEATURE_COLUMNS)
     
     X = df[feature_columns]
     y = df['status_gizi']
@@ -41,16 +47,35 @@ def load_and_preprocess_data(filepath='dataset_gizi_anak.csv'):
     
     return X, y, le_gender, feature_columns
 
+def encode_data(X, y, le_gender):
+    """
+    Representasi training: fitur float32 C-contiguous + kode status int8
+    Nama kelas hanya disimpan di Vocabulary (ikut di bundle)
+    
+    Return: X_codes, y_codes, vocabulary
+    """
+    vocabulary = Vocabulary.from_labels(y, le_gender.classes_)
+    X_codes, y_codes = to_features(X), vocabulary.encode_status(y)
+    
+    before = X.memory_usage(deep=True).sum() + y.memory_usage(deep=True)
+    after = X_codes.nbytes + y_codes.nbytes
+    print(f"\nEncoded data: {before/1024:.1f} KB -> {after/1024:.1f} KB (float32 + int8)")
+    
+    return X_codes, y_codes, vocabulary
+
+def split_indices(y):
+    """Indeks train/test stratified (split yang sama untuk training dan kalibrasi)"""
+    return train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+
 def train_model(X, y):
-    """Training model dengan Random Forest"""
+    """Training model dengan Random Forest (X float32, y kode status)"""
     print("\n" + "="*50)
     print("Training Model...")
     print("="*50)
     
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    train_idx, test_idx = split_indices(y)
+    X_train, X_test, y_train, y_test = X[train_idx], X[test_idx], y[train_idx], y[test_idx]
     
     print(f"\nTraining set: {len(X_train)} samples")
     print(f"Testing set: {len(X_test)} samples")
@@ -79,7 +104,7 @@ def train_model(X, y):
     
     return rf_model, X_test, y_test, y_pred
 
-def evaluate_model(model, X, y, y_test, y_pred):
+def evaluate_model(model, X, y, y_test, y_pred, vocabulary):
     """Evaluasi model secara komprehensif"""
     print("\n" + "="*50)
     print("Model Evaluation")
@@ -95,10 +120,11 @@ def evaluate_model(model, X, y, y_test, y_pred):
     print("\n" + "="*50)
     print("Classification Report:")
     print("="*50)
-    print(classification_report(y_test, y_pred))
+    labels = np.arange(len(vocabulary.status))
+    print(classification_report(y_test, y_pred, labels=labels, target_names=list(vocabulary.status)))
     
     # Confusion Matrix
-    cm = confusion_matrix(y_test, y_pred)
+    cm = confusion_matrix(y_test, y_pred, labels=labels)
     print("\nConfusion Matrix:")
     print(cm)
     
@@ -140,7 +166,29 @@ def plot_results(cm, feature_importance, classes):
     plt.savefig('model_evaluation.png', dpi=300, bbox_inches='tight')
     print("\n✓ Evaluation plot saved: model_evaluation.png")
 
-def save_model(model, le_gender, feature_columns, metadata):
+def calibrate_model(model, X_fit, y_fit, X_test, y_test, vocabulary):
+    """Fit tabel kalibrasi isotonic dari prediksi out-of-fold (X_fit tanpa data test)"""
+    print("\n" + "="*50)
+    print("Calibrating Probabilities...")
+    print("="*50)
+    
+    table, _ = fit_calibration(model, X_fit, y_fit)
+    
+    raw = model.predict_proba(X_test)
+    calibrated = table.transform(raw)
+    classes = model.classes_
+    ece_before = expected_calibration_error(raw, y_test, classes)
+    ece_after = expected_calibration_error(calibrated, y_test, classes)
+    print(f"ECE   : {ece_before:.4f} -> {ece_after:.4f}")
+    print(f"Brier : {brier_score(raw, y_test, classes):.4f} -> {brier_score(calibrated, y_test, classes):.4f}")
+    print(f"✓ Calibration table: {table.nbytes/1024:.1f} KB")
+    
+    # Tabel disimpan dengan nama kelas (dicocokkan dengan classes_ model setelah decode)
+    table.classes = vocabulary.decode_status(table.classes).astype(str)
+    
+    return table, {'method': 'isotonic', 'ece_before': ece_before, 'ece_after': ece_after}
+
+def save_model(model, le_gender, feature_columns, metadata, calibration=None, vocabulary=None):
     """Save model dan metadata"""
     print("\n" + "="*50)
     print("Saving Model...")
@@ -154,6 +202,19 @@ def save_model(model, le_gender, feature_columns, metadata):
     joblib.dump(le_gender, 'label_encoder_gender.pkl')
     print("✓ Label encoder saved: label_encoder_gender.pkl")
     
+    # Save vocabulary (nama kelas untuk model berkode integer)
+    artifacts = {MODEL_FILE: model, ENCODER_FILE: le_gender}
+    if vocabulary is not None:
+        vocabulary.save(VOCAB_FILE)
+        artifacts[VOCAB_FILE] = vocabulary
+        print(f"✓ Vocabulary saved: {VOCAB_FILE}")
+    
+    # Save calibration table
+    if calibration is not None:
+        calibration.save(CALIBRATION_FILE)
+        artifacts[CALIBRATION_FILE] = calibration
+        print(f"✓ Calibration saved: {CALIBRATION_FILE}")
+    
     # Save metadata
     metadata_full = {
         'model_type': 'RandomForestClassifier',
@@ -163,12 +224,18 @@ def save_model(model, le_gender, feature_columns, metadata):
         'cv_mean': metadata['cv_mean'],
         'cv_std': metadata['cv_std'],
         'n_samples': metadata['n_samples'],
+        'calibration': metadata.get('calibration'),
         'train_date': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
     with open('model_metadata.json', 'w') as f:
         json.dump(metadata_full, f, indent=4)
     print("✓ Metadata saved: model_metadata.json")
+    
+    # Bundle versi baru + publish atomik (dibaca predict_gizi.py & prediction_server.py)
+    version = write_bundle(artifacts, metadata_full)
+    publish(version)
+    print(f"✓ Bundle published: bundles/{version}")
 
 def main():
     """Main training pipeline"""
@@ -179,26 +246,33 @@ def main():
     
     # 1. Load data
     X, y, le_gender, feature_columns = load_and_preprocess_data()
+    X, y, vocabulary = encode_data(X, y, le_gender)
     
     # 2. Train model
     model, X_test, y_test, y_pred = train_model(X, y)
     
     # 3. Evaluate
-    cv_scores, cm, feature_importance = evaluate_model(model, X, y, y_test, y_pred)
+    cv_scores, cm, feature_importance = evaluate_model(model, X, y, y_test, y_pred, vocabulary)
     
     # 4. Plot results
-    classes = sorted(y.unique())
+    classes = list(vocabulary.status)
     plot_results(cm, feature_importance, classes)
     
-    # 5. Save model
+    # 5. Calibrate probabilities
+    train_idx = np.sort(split_indices(y)[0])
+    calibration, calibration_info = calibrate_model(model, X[train_idx], y[train_idx],
+                                                    X_test, y_test, vocabulary)
+    
+    # 6. Save model
     metadata = {
         'classes': classes,
         'accuracy': float(accuracy_score(y_test, y_pred)),
         'cv_mean': float(cv_scores.mean()),
         'cv_std': float(cv_scores.std()),
-        'n_samples': len(X)
+        'n_samples': len(X),
+        'calibration': calibration_info
     }
-    save_model(model, le_gender, feature_columns, metadata)
+    save_model(model, le_gender, feature_columns, metadata, calibration, vocabulary)
     
     print("\n" + "="*50)
     print("Training Complete!")
@@ -208,7 +282,10 @@ def main():
     print("\nModel files created:")
     print("  - model_gizi_rf.pkl")
     print("  - label_encoder_gender.pkl")
+    print(f"  - {CALIBRATION_FILE}")
+    print(f"  - {VOCAB_FILE}")
     print("  - model_metadata.json")
+    print("  - bundles/<versi>/ (aktif: bundles/CURRENT)")
     print("  - model_evaluation.png")
 
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Tuning Store - Grid search yang bisa dilanjutkan, dengan trial store SQLite
+Setiap (kombinasi parameter, fold) disimpan begitu selesai, dengan kunci study
+= hash data + estimator + parameter tetap + skema CV + scoring. Menjalankan
+ulang setelah terputus, atau setelah param_grid ditambah nilai baru, hanya
+mengevaluasi trial yang belum ada. Trial dibagi ke process pool (fork) dan
+ditulis ke SQLite oleh proses utama saja. Worker membaca data dari satu buffer
+float32 bersama (shared_matrix.py), bukan salinan DataFrame float64.
+
+Usage:
+  python tuning_store.py list                 # study yang tersimpan
+  python tuning_store.py show <study> --top 10
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from shared_matrix import SharedMatrix
+
+TRIALS_DB = 'tuning_trials.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    study TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    score REAL NOT NULL,
+    fit_time REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (study, params, fold)
+);
+CREATE TABLE IF NOT EXISTS studies (
+    study TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+# Buffer data training untuk worker (diwarisi lewat fork, tidak di-pickle per trial)
+_shared = {}
+
+
+def data_hash(X, y):
+    """Hash isi data (nilai, nama kolom, label)"""
+    h = hashlib.sha256()
+    X = pd.DataFrame(X)
+    h.update('\0'.join(map(str, X.columns)).encode())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update('\0'.join(map(str, np.asarray(y))).encode())
+    return h.hexdigest()
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class TrialStore:
+    """Penyimpanan trial di SQLite (satu baris per parameter x fold)"""
+
+    def __init__(self, path=TRIALS_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def register(self, study, description):
+        self.conn.execute("INSERT OR IGNORE INTO studies VALUES (?, ?, ?)",
+                          (study, description, datetime.now().isoformat(timespec='seconds')))
+        self.conn.commit()
+
+    def completed(self, study):
+        """dict (params_key, fold) -> score"""
+        rows = self.conn.execute("SELECT params, fold, score FROM trials WHERE study = ?", (study,))
+        return {(params, fold): score for params, fold, score in rows}
+
+    def record(self, study, params, fold, score, fit_time):
+        # Commit per trial: progress aman walau proses dihentikan
+        self.conn.execute("INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?)",
+                          (study, params, fold, score, fit_time,
+                           datetime.now().isoformat(timespec='seconds')))
+        self.conn.commit()
+
+    def studies(self):
+        return self.conn.execute(
+            "SELECT s.study, s.description, s.created_at, COUNT(t.fold) "
+            "FROM studies s LEFT JOIN trials t ON t.study = s.study "
+            "GROUP BY s.study ORDER BY s.created_at").fetchall()
+
+    def summary(self, study):
+        """Skor rata-rata per kombinasi parameter"""
+        df = pd.read_sql_query("SELECT params, fold, score, fit_time FROM trials WHERE study = ?",
+                               self.conn, params=(study,))
+        return (df.groupby('params')
+                  .agg(mean_score=('score', 'mean'), std_score=('score', 'std'),
+                       n_folds=('fold', 'count'), fit_time=('fit_time', 'sum'))
+                  .sort_values('mean_score', ascending=False))
+
+    def close(self):
+        self.conn.close()
+
+
+def _evaluate(estimator, params, fold, n_jobs, scoring):
+    """Fit satu trial (dijalankan di worker)"""
+    X, y, folds = _shared['X'], _shared['y'], _shared['folds']
+    train_idx, test_idx = folds[fold]
+    model = clone(estimator).set_params(**params)
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+    score = get_scorer(scoring)(model, X[test_idx], y[test_idx])
+    return params_key(params), fold, float(score), fit_time
+
+
+class ResumableGridSearch:
+    """
+    Pengganti GridSearchCV dengan trial store persisten
+
+    Parameters:
+    - estimator, param_grid, cv, scoring: seperti GridSearchCV
+    - store_path: file SQLite trial store
+    - n_workers: jumlah proses (default: semua core); core dibagi rata ke n_jobs estimator
+    """
+
+    def __init__(self, estimator, param_grid, cv=3, scoring='accuracy', store_path=TRIALS_DB,
+                 n_workers=None, verbose=1):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.store_path = store_path
+        self.n_workers = n_workers
+        self.verbose = verbose
+
+    def _study_key(self, X, y, cv):
+        fixed = {k: v for k, v in self.estimator.get_params().items() if k != 'n_jobs'}
+        description = {
+            'estimator': type(self.estimator).__name__,
+            'fixed_params': params_key(fixed),
+            'cv': repr(cv),
+            'scoring': self.scoring,
+            'data': data_hash(X, y),
+        }
+        key = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:16]
+        return key, json.dumps(description, sort_keys=True)
+
+    def fit(self, X, y):
+        X, y = pd.DataFrame(X).reset_index(drop=True), pd.Series(y).reset_index(drop=True)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        folds = list(cv.split(X, y))
+        candidates = list(ParameterGrid(self.param_grid))
+
+        store = TrialStore(self.store_path)
+        self.study_, description = self._study_key(X, y, cv)
+        store.register(self.study_, description)
+        done = store.completed(self.study_)
+        pending = [(params, fold) for params in candidates for fold in range(len(folds))
+                   if (params_key(params), fold) not in done]
+        self.n_cached_ = len(candidates) * len(folds) - len(pending)
+        self.n_run_ = len(pending)
+        if self.verbose:
+            print(f"Study {self.study_}: {len(candidates)} kandidat x {len(folds)} fold, "
+                  f"{self.n_cached_} dari store, {self.n_run_} dijalankan")
+
+        n_cores = os.cpu_count() or 1
+        n_workers = max(1, min(self.n_workers or n_cores, len(pending) or 1))
+        n_jobs = max(1, n_cores // n_workers)
+        # Trial di-fit pada kode label (skor identik); best_estimator_ tetap di data asli
+        shared = SharedMatrix(X, y)
+        _shared.update(X=shared.X, y=shared.y, folds=folds)
+        try:
+            if n_workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+                with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+                    futures = [pool.submit(_evaluate, self.estimator, params, fold, n_jobs, self.scoring)
+                               for params, fold in pending]
+                    for future in as_completed(futures):
+                        store.record(self.study_, *future.result())
+            else:
+                for params, fold in pending:
+                    store.record(self.study_, *_evaluate(self.estimator, params, fold, n_jobs,
+                                                         self.scoring))
+            done = store.completed(self.study_)
+        finally:
+            _shared.clear()
+            shared.close()
+            store.close()
+
+        scores = np.array([[done[(params_key(params), fold)] for fold in range(len(folds))]
+                           for params in candidates])
+        mean, std = scores.mean(axis=1), scores.std(axis=1)
+        self.cv_results_ = {
+            'params': candidates,
+            'mean_test_score': mean,
+            'std_test_score': std,
+            'rank_test_score': pd.Series(mean).rank(method='min', ascending=False).astype(int).to_numpy(),
+        }
+        # Seri: kandidat pertama dalam urutan grid (sama dengan GridSearchCV)
+        self.best_index_ = int(np.argmax(mean))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(mean[self.best_index_])
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+
+
+def main():
+    """CLI untuk melihat isi trial store"""
+    parser = argparse.ArgumentParser(description='Trial store hyperparameter tuning')
+    parser.add_argument('--db', default=TRIALS_DB)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    p_show = sub.add_parser('show')
+    p_show.add_argument('study')
+    p_show.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    store = TrialStore(args.db)
+    if args.command == 'show':
+        print(store.summary(args.study).head(args.top).to_string())
+    else:
+        for study, description, created_at, n_trials in store.studies():
+            info = json.loads(description)
+            print(f"  {study}  {created_at}  {info['estimator']:<24} {n_trials} trial  "
+                  f"data={info['data'][:12]}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+WHO Standards - Satu sumber nilai standar WHO untuk z-score Python dan tabel standar_who
+Koefisien aproksimasi linear (median & SD per umur) didefinisikan sekali di sini,
+lalu dikompilasi menjadi:
+  - who_standards.npy : array (jenis kelamin, indikator, umur, kolom) yang di-mmap
+                        oleh predict_gizi.py
+  - standar_who.sql   : TRUNCATE + satu INSERT multi-row untuk tabel standar_who
+  - standar_who.tsv   : (opsional, --load-data) file untuk LOAD DATA LOCAL INFILE
+
+Semua nilai dibulatkan 2 desimal seperti kolom DECIMAL(5,2), sehingga database
+dan model membaca angka yang identik.
+
+Usage:
+  python who_standards.py                      # tulis .npy + .sql
+  python who_standards.py --load-data          # + .tsv untuk LOAD DATA
+  python who_standards.py --apply [--sqlite gizi.db]
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+WHO_TABLE_FILE = 'who_standards.npy'
+WHO_SQL_FILE = 'standar_who.sql'
+WHO_TSV_FILE = 'standar_who.tsv'
+
+SEXES = ('L', 'P')
+INDICATORS = ('BB/U', 'TB/U', 'BB/TB')
+COLUMNS = ('median', 'sd', 'minus_3sd', 'minus_2sd', 'minus_1sd',
+           'plus_1sd', 'plus_2sd', 'plus_3sd')
+MAX_MONTH = 60
+
+# (indikator, jenis_kelamin) -> (median awal, median per bulan, sd awal, sd per bulan)
+# Aproksimasi sederhana, untuk produksi ganti dengan tabel WHO lengkap
+WHO_COEFFICIENTS = {
+    ('BB/U', 'L'): (3.3, 0.15, 0.4, 0.01),    # Berat badan (kg)
+    ('BB/U', 'P'): (3.2, 0.14, 0.4, 0.01),
+    ('TB/U', 'L'): (49.9, 1.1, 1.9, 0.02),    # Tinggi badan (cm)
+    ('TB/U', 'P'): (49.1, 1.0, 1.9, 0.02),
+    ('BB/TB', 'L'): (15.0, 0.05, 1.2, 0.0),   # Simplified - seharusnya per tinggi badan
+    ('BB/TB', 'P'): (15.0, 0.05, 1.2, 0.0),
+}
+
+_table = None
+
+
+def who_formula(jenis_kelamin, umur_bulan, indikator):
+    """Median dan SD langsung dari koefisien (untuk umur pecahan / di luar tabel)"""
+    median0, median_slope, sd0, sd_slope = WHO_COEFFICIENTS[(indikator, jenis_kelamin)]
+    return median0 + umur_bulan * median_slope, sd0 + umur_bulan * sd_slope
+
+
+def build_table(max_month=MAX_MONTH):
+    """Array (2, 3, max_month + 1, 8): median, sd, dan batas -3..+3 SD"""
+    months = np.arange(max_month + 1, dtype=np.float64)
+    offsets = np.array([-3, -2, -1, 1, 2, 3], dtype=np.float64)
+    table = np.empty((len(SEXES), len(INDICATORS), len(months), len(COLUMNS)))
+    for s, jk in enumerate(SEXES):
+        for i, indikator in enumerate(INDICATORS):
+            median, sd = who_formula(jk, months, indikator)
+            table[s, i, :, 0] = median
+            table[s, i, :, 1] = sd
+            table[s, i, :, 2:] = median[:, None] + offsets * sd[:, None]
+    return np.round(table, 2)
+
+
+def save_table(table, filepath=WHO_TABLE_FILE):
+    np.save(filepath, table)
+
+
+def load_table(filepath=WHO_TABLE_FILE):
+    """Load tabel dengan mmap (tanpa membaca seluruh file)"""
+    return np.load(filepath, mmap_mode='r')
+
+
+def get_table():
+    """Tabel aktif: dari file .npy jika ada, jika tidak dibangun di memori"""
+    global _table
+    if _table is None:
+        _table = load_table() if os.path.exists(WHO_TABLE_FILE) else build_table()
+    return _table
+
+
+def who_params(jenis_kelamin, umur_bulan, indikator):
+    """
+    Median dan SD standar WHO
+
+    Umur bulat 0..60 dibaca dari tabel, selain itu dihitung dari koefisien yang sama
+    """
+    month = int(umur_bulan) if float(umur_bulan).is_integer() else -1
+    table = get_table()
+    if 0 <= month < table.shape[2]:
+        row = table[SEXES.index(jenis_kelamin), INDICATORS.index(indikator), month]
+        return float(row[0]), float(row[1])
+    return who_formula(jenis_kelamin, umur_bulan, indikator)
+
+
+def iter_rows(table):
+    """Baris (jenis_kelamin, umur_bulan, indikator, median, sd, -3SD..+3SD)"""
+    for month in range(table.shape[2]):
+        for s, jk in enumerate(SEXES):
+            for i, indikator in enumerate(INDICATORS):
+                yield (jk, month, indikator, *(float(v) for v in table[s, i, month]))
+
+
+def to_sql(table):
+    """TRUNCATE + satu INSERT multi-row untuk seluruh tabel"""
+    values = ",\n".join(
+        f"('{jk}', {month}, '{indikator}', " + ", ".join(f"{v:.2f}" for v in numbers) + ")"
+        for jk, month, indikator, *numbers in iter_rows(table)
+    )
+    return ("TRUNCATE TABLE standar_who;\n"
+            f"INSERT INTO standar_who (jenis_kelamin, umur_bulan, indikator, {', '.join(COLUMNS)}) VALUES\n"
+            f"{values};\n")
+
+
+def write_tsv(table, filepath=WHO_TSV_FILE):
+    """File tab-separated + statement LOAD DATA yang sesuai"""
+    with open(filepath, 'w') as f:
+        for jk, month, indikator, *numbers in iter_rows(table):
+            f.write("\t".join([jk, str(month), indikator] + [f"{v:.2f}" for v in numbers]) + "\n")
+    return (f"LOAD DATA LOCAL INFILE '{os.path.abspath(filepath)}' INTO TABLE standar_who "
+            f"(jenis_kelamin, umur_bulan, indikator, {', '.join(COLUMNS)});")
+
+
+def apply_sql(conn, table):
+    """Isi ulang standar_who dalam satu transaksi (satu INSERT multi-row)"""
+    cursor = conn.cursor()
+    sql = to_sql(table)
+    truncate, insert = sql.split(";\n", 1)
+    # SQLite tidak punya TRUNCATE
+    cursor.execute("DELETE FROM standar_who" if 'sqlite' in type(conn).__module__ else truncate)
+    cursor.execute(insert.rstrip().rstrip(';'))
+    conn.commit()
+    return cursor.rowcount
+
+
+def main():
+    """Kompilasi standar WHO ke .npy + SQL (opsional langsung ke database)"""
+    parser = argparse.ArgumentParser(description='Kompilasi tabel standar WHO')
+    parser.add_argument('--load-data', action='store_true', help='Tulis juga file TSV untuk LOAD DATA')
+    parser.add_argument('--apply', action='store_true', help='Isi tabel standar_who di database')
+    parser.add_argument('--sqlite', help='Gunakan file SQLite alih-alih MySQL')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--database', default='gizi_db')
+    args = parser.parse_args()
+
+    table = build_table()
+    save_table(table)
+    with open(WHO_SQL_FILE, 'w') as f:
+        f.write(to_sql(table))
+    n_rows = table.shape[0] * table.shape[1] * table.shape[2]
+    print(f"✓ {n_rows} baris standar WHO ({len(SEXES)} jenis kelamin x {len(INDICATORS)} indikator x {table.shape[2]} bulan)")
+    print(f"  Saved: {WHO_TABLE_FILE} ({table.nbytes/1024:.1f} KB)")
+    print(f"  Saved: {WHO_SQL_FILE}")
+    if args.load_data:
+        print(f"  Saved: {WHO_TSV_FILE}")
+        print(f"  {write_tsv(table)}")
+
+    if args.apply:
+        if args.sqlite:
+            import sqlite3
+            conn = sqlite3.connect(args.sqlite)
+        elif pymysql is None:
+            print("✗ Error: pymysql belum terinstall (pip install pymysql)")
+            sys.exit(1)
+        else:
+            conn = pymysql.connect(host=args.host, user=args.user, password=args.password,
+                                   database=args.database)
+        inserted = apply_sql(conn, table)
+        conn.close()
+        print(f"✓ standar_who diisi ulang: {inserted} baris")
+
+
+if __name__ == "__main__":
+    main()
@@ -58,7 +58,7 @@ $rekomendasi = generateRekomendasi($status_gizi, $kategori_bb_u, $kategori_tb_u,
 $confidence_score = 85.5; // Default, bisa diganti dengan hasil dari Python ML
 
 // Jika Python tersedia, jalankan prediksi
-if (file_exists(PYTHON_SCRIPT_PREDICT)) {
+if (PREDICT_SERVER_URL !== '' || file_exists(PYTHON_SCRIPT_PREDICT)) {
     $data_json = json_encode([
         'jenis_kelamin' => $jenis_kelamin,
         'umur_bulan' => $umur_bulan,
@@ -67,8 +67,21 @@ if (file_exists(PYTHON_SCRIPT_PREDICT)) {
         'lingkar_lengan' => $lingkar_lengan
     ]);
     
-    $cmd = escapeshellcmd(PYTHON_PATH . " " . PYTHON_SCRIPT_PREDICT . " '" . $data_json . "'");
-    $ml_result = shell_exec($cmd);
+    $ml_result = false;
+    if (PREDICT_SERVER_URL !== '') {
+        // Prediction server (model sudah dimuat, tanpa spawn proses Python)
+        $context = stream_context_create(['http' => [
+            'method' => 'POST',
+            'header' => "Content-Type: application/json\r\n",
+            'content' => $data_json,
+            'timeout' => 5
+        ]]);
+        $ml_result = @file_get_contents(PREDICT_SERVER_URL, false, $context);
+    }
+    if (!$ml_result && file_exists(PYTHON_SCRIPT_PREDICT)) {
+        $cmd = escapeshellcmd(PYTHON_PATH . " " . PYTHON_SCRIPT_PREDICT . " '" . $data_json . "'");
+        $ml_result = shell_exec($cmd);
+    }
     
     if ($ml_result) {
         $ml_data = json_decode($ml_result, true);
@@ -86,6 +99,57 @@ $metode = 'Z-Score + Machine Learning';
 $stmt = $db->prepare("INSERT INTO hasil_diagnosa (data_anak_id, metode_diagnosa, status_gizi, kategori_bb_u, kategori_tb_u, kategori_bb_tb, z_score_bb_u, z_score_tb_u, z_score_bb_tb, rekomendasi, confidence_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)");
 $stmt->bind_param("isssssdddsd", $data_anak_id, $metode, $status_gizi, $kategori_bb_u, $kategori_tb_u, $kategori_bb_tb, $z_bb_u, $z_tb_u, $z_bb_tb, $rekomendasi, $confidence_score);
 $stmt->execute();
+$diagnosa_id = $db->lastInsertId();
+
+// 9. Update rollup statistik dashboard (model/aggregation.py)
+if (file_exists(PYTHON_SCRIPT_AGGREGATE)) {
+    $agg_json = json_encode([
+        'status_gizi' => $status_gizi,
+        'jenis_kelamin' => $jenis_kelamin,
+        'umur_bulan' => $umur_bulan,
+        'alamat' => $alamat,
+        'z_score_bb_u' => $z_bb_u,
+        'z_score_tb_u' => $z_tb_u,
+        'z_score_bb_tb' => $z_bb_tb
+    ]);
+    shell_exec(PYTHON_PATH . " " . escapeshellarg(PYTHON_SCRIPT_AGGREGATE) . " record " . escapeshellarg($agg_json));
+}
+
+// 10. Tambahkan diagnosa ke indeks kasus serupa (model/similar_cases.py)
+if (file_exists(PYTHON_SCRIPT_SIMILAR) && file_exists(CASE_INDEX_FILE)) {
+    $case_json = json_encode([
+        'id' => $diagnosa_id,
+        'nama_anak' => $nama_anak,
+        'tanggal_lahir' => $tanggal_lahir,
+        'jenis_kelamin' => $jenis_kelamin,
+        'umur_bulan' => $umur_bulan,
+        'berat_badan' => $berat_badan,
+        'tinggi_badan' => $tinggi_badan,
+        'lingkar_lengan' => $lingkar_lengan,
+        'z_score_bb_u' => $z_bb_u,
+        'z_score_tb_u' => $z_tb_u,
+        'z_score_bb_tb' => $z_bb_tb,
+        'status_gizi' => $status_gizi
+    ]);
+    shell_exec(PYTHON_PATH . " " . escapeshellarg(PYTHON_SCRIPT_SIMILAR) . " add " . escapeshellarg($case_json));
+}
+
+// 11. Catat kunjungan di riwayat pertumbuhan anak (model/growth_history.py)
+if (file_exists(PYTHON_SCRIPT_GROWTH) && file_exists(GROWTH_HISTORY_FILE)) {
+    $visit_json = json_encode([
+        'nama_anak' => $nama_anak,
+        'tanggal_lahir' => $tanggal_lahir,
+        'jenis_kelamin' => $jenis_kelamin,
+        'umur_bulan' => $umur_bulan,
+        'berat_badan' => $berat_badan,
+        'tinggi_badan' => $tinggi_badan,
+        'z_score_bb_u' => $z_bb_u,
+        'z_score_tb_u' => $z_tb_u,
+        'z_score_bb_tb' => $z_bb_tb,
+        'tanggal_diagnosa' => date('Y-m-d H:i:s')
+    ]);
+    shell_exec(PYTHON_PATH . " " . escapeshellarg(PYTHON_SCRIPT_GROWTH) . " add " . escapeshellarg($visit_json));
+}
 ?>
 <!DOCTYPE html>
 <html lang="id">